@@ -0,0 +1,117 @@
+import time
+from collections import namedtuple
+
+from quiz_questions import QuestionGenerator
+
+# The quiz's rules without any Tk: a round of questions, two tries each,
+# 10 points for a first-try answer and 5 for a second-try one, and the grade
+# for the final score. quiz_gui.py drives one QuizEngine from its buttons;
+# quiz_simulator.py plays millions of them with simulated players.
+
+TOTAL_QUESTIONS = 10
+ATTEMPTS = 2
+FIRST_TRY_POINTS = 10
+SECOND_TRY_POINTS = 5
+
+# (lowest score, grade), best grade first. Anything below the last is an F.
+GRADE_THRESHOLDS = ((95, "A+"), (85, "A"), (75, "B"), (65, "C"), (55, "D"))
+
+CORRECT = "correct"          # answered - points were added
+TRY_AGAIN = "try again"      # wrong, but there's a try left
+MISSED = "missed"            # wrong with no tries left - the answer is shown
+
+# What one answer did. answer is the question's answer (for "Answer: ..." after a miss).
+Outcome = namedtuple("Outcome", "result points attempts_left answer")
+# How one question of the round went: tries used, points (0 = missed), seconds taken
+QuestionResult = namedtuple("QuestionResult", "op attempts points seconds")
+
+
+def get_grade(total, thresholds=GRADE_THRESHOLDS):
+    for lowest, grade in thresholds:
+        if total >= lowest:
+            return grade
+    return "F"
+
+
+class QuizEngine:
+    def __init__(self, generator=None, total_questions=TOTAL_QUESTIONS, clock=time.monotonic):
+        self.generator = generator or QuestionGenerator()
+        self.total_questions = total_questions
+        self.clock = clock
+        self.digits = 1
+        self.questions = []
+        self.results = []             # a QuestionResult per question done this round
+        self.score = 0
+        self.question_index = 0
+        self.attempts_left = ATTEMPTS
+        self.shown_at = None
+
+    def start(self, digits):
+        """New round at this difficulty"""
+        self.digits = digits
+        self.questions = self.generator.round(digits, self.total_questions)
+        self.results = []
+        self.score = 0
+        self.question_index = 0
+        self.attempts_left = ATTEMPTS
+        self.shown_at = None
+
+    def go_to(self, index):
+        """Jump to question number index (from 0) with both tries left,
+        without recording anything for the questions skipped"""
+        if not 0 <= index < self.total_questions:
+            raise IndexError(f"no question {index} in a round of {self.total_questions}")
+        self.question_index = index
+        self.attempts_left = ATTEMPTS
+        self.shown_at = None
+
+    def question_shown(self):
+        """The current question is on screen now - its time starts here"""
+        self.shown_at = self.clock()
+
+    @property
+    def finished(self):
+        return self.question_index >= self.total_questions
+
+    @property
+    def question(self):
+        """The question being asked (a quiz_questions.Question)"""
+        return self.questions[self.question_index]
+
+    @property
+    def current_answer(self):
+        return self.question.answer
+
+    @property
+    def max_score(self):
+        return self.total_questions * FIRST_TRY_POINTS
+
+    def is_correct(self, user_answer):
+        return user_answer == self.current_answer
+
+    def submit(self, user_answer):
+        """Answer the current question. Once it is answered or missed the engine
+        moves on to the next question (check finished before asking it)."""
+        answer = self.current_answer
+        if self.is_correct(user_answer):
+            points = FIRST_TRY_POINTS if self.attempts_left == ATTEMPTS else SECOND_TRY_POINTS
+            self.score += points
+            attempts_left = self.attempts_left
+            self._next_question(points)
+            return Outcome(CORRECT, points, attempts_left, answer)
+        self.attempts_left -= 1
+        if self.attempts_left > 0:
+            return Outcome(TRY_AGAIN, 0, self.attempts_left, answer)
+        self._next_question(0)
+        return Outcome(MISSED, 0, 0, answer)
+
+    def _next_question(self, points):
+        seconds = self.clock() - self.shown_at if self.shown_at is not None else 0.0
+        attempts = ATTEMPTS - self.attempts_left + (1 if points else 0)
+        self.results.append(QuestionResult(self.question.op, attempts, points, seconds))
+        self.question_index += 1
+        self.attempts_left = ATTEMPTS
+        self.shown_at = None
+
+    def grade(self, thresholds=GRADE_THRESHOLDS):
+        return get_grade(self.score, thresholds)
@@ -1,10 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import random
+import sys
+import time
 import threading
+import os
 import importlib
 from pathlib import Path
 
+from quiz_questions import QuestionGenerator, DIFFICULTIES
+from quiz_engine import QuizEngine, TOTAL_QUESTIONS, CORRECT, TRY_AGAIN, ATTEMPTS, FIRST_TRY_POINTS, SECOND_TRY_POINTS
+from quiz_results import ResultsStore
+
 mixer = None
 PYGAME_AUDIO_AVAILABLE = False
 
@@ -22,9 +29,7 @@ except ImportError:
     winsound = None
     WINSOUND_AVAILABLE = False
 
-# --- basic settings for the quiz ---
-TOTAL_QUESTIONS = 10
-
+# --- basic settings for the quiz (the rules themselves are in quiz_engine.py) ---
 BG_COLOR = "#edf1f8"
 CARD_BG = "#ffffff"
 SHADOW_COLOR = "#dbe4f4"
@@ -122,36 +127,30 @@ def init_styles():
         thickness=12,
     )
 
-# --- create the main window once and reuse it ---
-root = tk.Tk()
-root.title("Arithmetic Quiz")
-
 # Set a more universally fitting geometry and minsize to help with sizing and fitting
 WINDOW_WIDTH, WINDOW_HEIGHT = 600, 540
-root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
-root.minsize(WINDOW_WIDTH, WINDOW_HEIGHT)
-root.maxsize(WINDOW_WIDTH, WINDOW_HEIGHT)
-root.configure(bg=BG_COLOR)
-root.resizable(False, False)
 
-content_frame = tk.Frame(root, bg=BG_COLOR)
-content_frame.pack(fill="both", expand=True)
+# The main window, created once in main() and reused
+root = None
+content_frame = None
 
-init_styles()
-init_audio()
-
-# --- variables that change while the quiz runs ---
-score = 0
-question_index = 0
-current_answer = 0
-attempts_left = 2
-digits_setting = 1
+# --- the quiz that's running (score, question, tries left) ---
+# QUIZ_SEED makes every round repeatable (e.g. the same questions for a whole class)
+engine = QuizEngine(QuestionGenerator(int(os.environ["QUIZ_SEED"]) if os.environ.get("QUIZ_SEED") else None))
+# Every finished round is logged here (leaderboards are loaded in main)
+results_store = ResultsStore()
 
 answer_entry = None
 feedback_label = None
 submit_btn = None
 progressbar = None
 
+# The question screen is built once and kept: going to the next question only
+# changes texts, the progress value and the entry/button state (see
+# showQuestionScreen). Other screens hide it instead of destroying it.
+question_screen = None      # dict of the question screen's widgets once built
+next_question_id = None     # pending root.after for the next question
+
 # Short feedback messages
 good_words = ["Nice!", "Sweet!", "Good work!", "Boom!", "Way to go!"]
 try_again_words = ["Almost!", "Close one!", "Keep at it!", "You got this!"]
@@ -164,8 +163,15 @@ tip_lines = [
 ]
 
 def clearWindow():
+    global next_question_id
+    if next_question_id is not None:
+        root.after_cancel(next_question_id)
+        next_question_id = None
     for w in content_frame.winfo_children():
-        w.destroy()
+        if question_screen is not None and w is question_screen["shadow"]:
+            w.pack_forget()
+        else:
+            w.destroy()
 
 def bind_button_action(widget, command):
     def handle_click(_event):
@@ -208,8 +214,10 @@ def create_card(title, subtitle=None):
     header.pack(pady=(12, 3), anchor="n")
 
     tk.Label(header, text=title, font=(FONT, 25, "bold"), bg=CARD_BG, fg=PROBLEM_COLOR).pack()
+    shadow.subtitle_label = None
     if subtitle:
-        tk.Label(header, text=subtitle, font=(FONT, 12), bg=CARD_BG, fg=PROBLEM_COLOR).pack(pady=(3, 0))
+        shadow.subtitle_label = tk.Label(header, text=subtitle, font=(FONT, 12), bg=CARD_BG, fg=PROBLEM_COLOR)
+        shadow.subtitle_label.pack(pady=(3, 0))
 
     body = tk.Frame(card, bg=CARD_BG)
     body.pack(expand=1, fill="both", padx=20, pady=(0,10))
@@ -237,7 +245,7 @@ def displayMenu():
     makeButton("How to Play", showInstructions, parent=buttons_frame, width=22).pack(pady=(12, 0))
     info = tk.Label(
         body,
-        text="Each round has 10 questions. You get two tries per problem.",
+        text=f"Each round has {engine.total_questions} questions. You get two tries per problem.",
         font=(FONT, 11),
         bg=CARD_BG,
         fg=PROBLEM_COLOR,
@@ -246,53 +254,62 @@ def displayMenu():
     )
     info.pack(pady=(15, 6), fill="x")
 
-def randomInt(digits):
-    if digits == 1:
-        start = 0
-    else:
-        start = 10 ** (digits - 1)
-    end = 10 ** digits - 1
-    return random.randint(start, end)
-
-def decideOperation():
-    return random.choice(["+", "-"])
-
 def startQuiz(digits):
-    global digits_setting, score, question_index
-    digits_setting = digits
-    score = 0
-    question_index = 0
+    # All questions for the round are drawn at once, no repeats
+    engine.start(digits)
     displayProblem()
 
 def displayProblem():
-    global attempts_left, current_answer, answer_entry, feedback_label, submit_btn, progressbar
+    global next_question_id
+    next_question_id = None
 
-    if question_index >= TOTAL_QUESTIONS:
+    if engine.finished:
         displayResults()
         return
 
-    clearWindow()
-    attempts_left = 2
+    question = engine.question
+    showQuestionScreen(f"What is {question.num1} {question.op} {question.num2}?")
+    engine.question_shown()
+    root.after(80, lambda: play_sound("timer"))
 
-    num1 = randomInt(digits_setting)
-    num2 = randomInt(digits_setting)
-    op = decideOperation()
-    if op == "-" and num1 < num2:
-        num1, num2 = num2, num1
+def showQuestionScreen(question_text):
+    """Put the question screen up for the current question, building it the first time"""
+    for w in content_frame.winfo_children():
+        if question_screen is None or w is not question_screen["shadow"]:
+            w.destroy()     # the menu card, when coming from the menu
+    if question_screen is None:
+        buildQuestionScreen()
+    elif not question_screen["shadow"].winfo_manager():
+        # Hidden by the menu or results screen: bring the card back
+        question_screen["shadow"].pack(fill="both", expand=True, padx=20, pady=18)
+    updateQuestionScreen(question_text)
+
+def updateQuestionScreen(question_text):
+    """Only the parts of the question screen that change between questions"""
+    number = engine.question_index + 1
+    question_title = f"Question {number} of {engine.total_questions}"
+    question_screen["subtitle"].config(text=question_title)
+    question_screen["score_badge"].config(text=f"Score: {engine.score}")
+    question_screen["progress_label"].config(text=f"Progress {number}/{engine.total_questions}")
+    progressbar.config(maximum=engine.total_questions, value=number)
+    question_screen["question_lbl"].config(text=question_text)
+    answer_entry.config(state="normal")
+    answer_entry.delete(0, tk.END)
+    answer_entry.focus()
+    submit_btn.config(bg=BTN_COLOR, state="normal")
+    feedback_label.config(text="You get two shots.")
 
-    if op == "+":
-        current_answer = num1 + num2
-    else:
-        current_answer = num1 - num2
+def buildQuestionScreen():
+    """Create the question screen's widgets (once) and keep them in question_screen"""
+    global question_screen, answer_entry, feedback_label, submit_btn, progressbar
 
-    question_title = f"Question {question_index + 1} of {TOTAL_QUESTIONS}"
-    _, body = create_card("Solve the Problem", question_title)
+    shadow, body = create_card("Solve the Problem", "Question")
 
     top_strip = tk.Frame(body, bg=CARD_BG)
     top_strip.pack(fill="x", pady=(0, 4))
     score_badge = tk.Label(
         top_strip,
-        text=f"Score: {score}",
+        text="Score: 0",
         font=(FONT, 11, "bold"),
         bg="#eaf1ff",
         fg=PROBLEM_COLOR,
@@ -302,7 +319,7 @@ def displayProblem():
     score_badge.pack(side="left", padx=(0,4))
     attempts_badge = tk.Label(
         top_strip,
-        text="2 tries per question",
+        text=f"{ATTEMPTS} tries per question",
         font=(FONT, 9),
         bg=CARD_BG,
         fg="#506a92",
@@ -311,20 +328,18 @@ def displayProblem():
 
     progressbar_container = tk.Frame(body, bg=CARD_BG)
     progressbar_container.pack(pady=(0, 4), fill="x")
-    progress_str = f"Progress {question_index + 1}/{TOTAL_QUESTIONS}"
-    tk.Label(
+    progress_label = tk.Label(
         progressbar_container,
-        text=progress_str,
         font=(FONT, 10),
         bg=CARD_BG,
         fg=PROBLEM_COLOR,
         anchor="center"
-    ).pack(fill="x")
+    )
+    progress_label.pack(fill="x")
     progressbar = ttk.Progressbar(
         progressbar_container,
         length=320,
         maximum=TOTAL_QUESTIONS,
-        value=question_index + 1,
         mode="determinate",
         style="Quiz.Horizontal.TProgressbar",
     )
@@ -333,7 +348,6 @@ def displayProblem():
     # Place main question
     question_lbl = tk.Label(
         body,
-        text=f"What is {num1} {op} {num2}?",
         font=(FONT, 23, "bold"),
         bg=CARD_BG,
         fg=PROBLEM_COLOR,
@@ -357,7 +371,6 @@ def displayProblem():
         highlightcolor=BTN_COLOR,
     )
     answer_entry.pack(ipady=8, padx=4, fill="x", expand=True)
-    answer_entry.focus()
 
     # Submit Button
     submit_btn = tk.Label(
@@ -379,7 +392,6 @@ def displayProblem():
 
     feedback_label = tk.Label(
         body,
-        text="You get two shots.",
         font=(FONT, 11),
         bg=CARD_BG,
         fg=PROBLEM_COLOR,
@@ -424,13 +436,24 @@ def displayProblem():
     back_btn.bind("<Leave>", lambda e: back_btn.config(bg=back_btn.default_bg))
     bind_button_action(back_btn, displayMenu)
 
-    root.after(80, lambda: play_sound("timer"))
+    question_screen = {
+        "shadow": shadow,
+        "subtitle": shadow.subtitle_label,
+        "score_badge": score_badge,
+        "progress_label": progress_label,
+        "question_lbl": question_lbl,
+    }
 
-def isCorrect(user_answer):
-    return user_answer == current_answer
+def destroyQuestionScreen():
+    global question_screen
+    if question_screen is not None:
+        question_screen["shadow"].destroy()
+        question_screen = None
 
 def submitAnswer():
-    global attempts_left, score, question_index
+    global next_question_id
+    if next_question_id is not None:
+        return      # already answered - the next question is on its way
     guess = answer_entry.get().strip()
     if guess == "":
         feedback_label.config(text="Type something in.")
@@ -441,26 +464,20 @@ def submitAnswer():
         feedback_label.config(text="Numbers only please.")
         answer_entry.delete(0, tk.END)
         return
-    if isCorrect(user_value):
+    outcome = engine.submit(user_value)
+    if outcome.result == CORRECT:
         play_sound("check")
         answer_entry.config(state="disabled")
         submit_btn.config(bg="#4bb543")
         submit_btn.config(state="disabled")
-        if attempts_left == 2:
-            score += 10
-            feedback_label.config(text=random.choice(good_words) + " +10 points.")
-        else:
-            score += 5
-            feedback_label.config(text=random.choice(good_words) + " +5 points.")
-        question_index += 1
-        root.after(950, displayProblem)
+        feedback_label.config(text=f"{random.choice(good_words)} +{outcome.points} points.")
+        next_question_id = root.after(950, displayProblem)
     else:
         play_sound("wrong")
-        attempts_left -= 1
-        if attempts_left > 0:
-            tries_text = "try" if attempts_left == 1 else "tries"
+        if outcome.result == TRY_AGAIN:
+            tries_text = "try" if outcome.attempts_left == 1 else "tries"
             feedback_label.config(
-                text=f"{random.choice(try_again_words)} {attempts_left} {tries_text} left."
+                text=f"{random.choice(try_again_words)} {outcome.attempts_left} {tries_text} left."
             )
             answer_entry.delete(0, tk.END)
             submit_btn.config(bg=BTN_COLOR)
@@ -469,10 +486,9 @@ def submitAnswer():
             submit_btn.config(bg="#cf1b1b")
             submit_btn.config(state="disabled")
             feedback_label.config(
-                text=f"Answer: {current_answer}. {random.choice(done_words)}"
+                text=f"Answer: {outcome.answer}. {random.choice(done_words)}"
             )
-            question_index += 1
-            root.after(1200, displayProblem)
+            next_question_id = root.after(1200, displayProblem)
 
 def showTip():
     messagebox.showinfo("Quiz Tip", random.choice(tip_lines))
@@ -480,33 +496,34 @@ def showTip():
 def showInstructions():
     message = (
         "1. Pick a difficulty level to set the number size.\n"
-        "2. Answer 10 random addition or subtraction questions.\n"
-        "3. You get two tries per question: 10 points first try, 5 points second try.\n"
+        f"2. Answer {engine.total_questions} random addition or subtraction questions.\n"
+        f"3. You get two tries per question: {FIRST_TRY_POINTS} points first try, {SECOND_TRY_POINTS} points second try.\n"
         "4. If you miss twice, the correct answer pops up and you move on.\n"
         "5. Your final score and grade show at the end, and you can play again."
     )
     messagebox.showinfo("How to Play", message)
 
-def getGrade(total):
-    if total >= 95:
-        return "A+"
-    if total >= 85:
-        return "A"
-    if total >= 75:
-        return "B"
-    if total >= 65:
-        return "C"
-    if total >= 55:
-        return "D"
-    return "F"
+def saveResults():
+    """Log the finished round. Returns a line about its leaderboard place (or None)."""
+    try:
+        place = results_store.add_session(engine.digits, engine.score, engine.results)
+    except OSError as e:
+        print(f"Could not save results: {e}")
+        return None
+    label = DIFFICULTIES[engine.digits].label
+    if place is None:
+        best = results_store.leaderboard(engine.digits, 1)[0]
+        return f"Best {label} score so far: {best.score}"
+    return f"#{place} on the {label} leaderboard!"
 
 def displayResults():
     clearWindow()
-    grade = getGrade(score)
+    grade = engine.grade()
+    leaderboard_text = saveResults()
     _, body = create_card("Quiz Complete", "Here's how you did.")
     score_label = tk.Label(
         body,
-        text=f"Final Score: {score} / 100",
+        text=f"Final Score: {engine.score} / {engine.max_score}",
         font=(FONT, 16, "bold"),
         bg=CARD_BG,
         fg=PROBLEM_COLOR,
@@ -522,6 +539,14 @@ def displayResults():
         pady=6,
     )
     grade_badge.pack(pady=(0, 11))
+    if leaderboard_text:
+        tk.Label(
+            body,
+            text=leaderboard_text,
+            font=(FONT, 11),
+            bg=CARD_BG,
+            fg="#506a92",
+        ).pack()
     extra = ""
     if grade == "A+" or grade == "A":
         extra = "Amazing job!"
@@ -576,5 +601,61 @@ def displayResults():
     quit_btn.bind("<Leave>", lambda e: quit_btn.config(bg=quit_btn.default_bg))
     bind_button_action(quit_btn, root.destroy)
 
-displayMenu()
-root.mainloop()
\ No newline at end of file
+def measureTransitions(rounds=200):
+    """Time going to the next question (until Tk has laid the window out again):
+    rebuilding the whole card, as every question used to, against updating it in place."""
+    engine.start(2)
+    questions = engine.generator.round(2, rounds)
+    showQuestionScreen("What is 0 + 0?")
+    root.update()
+    results = {}
+    for name in ("rebuild", "reuse"):
+        times = []
+        for n in range(rounds):
+            engine.go_to(n % engine.total_questions)
+            q = questions[n]
+            text = f"What is {q.num1} {q.op} {q.num2}?"
+            start = time.perf_counter()
+            if name == "rebuild":
+                destroyQuestionScreen()
+            showQuestionScreen(text)
+            root.update_idletasks()
+            times.append(time.perf_counter() - start)
+        times.sort()
+        results[name] = times
+        print(f"{name:8} mean {sum(times) / len(times) * 1000:7.3f} ms   "
+              f"p95 {times[int(len(times) * 0.95)] * 1000:7.3f} ms   ({rounds} questions)")
+    speedup = sum(results["rebuild"]) / sum(results["reuse"])
+    print(f"Updating in place is {speedup:.1f}x faster per question.")
+
+def main():
+    global root, content_frame
+    # --- create the main window once and reuse it ---
+    root = tk.Tk()
+    root.title("Arithmetic Quiz")
+    root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
+    root.minsize(WINDOW_WIDTH, WINDOW_HEIGHT)
+    root.maxsize(WINDOW_WIDTH, WINDOW_HEIGHT)
+    root.configure(bg=BG_COLOR)
+    root.resizable(False, False)
+
+    content_frame = tk.Frame(root, bg=BG_COLOR)
+    content_frame.pack(fill="both", expand=True)
+
+    init_styles()
+    init_audio()
+    try:
+        results_store.load()
+    except OSError as e:
+        # e.g. a read-only results folder - the quiz still runs without history
+        print(f"Could not load results: {e}")
+
+    if "--measure-transitions" in sys.argv:
+        measureTransitions()
+        root.destroy()
+    else:
+        displayMenu()
+        root.mainloop()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,177 @@
+import sys
+import time
+import random
+import argparse
+from collections import namedtuple
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Question generation for the arithmetic quiz.
+#
+# Whole rounds (or big pools, for simulations and printed worksheets) are
+# drawn in one go. With NumPy every step is an array operation: operands,
+# operations, the swap that keeps subtraction from going negative, and the
+# answers. Questions in a round are made unique by packing each one into a
+# single integer key (first number, second number, operation) and keeping the
+# first occurrence of every key; any that were dropped are drawn again.
+# Without NumPy the same rules run with the random module, one question at a
+# time.
+#
+# A generator made with a seed always gives the same questions (for the same
+# backend - NumPy and random don't share a sequence).
+
+OPERATIONS = ("+", "-")
+
+Difficulty = namedtuple("Difficulty", "label digits")
+Question = namedtuple("Question", "num1 op num2 answer")
+
+# Keyed by number of digits, like digits_setting in quiz_gui.py. The quiz's
+# menu offers 1, 2 and 4; the others are there for worksheets and simulations.
+DIFFICULTIES = {
+    1: Difficulty("Easy", 1),
+    2: Difficulty("Moderate", 2),
+    3: Difficulty("Hard", 3),
+    4: Difficulty("Advanced", 4),
+    6: Difficulty("Expert", 6),
+    9: Difficulty("Extreme", 9),
+}
+MAX_DIGITS = 9               # keeps the packed question key inside 64 bits
+
+
+def operand_range(digits):
+    """Smallest and largest number with this many digits (1 digit includes 0)"""
+    if digits < 1 or digits > MAX_DIGITS:
+        raise ValueError(f"digits must be between 1 and {MAX_DIGITS}, not {digits}")
+    start = 0 if digits == 1 else 10 ** (digits - 1)
+    return start, 10 ** digits - 1
+
+
+def distinct_questions(digits):
+    """How many different questions there are at this setting (a round can't be bigger)"""
+    start, end = operand_range(digits)
+    n = end - start + 1
+    return n * n + n * (n + 1) // 2      # every sum, and every difference that isn't negative
+
+
+class QuestionGenerator:
+    def __init__(self, seed=None, use_numpy=NUMPY_AVAILABLE):
+        self.seed = seed
+        self.use_numpy = use_numpy and NUMPY_AVAILABLE
+        if self.use_numpy:
+            self.rng = np.random.default_rng(seed)
+        else:
+            self.rng = random.Random(seed)
+
+    def round(self, digits, count):
+        """count different questions, as a list of Question"""
+        if count > distinct_questions(digits):
+            raise ValueError(f"only {distinct_questions(digits)} different {digits}-digit questions exist")
+        if not self.use_numpy:
+            return self._round_fallback(digits, count)
+        num1, ops, num2, answers = self.batch(digits, count, unique=True)
+        return [Question(int(a), OPERATIONS[o], int(b), int(c))
+                for a, o, b, c in zip(num1.tolist(), ops.tolist(), num2.tolist(), answers.tolist())]
+
+    def batch(self, digits, count, unique=False):
+        """count questions as arrays (num1, operation index, num2, answer).
+        Duplicates are allowed unless unique is set. Needs NumPy."""
+        if not self.use_numpy:
+            raise RuntimeError("batch() needs NumPy - use round() instead")
+        num1, ops, num2 = self._draw(digits, count)
+        if unique:
+            num1, ops, num2 = self._unique(digits, count, num1, ops, num2)
+        answers = np.where(ops == 0, num1 + num2, num1 - num2)
+        return num1, ops, num2, answers
+
+    def _draw(self, digits, count):
+        start, end = operand_range(digits)
+        num1 = self.rng.integers(start, end + 1, size=count, dtype=np.int64)
+        num2 = self.rng.integers(start, end + 1, size=count, dtype=np.int64)
+        ops = self.rng.integers(0, len(OPERATIONS), size=count, dtype=np.int8)
+        # Subtraction never goes negative: put the bigger number first
+        swap = (ops == 1) & (num1 < num2)
+        num1[swap], num2[swap] = num2[swap], num1[swap]
+        return num1, ops, num2
+
+    def _unique(self, digits, count, num1, ops, num2):
+        span = 10 ** digits
+        while True:
+            keys = (num1 * span + num2) * len(OPERATIONS) + ops
+            _, first = np.unique(keys, return_index=True)
+            if len(first) == len(keys):
+                return num1, ops, num2
+            first.sort()                  # keep the round in the order it was drawn
+            more = self._draw(digits, count - len(first))
+            num1, ops, num2 = (np.concatenate([kept[first], extra])
+                               for kept, extra in zip((num1, ops, num2), more))
+
+    def _round_fallback(self, digits, count):
+        start, end = operand_range(digits)
+        questions = []
+        seen = set()
+        while len(questions) < count:
+            num1 = self.rng.randint(start, end)
+            num2 = self.rng.randint(start, end)
+            op = self.rng.choice(OPERATIONS)
+            if op == "-" and num1 < num2:
+                num1, num2 = num2, num1
+            if (num1, op, num2) in seen:
+                continue
+            seen.add((num1, op, num2))
+            questions.append(Question(num1, op, num2, num1 + num2 if op == "+" else num1 - num2))
+        return questions
+
+
+def print_worksheet(questions, with_answers=False, out=sys.stdout):
+    width = max(len(str(q.num1)) for q in questions)
+    for number, q in enumerate(questions, 1):
+        answer = f" {q.answer}" if with_answers else " ____"
+        print(f"{number:3}. {q.num1:>{width}} {q.op} {q.num2:>{width}} ={answer}", file=out)
+
+
+def measure_speed(digits, count, seed=None):
+    """Questions per second for a big batch, with and without the uniqueness step"""
+    generator = QuestionGenerator(seed)
+    if not generator.use_numpy:
+        count = min(count, distinct_questions(digits))
+        start = time.perf_counter()
+        generator.round(digits, count)
+        seconds = time.perf_counter() - start
+        print(f"random  {count:,} questions in {seconds:.3f}s = {count / seconds:,.0f} questions/s (no NumPy)")
+        return
+    for unique in (False, True):
+        start = time.perf_counter()
+        generator.batch(digits, count, unique=unique)
+        seconds = time.perf_counter() - start
+        label = "unique" if unique else "any"
+        print(f"{label:7} {count:,} questions in {seconds:.3f}s = {count / seconds:,.0f} questions/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print an arithmetic worksheet, or time the question generator.")
+    parser.add_argument("--digits", type=int, default=2, choices=sorted(DIFFICULTIES))
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=None, help="same seed, same worksheet")
+    parser.add_argument("--answers", action="store_true", help="print the answers too")
+    parser.add_argument("--speed", action="store_true", help="time a batch of --count questions instead")
+    args = parser.parse_args()
+
+    if args.speed:
+        measure_speed(args.digits, args.count, args.seed)
+        return
+    try:
+        questions = QuestionGenerator(args.seed).round(args.digits, args.count)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{DIFFICULTIES[args.digits].label} worksheet ({args.digits} digit)\n")
+    print_worksheet(questions, args.answers)
+
+
+if __name__ == "__main__":
+    main()
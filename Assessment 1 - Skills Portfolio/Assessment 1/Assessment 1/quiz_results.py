@@ -0,0 +1,375 @@
+import os
+import sys
+import json
+import time
+import heapq
+import struct
+import zlib
+import getpass
+import argparse
+from pathlib import Path
+from contextlib import contextmanager
+from collections import namedtuple
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:  # pragma: no cover - Windows only
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+from quiz_engine import QuestionResult
+from quiz_questions import OPERATIONS, DIFFICULTIES
+
+# History of finished quiz sessions, with leaderboards and accuracy figures.
+#
+# Every finished session is appended to a binary log (quiz_results.log) as
+# one record:
+#
+#   header   payload length (H) and CRC-32 of the payload (I)
+#   payload  finished_at (d), digits (B), questions (B), score (H),
+#            player name length (B), player name (UTF-8),
+#            then per question: operation (B), tries used (B), points (B),
+#            hundredths of a second taken (H)
+#
+# so a 10-question round takes about 80 bytes. A record cut short by a crash
+# (short, or with the wrong CRC) ends the log: it is ignored when reading and
+# cut off before the next append.
+#
+# Several quizzes may share one results folder. Appends hold a lock on the log
+# and first read any records other processes added since this store last
+# looked, so nothing of theirs is cut off and the counts stay complete.
+#
+# The log is never read to answer a query. The store keeps, in memory:
+#   - a top-N heap per difficulty (the leaderboards), and
+#   - running tallies per (digits, operation): questions, first-try, second-try,
+#     missed, total time - so accuracy per operation or per digit setting only
+#     adds up a handful of tallies, however long the history is.
+# Both are saved next to the log (quiz_results.summary) after every session,
+# together with how far into the log they go. At startup the summary is
+# loaded and only records after that point are read; without a usable summary
+# the whole log is replayed once.
+#
+# The files live in a per-user data folder (see results_dir), not next to the
+# code, so the quiz also works when installed read-only; QUIZ_RESULTS_DIR
+# picks another folder.
+
+
+def results_dir():
+    """Folder for the results log and summary: QUIZ_RESULTS_DIR if set, else per user"""
+    if os.environ.get("QUIZ_RESULTS_DIR"):
+        return Path(os.environ["QUIZ_RESULTS_DIR"])
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return Path(base) / 'skills_portfolio' / 'quiz_results'
+
+
+RESULTS_DIR = results_dir()
+LOG_NAME = "quiz_results.log"
+SUMMARY_NAME = "quiz_results.summary"
+SUMMARY_VERSION = 1
+TOP_N = 10
+
+RECORD_HEADER = struct.Struct("<HI")
+SESSION = struct.Struct("<dBBHB")
+QUESTION = struct.Struct("<BBBH")
+MAX_NAME_BYTES = 40
+
+SessionRecord = namedtuple("SessionRecord", "finished_at digits score player questions")
+# A leaderboard place. Higher score first, then less time, then the earlier session.
+LeaderboardEntry = namedtuple("LeaderboardEntry", "score seconds finished_at player")
+# Tries are counted per question: answered first try, second try, or missed
+Tally = namedtuple("Tally", "questions first_try second_try missed seconds")
+
+
+def encode_session(record):
+    name = record.player.encode("utf-8")[:MAX_NAME_BYTES].decode("utf-8", "ignore").encode("utf-8")
+    parts = [SESSION.pack(record.finished_at, record.digits, len(record.questions), record.score, len(name)), name]
+    for q in record.questions:
+        hundredths = min(0xFFFF, max(0, round(q.seconds * 100)))
+        parts.append(QUESTION.pack(OPERATIONS.index(q.op), q.attempts, q.points, hundredths))
+    payload = b"".join(parts)
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_session(payload):
+    finished_at, digits, count, score, name_length = SESSION.unpack_from(payload)
+    offset = SESSION.size
+    player = payload[offset:offset + name_length].decode("utf-8", "replace")
+    offset += name_length
+    questions = []
+    for op, attempts, points, hundredths in QUESTION.iter_unpack(payload[offset:offset + count * QUESTION.size]):
+        questions.append(QuestionResult(OPERATIONS[op], attempts, points, hundredths / 100))
+    return SessionRecord(finished_at, digits, score, player, questions)
+
+
+@contextmanager
+def locked(f):
+    """Hold an exclusive lock on an open file (where the platform has one)"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        yield
+
+
+def read_records(path, start=0):
+    """Yields (offset, record) for each whole record from start on. Stops at
+    the end of the file or at a damaged record; the generator's return value
+    is the offset where the good part of the log ends."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read()
+    pos = 0
+    while pos + RECORD_HEADER.size <= len(data):
+        length, crc = RECORD_HEADER.unpack_from(data, pos)
+        payload = data[pos + RECORD_HEADER.size:pos + RECORD_HEADER.size + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        yield start + pos, decode_session(payload)
+        pos += RECORD_HEADER.size + length
+    return start + pos
+
+
+class ResultsStore:
+    def __init__(self, folder=RESULTS_DIR, top_n=TOP_N):
+        self.folder = Path(folder)
+        self.log_path = self.folder / LOG_NAME
+        self.summary_path = self.folder / SUMMARY_NAME
+        self.top_n = top_n
+        self.loaded = False
+        self._reset()
+
+    def _reset(self):
+        self.leaderboards = {}     # digits -> min-heap of LeaderboardEntry (worst of the top N first)
+        self.tallies = {}          # (digits, op) -> [questions, first_try, second_try, missed, seconds]
+        self.sessions = {}         # digits -> [sessions, total score]
+        self.log_end = 0           # where the good part of the log ends
+        self.last_record_at = None
+
+    # --- loading ---
+
+    def load(self):
+        """Read the summary, then whatever the log has after it. Returns how many records were replayed."""
+        self._reset()
+        self.loaded = True
+        if not self.log_path.exists():
+            return 0
+        if not self._load_summary():
+            self._reset()
+        replayed = self._read_new_records()
+        if replayed:
+            self._save_summary()
+        return replayed
+
+    def _read_new_records(self):
+        """Count the records after log_end (from this or any other process)"""
+        replayed = 0
+        records = read_records(self.log_path, self.log_end)
+        try:
+            while True:
+                offset, record = next(records)
+                self._count(record)
+                self.last_record_at = offset
+                replayed += 1
+        except StopIteration as end:
+            self.log_end = end.value
+        return replayed
+
+    def _load_summary(self):
+        try:
+            with open(self.summary_path, encoding="utf-8") as f:
+                summary = json.load(f)
+            if summary["version"] != SUMMARY_VERSION or summary["log_end"] > self.log_path.stat().st_size:
+                return False
+            # The record the summary ends with must still be in the log, unchanged
+            if summary["last_record_at"] is not None:
+                with open(self.log_path, "rb") as f:
+                    f.seek(summary["last_record_at"])
+                    header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size or RECORD_HEADER.unpack(header)[1] != summary["last_crc"]:
+                    return False
+            self.leaderboards = {}
+            for d, entries in summary["leaderboards"].items():
+                board = [_HeapItem(LeaderboardEntry(*e)) for e in entries]
+                heapq.heapify(board)
+                self.leaderboards[int(d)] = board
+            self.tallies = {(int(key.split(" ")[0]), key.split(" ")[1]): counts
+                            for key, counts in summary["tallies"].items()}
+            self.sessions = {int(d): counts for d, counts in summary["sessions"].items()}
+            self.log_end = summary["log_end"]
+            self.last_record_at = summary["last_record_at"]
+            return True
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            return False
+
+    def _save_summary(self):
+        last_crc = None
+        if self.last_record_at is not None:
+            with open(self.log_path, "rb") as f:
+                f.seek(self.last_record_at)
+                last_crc = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))[1]
+        summary = {
+            "version": SUMMARY_VERSION,
+            "log_end": self.log_end,
+            "last_record_at": self.last_record_at,
+            "last_crc": last_crc,
+            "leaderboards": {str(d): [list(item.entry) for item in board] for d, board in self.leaderboards.items()},
+            "tallies": {f"{d} {op}": counts for (d, op), counts in self.tallies.items()},
+            "sessions": {str(d): counts for d, counts in self.sessions.items()},
+        }
+        tmp_path = self.summary_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f)
+        os.replace(tmp_path, self.summary_path)
+
+    # --- adding a session ---
+
+    def add_session(self, digits, score, questions, player=None, finished_at=None):
+        """Append a finished session to the log and count it. Returns its leaderboard
+        place at this difficulty (1 = best), or None if it didn't make the top N."""
+        if not self.loaded:
+            self.load()       # log_end must be known before appending
+        record = SessionRecord(finished_at or time.time(), digits, score,
+                               player if player is not None else default_player(), list(questions))
+        data = encode_session(record)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "ab") as f, locked(f):
+            # Whatever other quizzes appended since we last looked is counted
+            # first; only bytes after the last whole record are damaged
+            self._read_new_records()
+            f.seek(0, os.SEEK_END)
+            if f.tell() != self.log_end:
+                f.truncate(self.log_end)     # a record cut short by a crash
+            f.write(data)
+            f.flush()
+            self.last_record_at = self.log_end
+            self.log_end += len(data)
+            # Count what was written (times rounded to the log's hundredths), so the
+            # figures come out the same as when the log is replayed
+            entry = self._count(decode_session(data[RECORD_HEADER.size:]))
+            self._save_summary()
+        board = self.leaderboard(digits)
+        return board.index(entry) + 1 if entry in board else None
+
+    def _count(self, record):
+        seconds = sum(q.seconds for q in record.questions)
+        entry = LeaderboardEntry(record.score, round(seconds, 2), record.finished_at, record.player)
+        board = self.leaderboards.setdefault(record.digits, [])
+        # Min-heap: board[0] is the worst place on the board
+        item = _HeapItem(entry)
+        if len(board) < self.top_n:
+            heapq.heappush(board, item)
+        elif board[0] < item:
+            heapq.heapreplace(board, item)
+        sessions = self.sessions.setdefault(record.digits, [0, 0])
+        sessions[0] += 1
+        sessions[1] += record.score
+        for q in record.questions:
+            tally = self.tallies.setdefault((record.digits, q.op), [0, 0, 0, 0, 0.0])
+            tally[0] += 1
+            if q.points == 0:
+                tally[3] += 1
+            elif q.attempts == 1:
+                tally[1] += 1
+            else:
+                tally[2] += 1
+            tally[4] += q.seconds
+        return entry
+
+    # --- queries (none of them read the log) ---
+
+    def leaderboard(self, digits, n=None):
+        """Best sessions at this difficulty, best first"""
+        items = sorted(self.leaderboards.get(digits, []), key=lambda item: item.key, reverse=True)
+        return [item.entry for item in items[:n or self.top_n]]
+
+    def tally(self, op=None, digits=None):
+        """Tally over every question matching op and/or digits (None = any)"""
+        total = [0, 0, 0, 0, 0.0]
+        for (d, o), counts in self.tallies.items():
+            if (digits is None or d == digits) and (op is None or o == op):
+                total = [a + b for a, b in zip(total, counts)]
+        return Tally(*total)
+
+    def accuracy(self, op=None, digits=None):
+        """Share of questions answered (on either try), or None if there are none yet"""
+        tally = self.tally(op, digits)
+        if not tally.questions:
+            return None
+        return (tally.first_try + tally.second_try) / tally.questions
+
+    def average_score(self, digits):
+        sessions, total = self.sessions.get(digits, (0, 0))
+        return total / sessions if sessions else None
+
+
+class _HeapItem:
+    """A leaderboard entry ordered by its place (heapq needs <): a lower score,
+    then more time, then a later session is a worse place"""
+    __slots__ = ("key", "entry")
+
+    def __init__(self, entry):
+        self.key = (entry.score, -entry.seconds, -entry.finished_at)
+        self.entry = entry
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+def default_player():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return "player"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show quiz leaderboards and accuracy from the results log.")
+    parser.add_argument("--folder", default=RESULTS_DIR, help="folder holding quiz_results.log")
+    parser.add_argument("--top", type=int, default=TOP_N)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = ResultsStore(args.folder)
+    replayed = store.load()
+    print(f"Loaded in {(time.perf_counter() - start) * 1000:.1f} ms ({replayed} records read from the log)\n")
+
+    for digits in sorted(store.leaderboards):
+        label = DIFFICULTIES[digits].label if digits in DIFFICULTIES else f"{digits} digits"
+        print(f"{label} - average score {store.average_score(digits):.1f} over {store.sessions[digits][0]} sessions")
+        for place, e in enumerate(store.leaderboard(digits, args.top), 1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(e.finished_at))
+            print(f"  {place:2}. {e.score:3}  {e.seconds:7.1f}s  {e.player:<20} {when}")
+        print()
+
+    print("Accuracy       questions  answered  first try")
+    rows = [(f"{op} (all)", op, None) for op in OPERATIONS]
+    rows += [(f"{d} digit", None, d) for d in sorted(store.sessions)]
+    for name, op, digits in rows:
+        tally = store.tally(op, digits)
+        if tally.questions:
+            print(f"  {name:12} {tally.questions:9}  {store.accuracy(op, digits):8.1%}"
+                  f"  {tally.first_try / tally.questions:9.1%}")
+
+
+if __name__ == "__main__":
+    main()
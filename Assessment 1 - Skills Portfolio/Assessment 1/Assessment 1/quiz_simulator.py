@@ -0,0 +1,173 @@
+import os
+import time
+import random
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from quiz_engine import QuizEngine, TRY_AGAIN, GRADE_THRESHOLDS, get_grade
+from quiz_questions import QuestionGenerator, DIFFICULTIES
+
+# Monte-Carlo sessions of the arithmetic quiz, for tuning the difficulty
+# settings and the grade thresholds without anyone having to play.
+#
+# Each session is a real QuizEngine round answered by a simulated player:
+#
+#   fixed       - every answer is right with probability --accuracy
+#                 (times --retry on the second try)
+#   difficulty  - like fixed, but each digit past the first and every
+#                 subtraction make a right answer less likely
+#   mixed       - difficulty, with every session played by a different player
+#                 whose accuracy is drawn around --accuracy (beta distribution)
+#
+# Sessions are split into chunks that run in a process pool; every chunk gets
+# its own seed, so a run with --seed is repeatable. Workers only send back how
+# many sessions ended on each score, and grades are worked out from those
+# counts, so other thresholds can be tried (--thresholds) on the same scores.
+#
+#   python quiz_simulator.py --sessions 1000000 --digits 2 --model mixed --accuracy 0.8
+
+PLAYER_MODELS = ("fixed", "difficulty", "mixed")
+CHUNK_SESSIONS = 20000
+
+
+class SimulatedPlayer:
+    def __init__(self, model, accuracy, retry, digit_penalty, subtraction_penalty, spread, rng):
+        self.model = model
+        self.accuracy = accuracy
+        self.retry = retry                    # second-try accuracy, relative to the first
+        self.digit_penalty = digit_penalty
+        self.subtraction_penalty = subtraction_penalty
+        self.spread = spread                  # beta concentration: higher means players are more alike
+        self.rng = rng
+        self.skill = accuracy
+
+    def new_session(self):
+        if self.model == "mixed":
+            a = self.accuracy * self.spread
+            b = (1 - self.accuracy) * self.spread
+            self.skill = self.rng.betavariate(a, b)
+
+    def answers_correctly(self, question, digits, attempt):
+        chance = self.skill
+        if self.model != "fixed":
+            chance *= (1 - self.digit_penalty) ** (digits - 1)
+            if question.op == "-":
+                chance *= 1 - self.subtraction_penalty
+        if attempt > 1:
+            chance *= self.retry
+        return self.rng.random() < chance
+
+
+def simulate_chunk(task):
+    """Play task's sessions; returns a Counter of final scores"""
+    sessions, digits, seed, player_settings = task
+    engine = QuizEngine(QuestionGenerator(seed))
+    player = SimulatedPlayer(*player_settings, rng=random.Random(seed))
+    scores = Counter()
+    for _ in range(sessions):
+        engine.start(digits)
+        player.new_session()
+        while not engine.finished:
+            question = engine.question
+            attempt = 1
+            while True:
+                right = player.answers_correctly(question, digits, attempt)
+                outcome = engine.submit(question.answer if right else question.answer + 1)
+                if outcome.result != TRY_AGAIN:
+                    break
+                attempt += 1
+        scores[engine.score] += 1
+    return scores
+
+
+def simulate(sessions, digits, player_settings, workers=None, seed=None, chunk=CHUNK_SESSIONS):
+    """Counter of final scores over all sessions"""
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    tasks = []
+    for number, start in enumerate(range(0, sessions, chunk)):
+        tasks.append((min(chunk, sessions - start), digits, seed * 100003 + number, player_settings))
+    scores = Counter()
+    if workers == 1 or len(tasks) == 1:
+        for counts in map(simulate_chunk, tasks):
+            scores.update(counts)
+        return scores
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for counts in pool.map(simulate_chunk, tasks):
+            scores.update(counts)
+    return scores
+
+
+def percentile_of_counts(scores, total, percent):
+    wanted = total * percent / 100
+    seen = 0
+    for score in sorted(scores):
+        seen += scores[score]
+        if seen >= wanted:
+            return score
+    return max(scores)
+
+
+def describe(scores, thresholds, max_score):
+    total = sum(scores.values())
+    mean = sum(score * n for score, n in scores.items()) / total
+    variance = sum(n * (score - mean) ** 2 for score, n in scores.items()) / total
+    lines = [f"{total:,} sessions   mean {mean:.1f} / {max_score}   sd {variance ** 0.5:.1f}"]
+    lines.append("percentiles  " + "   ".join(
+        f"p{p} {percentile_of_counts(scores, total, p)}" for p in (10, 25, 50, 75, 90)))
+
+    lines.append("\nScore distribution")
+    biggest = max(scores.values())
+    for score in range(0, max_score + 1, 5):
+        n = scores.get(score, 0)
+        lines.append(f"  {score:3}  {n / total:6.1%}  {'#' * round(40 * n / biggest)}")
+
+    grades = Counter()
+    for score, n in scores.items():
+        grades[get_grade(score, thresholds)] += n
+    lines.append("\nGrades (" + ", ".join(f"{grade} >= {lowest}" for lowest, grade in thresholds) + ")")
+    for grade in [grade for _, grade in thresholds] + ["F"]:
+        lines.append(f"  {grade:2}  {grades.get(grade, 0) / total:6.1%}")
+    return "\n".join(lines)
+
+
+def parse_thresholds(text):
+    """'95,85,75,65,55' -> thresholds for A+, A, B, C, D"""
+    values = [int(v) for v in text.split(",")]
+    names = [grade for _, grade in GRADE_THRESHOLDS]
+    if len(values) != len(names) or values != sorted(values, reverse=True):
+        raise argparse.ArgumentTypeError(f"need {len(names)} falling scores, e.g. 95,85,75,65,55")
+    return tuple(zip(values, names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate quiz sessions and report score and grade distributions.")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--digits", type=int, default=1, choices=sorted(DIFFICULTIES))
+    parser.add_argument("--model", choices=PLAYER_MODELS, default="difficulty")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="chance of a right first answer")
+    parser.add_argument("--retry", type=float, default=0.7, help="second-try accuracy relative to the first")
+    parser.add_argument("--digit-penalty", type=float, default=0.05, help="accuracy lost per extra digit")
+    parser.add_argument("--sub-penalty", type=float, default=0.05, help="accuracy lost on subtraction")
+    parser.add_argument("--spread", type=float, default=8.0, help="mixed model: higher means players are more alike")
+    parser.add_argument("--thresholds", type=parse_thresholds, default=GRADE_THRESHOLDS,
+                        help="lowest scores for A+,A,B,C,D (default 95,85,75,65,55)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.model == "mixed" and not 0 < args.accuracy < 1:
+        parser.error("the mixed model needs --accuracy between 0 and 1")
+
+    player_settings = (args.model, args.accuracy, args.retry, args.digit_penalty, args.sub_penalty, args.spread)
+    start = time.perf_counter()
+    scores = simulate(args.sessions, args.digits, player_settings, args.workers, args.seed)
+    seconds = time.perf_counter() - start
+    print(f"{DIFFICULTIES[args.digits].label} ({args.digits} digit), {args.model} players, "
+          f"{args.workers or os.cpu_count()} worker(s): {seconds:.1f}s, "
+          f"{args.sessions / seconds:,.0f} sessions/s\n")
+    print(describe(scores, args.thresholds, QuizEngine().max_score))
+
+
+if __name__ == "__main__":
+    main()
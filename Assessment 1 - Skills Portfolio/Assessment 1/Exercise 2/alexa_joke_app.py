@@ -1,17 +1,20 @@
+import time
+_APP_START = time.perf_counter()   # for measuring time to first frame
 import tkinter as tk
 from tkinter import ttk
-import random
+import tkinter.font as tkfont
 import os
-import threading
-import subprocess
 import sys
+from joke_corpus import JokeCorpus, jokes_dir
+from joke_selection import JokeSelector, SELECTION_MODES
+from joke_watcher import CorpusWatcher
+from reveal_engine import RevealEngine
+from text_layout import LineWrapper
+from audio_worker import AudioWorker, BUTTON_SOUND, TYPING_SOUND
 
-# Try to import PIL for icon creation
-try:
-    from PIL import Image, ImageTk, ImageDraw
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
+# app_icons.py is shared by all the apps, one folder up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app_icons import set_app_icon
 
 # Try to import audio libraries
 try:
@@ -20,23 +23,32 @@ try:
 except ImportError:
     HAS_WINSOUND = False
 
-HAS_PYGAME = False
-pygame = None
-try:
-    import pygame
-    # Initialize pygame mixer with proper settings
-    pygame.mixer.pre_init(frequency=22050, size=-16, channels=2, buffer=512)
-    pygame.mixer.init()
-    HAS_PYGAME = True
-except (ImportError, Exception):
-    HAS_PYGAME = False
-    pygame = None
+# pygame is imported and its mixer started by the audio worker after the
+# window is up (see start_audio_warmup), so it doesn't delay the first frame.
+# Set ALEXA_TIMING=1 to print the startup timings.
+SHOW_TIMING = bool(os.environ.get("ALEXA_TIMING"))
+
+# How jokes are picked: 'shuffle' (no repeats until every joke was told),
+# 'weighted' (uses each joke's 'weight') or 'random'. Set a seed to replay a run.
+JOKE_SELECTION_MODE = os.environ.get("ALEXA_JOKE_MODE", "shuffle")
+if JOKE_SELECTION_MODE not in SELECTION_MODES:
+    print(f"Warning: unknown ALEXA_JOKE_MODE {JOKE_SELECTION_MODE!r}, using 'shuffle'")
+    JOKE_SELECTION_MODE = "shuffle"
+JOKE_SEED = int(os.environ["ALEXA_JOKE_SEED"]) if os.environ.get("ALEXA_JOKE_SEED") else None
+
+# Folder of joke files (.txt "setup? punchline", .jsonl or .tsv) - all of them are loaded
+JOKES_DIR = jokes_dir()
+
+WRAP_LENGTH = 500    # pixel width of the setup and punchline lines
+
+# How often the jokes folder is checked for edits (milliseconds, 0 = never)
+RELOAD_POLL_MS = int(os.environ.get("ALEXA_RELOAD_MS", "2000"))
 
 class AlexaJokeApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Alexa Joke App")
-        self.root.geometry("600x400")
+        self.root.geometry("600x460")
         self.root.resizable(False, False)
         
         # Set custom window icon
@@ -45,85 +57,70 @@ class AlexaJokeApp:
         # Set root window background color for card effect - calm blue-gray
         self.root.configure(bg='#f5f7fa')
         
-        # Load jokes from file
-        self.jokes = self.load_jokes()
+        # The jokes are loaded on a background thread once the watcher starts
+        # (see below); until corpus_reloaded swaps them in there are none
+        self.corpus = JokeCorpus([], [])
+        self.keyword_index = None
+        self.dedup_report = None
+        self.load_errors = []
+        self.jokes = self.corpus.jokes
+        self.selector = None
         self.current_joke = None
         self.current_setup = ""
         self.current_punchline = ""
-        self.punchline_animation_id = None
+        self.prefetched = None    # next joke, already picked and line-wrapped (see prefetch_next_joke)
+        self.punchline_animation_id = None  # Reveal handles from the reveal engine
         self.setup_animation_id = None
-        self.typing_sound_playing = False  # Track typing sound state for 1-second rule
-        self.typing_sound_end_timer = None # Keep reference to the timer
+        self.reveal_engine = RevealEngine(self.root)
+        # One audio thread for all sounds (it also stops typing sounds when a reveal ends)
+        self.audio = AudioWorker(winsound if HAS_WINSOUND else None)
+        self.first_frame_ms = None
+        self.audio_ready_ms = None
         
         # Setup sound file paths
         self.setup_sound_paths()
         
         # Create GUI elements
         self.create_widgets()
+
+        # Load the jokes folder (or the parsed cache if nothing changed) off the
+        # Tk thread, then pick up jokes added to it while the app is running
+        self.watcher = CorpusWatcher(self.root, JOKES_DIR, self.corpus, self.jokes_appended,
+                                     self.corpus_reloaded, RELOAD_POLL_MS)
+        self.watcher.start(load_first=True)
+
+        # Audio warm-up starts once the first frame is on screen
+        self.root.bind('<Map>', self._on_first_frame, add='+')
     
+    def _on_first_frame(self, event=None):
+        if self.first_frame_ms is not None:
+            return
+        self.root.update_idletasks()   # make sure the first frame is really drawn
+        self.first_frame_ms = (time.perf_counter() - _APP_START) * 1000
+        if SHOW_TIMING:
+            print(f"Time to first frame: {self.first_frame_ms:.0f} ms")
+        self.start_audio_warmup()
+
+    def start_audio_warmup(self):
+        """Start pygame and decode sounds in the background; clicks before then are silent."""
+        def on_ready(seconds):
+            # Runs on the audio thread - only record numbers here, no Tk calls
+            self.audio_ready_ms = (time.perf_counter() - _APP_START) * 1000
+            if SHOW_TIMING:
+                print(f"Audio ready: {self.audio_ready_ms:.0f} ms (warm-up took {seconds * 1000:.0f} ms)")
+        if not self.audio.warm_up(on_ready):
+            self.root.after(100, self.start_audio_warmup)   # queue was full - try again shortly
+
     def set_window_icon(self):
-        """Create and set a custom window icon for Alexa Joke App"""
-        try:
-            if HAS_PIL:
-                icon_path = os.path.join(os.path.dirname(__file__), "alexa_icon.ico")
-                
-                # Create icon file if it doesn't exist
-                if not os.path.exists(icon_path):
-                    # Create icon images in multiple sizes
-                    icon_images = []
-                    for size in [(16, 16), (32, 32), (48, 48), (64, 64)]:
-                        # Create an image with a blue background (matching app theme)
-                        img = Image.new('RGBA', size, color=(52, 152, 219, 255))  # #3498db
-                        draw = ImageDraw.Draw(img)
-                        
-                        # Draw a circle for the icon background
-                        margin = max(1, size[0] // 8)
-                        draw.ellipse([margin, margin, size[0]-margin, size[1]-margin], 
-                                   outline='white', width=max(1, size[0] // 16))
-                        
-                        # Draw "A" letter for Alexa in white
-                        try:
-                            from PIL import ImageFont
-                            font_size = max(8, size[0] // 2)
-                            draw.text((size[0]//2, size[1]//2), 'A', fill='white', 
-                                     anchor='mm', font=None)
-                        except:
-                            draw.text((size[0]//2, size[1]//2), 'A', fill='white', anchor='mm')
-                        
-                        icon_images.append(img)
-                    
-                    # Save as ICO file with multiple sizes
-                    icon_images[0].save(icon_path, format='ICO', sizes=[(img.width, img.height) for img in icon_images])
-                
-                # Set the icon using iconbitmap (best for Windows)
-                try:
-                    self.root.iconbitmap(icon_path)
-                except:
-                    # Fallback to iconphoto
-                    img = Image.open(icon_path)
-                    photo = ImageTk.PhotoImage(img)
-                    self.root.iconphoto(True, photo)
-                    self.icon_images = [photo]
-            else:
-                # Fallback: Try to use iconbitmap if icon file exists
-                icon_path = os.path.join(os.path.dirname(__file__), "alexa_icon.ico")
-                if os.path.exists(icon_path):
-                    try:
-                        self.root.iconbitmap(icon_path)
-                    except:
-                        pass
-        except Exception as e:
-            # If icon setting fails, continue without custom icon
-            pass
+        """Set the custom window icon (drawn once and cached per user - see app_icons.py)"""
+        fallback = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alexa_icon.ico")
+        self.icon_images = set_app_icon(self.root, 'alexa', (52, 152, 219, 255), 'A', fallback)  # #3498db
 
     def setup_sound_paths(self):
         """Setup paths to MP3 sound files"""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        sound_assets_dir = os.path.join(script_dir, 'sound assets')
-        
         # Use sound files from sound assets folder
-        self.button_click_sound = os.path.join(sound_assets_dir, 'button.mp3')
-        self.typing_sound = os.path.join(sound_assets_dir, 'typing.mp3')
+        self.button_click_sound = BUTTON_SOUND
+        self.typing_sound = TYPING_SOUND
         
         # Verify files exist
         if not os.path.exists(self.button_click_sound):
@@ -131,44 +128,34 @@ class AlexaJokeApp:
         if not os.path.exists(self.typing_sound):
             print(f"Warning: Typing sound not found at {self.typing_sound}")
         
-        # Preload sounds if pygame is available
-        self.button_sound_obj = None
-        self.typing_sound_obj = None
-        if HAS_PYGAME:
-            try:
-                if os.path.exists(self.button_click_sound):
-                    self.button_sound_obj = pygame.mixer.Sound(self.button_click_sound)
-                if os.path.exists(self.typing_sound):
-                    self.typing_sound_obj = pygame.mixer.Sound(self.typing_sound)
-            except Exception as e:
-                print(f"Error loading sounds: {e}")
-        
-    def load_jokes(self):
-        """Load jokes from randomJokes.txt file"""
-        jokes = []
-        try:
-            # Get the directory where this script is located
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            jokes_file = os.path.join(script_dir, 'resources', 'randomJokes.txt')
-            with open(jokes_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    # Find the first question mark
-                    q_index = line.find('?')
-                    if q_index != -1:
-                        setup = line[:q_index + 1].strip()
-                        punchline = line[q_index + 1:].strip()
-                        jokes.append({'setup': setup, 'punchline': punchline})
-                    else:
-                        # If no question mark, treat entire line as setup
-                        jokes.append({'setup': line, 'punchline': ''})
-        except FileNotFoundError:
-            print("Error: randomJokes.txt not found!")
-            return []
-        return jokes
-    
+        # Decoding happens later on the audio thread (see start_audio_warmup)
+        self.audio.set_sound('button', self.button_click_sound)
+        self.audio.set_sound('typing', self.typing_sound)
+
+    def jokes_appended(self, new_jokes, errors):
+        """Watcher added jokes to the end of the corpus (keyword index already updated)"""
+        self.jokes = self.corpus.jokes
+        if self.selector is None:
+            self.selector = JokeSelector(self.jokes, JOKE_SELECTION_MODE, seed=JOKE_SEED)
+        else:
+            self.selector.jokes_added(self.jokes)
+        print(f"Added {len(new_jokes)} new joke(s), {len(self.jokes)} in total")
+
+    def corpus_reloaded(self, corpus):
+        """Watcher loaded or rebuilt the whole corpus - swap it in. The joke being shown
+        keeps its text."""
+        self.corpus = corpus
+        self.keyword_index = corpus.keyword_index
+        self.dedup_report = corpus.dedup_report
+        self.load_errors = corpus.load_errors
+        self.jokes = corpus.jokes
+        self.selector = JokeSelector(self.jokes, JOKE_SELECTION_MODE, seed=JOKE_SEED) if self.jokes else None
+        self.prefetched = None
+        state = 'normal' if self.keyword_index is not None else 'disabled'
+        self.about_entry.config(state=state)
+        self.about_btn.config(state=state)
+        print(f"Jokes reloaded: {len(self.jokes)} jokes")
+
     def create_widgets(self):
         """Create and arrange GUI widgets"""
         # Configure root window to center content
@@ -207,24 +194,48 @@ class AlexaJokeApp:
             style='Accent.TButton'
         )
         self.tell_joke_btn.grid(row=1, column=0, pady=10)
-        
+
+        # Keyword request row: "tell me a joke about ..."
+        about_frame = tk.Frame(main_frame, bg='#ffffff')
+        about_frame.grid(row=2, column=0, pady=(0, 5))
+        self.about_entry = ttk.Entry(about_frame, width=28, font=('Arial', 11))
+        self.about_entry.grid(row=0, column=0, padx=5)
+        self.about_entry.bind('<Return>', lambda e: self.tell_joke_about_with_sound())
+        self.about_btn = ttk.Button(
+            about_frame,
+            text="Joke About...",
+            command=self.tell_joke_about_with_sound,
+            width=14
+        )
+        self.about_btn.grid(row=0, column=1, padx=5)
+        self.add_hover_effect(self.about_btn)
+        if self.keyword_index is None:
+            self.about_entry.config(state='disabled')
+            self.about_btn.config(state='disabled')
+        
+        # Fonts of the joke labels, also used to pre-wrap their text (see prepare_joke)
+        self.setup_font = tkfont.Font(root=self.root, family='Arial', size=12)
+        self.punchline_font = tkfont.Font(root=self.root, family='Arial', size=12, slant='italic')
+        self.setup_wrapper = LineWrapper(self.setup_font, WRAP_LENGTH)
+        self.punchline_wrapper = LineWrapper(self.punchline_font, WRAP_LENGTH)
+
         # Label for joke setup - dark text for readability
         self.setup_label = tk.Label(main_frame, text="", 
-                                     font=('Arial', 12),
-                                     wraplength=500, justify='center',
+                                     font=self.setup_font,
+                                     wraplength=WRAP_LENGTH, justify='center',
                                      bg='#ffffff', fg='#34495e')
-        self.setup_label.grid(row=2, column=0, pady=20, padx=10)
+        self.setup_label.grid(row=3, column=0, pady=20, padx=10)
         
         # Label for punchline - calm teal accent color
         self.punchline_label = tk.Label(main_frame, text="", 
-                                         font=('Arial', 12, 'italic'),
-                                         wraplength=500, justify='center',
+                                         font=self.punchline_font,
+                                         wraplength=WRAP_LENGTH, justify='center',
                                          foreground='#16a085', bg='#ffffff')
-        self.punchline_label.grid(row=3, column=0, pady=10, padx=10)
+        self.punchline_label.grid(row=4, column=0, pady=10, padx=10)
         
         # Button frame for action buttons
         button_frame = tk.Frame(main_frame, bg='#ffffff')
-        button_frame.grid(row=4, column=0, pady=20)
+        button_frame.grid(row=5, column=0, pady=20)
         
         # Show punchline button (should play button mp3)
         self.show_punchline_btn = ttk.Button(
@@ -296,6 +307,11 @@ class AlexaJokeApp:
         self.play_button_click()
         self.tell_joke(play_typing=True)
     
+    def tell_joke_about_with_sound(self):
+        """Play button sound, then tell a joke matching the keyword box"""
+        self.play_button_click()
+        self.tell_joke(play_typing=True, about=self.about_entry.get())
+
     def show_punchline_with_sound(self):
         """Play button sound, then show punchline"""
         self.play_button_click()
@@ -309,33 +325,48 @@ class AlexaJokeApp:
     def quit_with_sound(self):
         """Play button sound, then quit app (with a short delay to let it play)"""
         self.play_button_click()
+        self.audio.shutdown()
         self.root.after(160, self.root.quit)  # ~150-170ms matches button.mp3 demo sounds length
 
-    def tell_joke(self, play_typing=False):
-        """Select a random joke and display the setup. Optionally, play typing sound when revealing setup."""
+    def tell_joke(self, play_typing=False, about=None):
+        """Select a random joke and display the setup. Optionally, play typing sound when revealing setup.
+        If about is given, pick a random joke containing those keywords."""
         if not self.jokes:
-            self.setup_label.config(text="No jokes available!", bg='#ffffff')
+            loading = self.watcher.rebuilding is not None
+            self.setup_label.config(text="Loading jokes..." if loading else "No jokes available!", bg='#ffffff')
             return
         
-        # Select random joke
-        self.current_joke = random.choice(self.jokes)
-        self.current_setup = self.current_joke['setup']
-        self.current_punchline = self.current_joke['punchline']
-        
-        # Clear labels
-        self.setup_label.config(text="")
-        self.punchline_label.config(text="")
+        if about and about.strip() and self.keyword_index is not None:
+            number = self.keyword_index.random_match(about, self.selector.rng)
+            if number is None:
+                self.reveal_engine.cancel_all()
+                self.setup_label.config(text=f"Sorry, I don't know a joke about \"{about.strip()}\".", height=0)
+                self.punchline_label.config(text="", height=0)
+                self.current_punchline = ""
+                self.show_punchline_btn.config(state='disabled')
+                return
+            prepared = self.prepare_joke(self.jokes[number])
+        else:
+            # The next joke (shuffle-bag by default, so no quick repeats) was
+            # normally already picked and wrapped while the last one was shown
+            prepared = self.prefetched or self.prepare_joke(self.selector.next_joke())
+            self.prefetched = None
+        self.current_joke = prepared['joke']
+        self.current_setup = prepared['setup']
+        self.current_punchline = prepared['punchline']
+        
+        # Clear labels, sized for the final text so they don't grow during the reveal
+        self.setup_label.config(text="", height=prepared['setup_lines'])
+        self.punchline_label.config(text="", height=prepared['punchline_lines'])
         
         # Cancel any ongoing animations
-        if self.punchline_animation_id:
-            self.root.after_cancel(self.punchline_animation_id)
-            self.punchline_animation_id = None
-        if self.setup_animation_id:
-            self.root.after_cancel(self.setup_animation_id)
-            self.setup_animation_id = None
+        self.reveal_engine.cancel(self.punchline_animation_id)
+        self.punchline_animation_id = None
+        self.reveal_engine.cancel(self.setup_animation_id)
+        self.setup_animation_id = None
         
         # Also, stop typing sound if punchline was revealing before (edge case)
-        self._stop_typing_sound_after_1s()
+        self._stop_typing_sound()
         
         # Start progressive reveal for setup, and play typing if asked
         if play_typing:
@@ -346,6 +377,24 @@ class AlexaJokeApp:
         # Enable buttons
         self.show_punchline_btn.config(state='normal')
         self.next_joke_btn.config(state='normal')
+
+        # Get the following joke ready once this frame is done
+        self.root.after_idle(self.prefetch_next_joke)
+
+    def prepare_joke(self, joke):
+        """Joke with its setup and punchline already broken into label-width lines"""
+        setup, setup_lines = self.setup_wrapper.layout(joke['setup'])
+        if joke['punchline']:
+            punchline, punchline_lines = self.punchline_wrapper.layout(joke['punchline'])
+        else:
+            punchline, punchline_lines = "", 1
+        return {'joke': joke, 'setup': setup, 'setup_lines': setup_lines,
+                'punchline': punchline, 'punchline_lines': punchline_lines}
+
+    def prefetch_next_joke(self):
+        """Pick and lay out the next joke now, so Next Joke only has to start the reveal"""
+        if self.prefetched is None and self.jokes:
+            self.prefetched = self.prepare_joke(self.selector.next_joke())
     
     def show_punchline(self):
         """Display the punchline of the current joke with progressive reveal"""
@@ -358,147 +407,41 @@ class AlexaJokeApp:
             self.punchline_label.config(text="(No punchline available)")
 
     def progressive_reveal_setup(self, full_text, index, play_typing=False):
-        """Reveal setup character by character. If play_typing, play typing sound with each char."""
-        if index <= len(full_text):
-            # Display substring up to current index
-            self.setup_label.config(text=full_text[:index])
-            # Play typing sound for each character (skip spaces/punct if you want)
-            if play_typing and index > 0 and index <= len(full_text) and full_text[index - 1] not in ' \t\n.,!?;:':
-                self.play_typing_sound()
-            # Schedule next character reveal
-            self.setup_animation_id = self.root.after(
-                30, lambda: self.progressive_reveal_setup(full_text, index + 1, play_typing=play_typing)
-            )
-        else:
-            self.setup_animation_id = None
+        """Reveal setup character by character. If play_typing, play typing sound as chars appear."""
+        if play_typing:
+            self.play_typing_sound('setup', full_text, index, first_char_now=True)
+        self.setup_animation_id = self.reveal_engine.animate(
+            self.setup_label, full_text, start_index=index, first_char_now=True
+        )
 
     def progressive_reveal_punchline(self, full_text, index):
         """Reveal punchline character by character with typing sound"""
-        if index <= len(full_text):
-            # Display substring up to current index
-            self.punchline_label.config(text=full_text[:index])
-            # Play typing sound for each character (skip spaces and punctuation for subtlety)
-            if index > 0 and index <= len(full_text) and full_text[index - 1] not in ' \t\n.,!?;:':
-                self.play_typing_sound()
-            # Schedule next character reveal
-            self.punchline_animation_id = self.root.after(30, 
-                lambda: self.progressive_reveal_punchline(full_text, index + 1))
-        else:
-            self.punchline_animation_id = None
-            # Stop the typing sound after the final punchline character is shown (and 1s has elapsed)
-            self._stop_typing_sound_after_1s()
-    
+        # The typing audio is made to the reveal's length, so it ends by itself
+        self.play_typing_sound('punchline', full_text, index)
+        self.punchline_animation_id = self.reveal_engine.animate(
+            self.punchline_label, full_text, start_index=index
+        )
+
     def play_button_click(self):
         """Play a short, clean UI sound for button clicks"""
-        def _play():
-            if not os.path.exists(self.button_click_sound):
-                return
-            
-            # Try pygame first
-            if HAS_PYGAME:
-                try:
-                    if self.button_sound_obj:
-                        self.button_sound_obj.play()
-                        return
-                    else:
-                        sound = pygame.mixer.Sound(self.button_click_sound)
-                        sound.play()
-                        return
-                except Exception as e:
-                    print(f"Pygame error: {e}")
-            
-            # Fallback: Use subprocess to play MP3 (Windows)
-            if sys.platform == 'win32':
-                try:
-                    # Try using start command (Windows)
-                    subprocess.Popen(['start', '/min', self.button_click_sound], 
-                                   shell=True, stdout=subprocess.DEVNULL, 
-                                   stderr=subprocess.DEVNULL)
-                except Exception:
-                    try:
-                        # Alternative: use os.startfile
-                        os.startfile(self.button_click_sound)
-                    except Exception:
-                        pass
-        
-        # Play in a separate thread to avoid blocking
-        threading.Thread(target=_play, daemon=True).start()
+        self.audio.play('button')
 
-    def play_typing_sound(self):
-        """Play a subtle text-typing sound synchronized with character reveal
-        But ensure the typing sound finishes/gets stopped after 1 second from the last play trigger.
+    def play_typing_sound(self, key, full_text, index=0, first_char_now=False):
+        """Play a subtle text-typing sound synchronized with character reveal.
+        The audio worker times every click for the whole reveal up front
+        (spaces and punctuation stay silent).
         """
-        def _play():
-            if not os.path.exists(self.typing_sound):
-                return
-
-            # Only play typing sound if one isn't already 'ongoing'
-            if not self.typing_sound_playing:
-                self.typing_sound_playing = True
-
-                # Try pygame first
-                if HAS_PYGAME:
-                    try:
-                        if self.typing_sound_obj:
-                            channel = self.typing_sound_obj.play()
-                        else:
-                            sound = pygame.mixer.Sound(self.typing_sound)
-                            channel = sound.play()
-                        # No need to block
-                    except Exception as e:
-                        print(f"Pygame error: {e}")
-                # Fallback: Use subprocess to play MP3 (Windows)
-                elif sys.platform == 'win32':
-                    try:
-                        subprocess.Popen(['start', '/min', self.typing_sound], 
-                                       shell=True, stdout=subprocess.DEVNULL, 
-                                       stderr=subprocess.DEVNULL)
-                    except Exception:
-                        try:
-                            os.startfile(self.typing_sound)
-                        except Exception:
-                            pass
-
-                # After 1 second, stop the typing sound
-                if self.typing_sound_end_timer:
-                    self.root.after_cancel(self.typing_sound_end_timer)
-                self.typing_sound_end_timer = self.root.after(1000, self._stop_typing_sound)
-            else:
-                # Typing sound is already playing, but reset the 1-second timer
-                if self.typing_sound_end_timer:
-                    self.root.after_cancel(self.typing_sound_end_timer)
-                self.typing_sound_end_timer = self.root.after(1000, self._stop_typing_sound)
-
-        # Start _play in background so as not to block UI
-        threading.Thread(target=_play, daemon=True).start()
+        self.audio.type_text(key, full_text, self.reveal_engine.char_ms, index, first_char_now)
 
     def _stop_typing_sound(self):
-        """Stop the typing sound, called after 1 second, or forcibly when next joke is shown."""
-        # Stop pygame channel if possible
-        if HAS_PYGAME:
-            try:
-                pygame.mixer.stop()
-            except Exception:
-                pass
-        # Set state so it can be triggered again
-        self.typing_sound_playing = False
-        self.typing_sound_end_timer = None
-
-    def _stop_typing_sound_after_1s(self):
-        """Convenience: forcibly stop typing sound and clear any existing 1s timer."""
-        if self.typing_sound_end_timer:
-            self.root.after_cancel(self.typing_sound_end_timer)
-            self.typing_sound_end_timer = None
-        self._stop_typing_sound()
+        """Forcibly stop the typing sound (e.g. when the next joke is shown)."""
+        self.audio.stop_typing()
 
     def play_beep(self):
         """Play a beep sound when punchline appears (Windows only)"""
         if HAS_WINSOUND:
-            try:
-                winsound.Beep(800, 200)  # Frequency 800Hz, duration 200ms
-            except Exception:
-                pass  # Silently fail if beep doesn't work
-    
+            self.audio.beep(800, 200)  # Frequency 800Hz, duration 200ms
+
     def add_hover_effect(self, button):
         """Add hover effect to a button using Enter/Leave events"""
         def on_enter(event):
@@ -513,7 +456,7 @@ class AlexaJokeApp:
     def next_joke(self, play_typing=False):
         """Get another random joke. Optionally, play typing sound for the setup reveal."""
         # Also, stop typing sound so it doesn't linger when going to next joke.
-        self._stop_typing_sound_after_1s()
+        self._stop_typing_sound()
         self.tell_joke(play_typing=play_typing)
 
 def main():
@@ -0,0 +1,219 @@
+import os
+import sys
+import time
+import queue
+import threading
+import subprocess
+import importlib.util
+
+from sound_cache import load_sound
+
+# One long-lived audio thread for the joke app.
+#
+# The Tk side only drops small commands into a bounded queue; this thread does
+# all the playing and stopping, and never touches Tk.
+#
+# Typing audio is asked for once per reveal (type_text), not per character.
+# With NumPy the worker renders the whole reveal's clicks as one buffer
+# (typing_synth.py), each click on the sample where its character appears,
+# and plays it on a reserved channel of its own - setup and punchline each
+# have one, so stopping typing never cuts off a button sound. The time spent
+# in the queue is cut off the front of the buffer, so the audio stays lined
+# up with the text. Without NumPy the typing MP3 is looped on the same
+# channel and stopped TYPING_HOLD_SECONDS after the reveal ends. Without
+# pygame, Windows plays the typing MP3 once per reveal through the shell.
+#
+# pygame itself is imported, initialised and the sounds decoded on this thread
+# too (warm_up), after the window is already on screen. Decoded samples come
+# from the PCM cache (sound_cache.py) after the first run. Until warm-up
+# finishes, sound requests are simply skipped.
+
+TYPING_HOLD_SECONDS = 1.0     # MP3 fallback: keep typing audio going this long after the reveal
+TYPING_CHANNELS = {'setup': 0, 'punchline': 1}   # reserved pygame channels
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+QUEUE_SIZE = 32
+STALE_SECONDS = 0.25          # a click that waited longer than this (e.g. behind warm-up) is dropped
+MIXER_SETTINGS = dict(frequency=22050, size=-16, channels=2, buffer=512)
+
+# The app's sounds, named exactly as on disk (case matters off Windows)
+SOUND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sound assets')
+BUTTON_SOUND = os.path.join(SOUND_DIR, 'button.mp3')
+TYPING_SOUND = os.path.join(SOUND_DIR, 'typing.MP3')
+
+
+class AudioWorker:
+    def __init__(self, winsound_module=None):
+        self.pygame = None
+        self.winsound = winsound_module
+        self.ready = False        # True once warm_up has finished (with or without pygame)
+        self.warmup_seconds = None
+        self.sounds = {}          # name -> pygame Sound
+        self.paths = {}           # name -> file path, for the non-pygame fallback
+        self.commands = queue.Queue(maxsize=QUEUE_SIZE)
+        self.synth = None         # TypingSynth, once pygame is up (needs NumPy)
+        self.typing_until = {}    # channel key -> when to stop the looped MP3 (fallback only)
+        self.thread = threading.Thread(target=self._run, name="audio-worker", daemon=True)
+        self.thread.start()
+
+    # --- called from the Tk thread ---
+
+    def set_sound(self, name, path):
+        """Register a sound file. It is decoded during warm_up."""
+        self.paths[name] = path
+
+    def warm_up(self, on_ready=None):
+        """Start pygame and decode the registered sounds on the audio thread.
+        on_ready(seconds) is called from the audio thread when done.
+        Returns False if the queue was full and the request was dropped."""
+        return self._send(('warmup', on_ready))
+
+    def _send(self, command):
+        try:
+            self.commands.put_nowait(command)
+            return True
+        except queue.Full:
+            return False    # audio is best effort - never block the UI for it
+
+    def play(self, name):
+        self._send(('play', (name, time.monotonic())))
+
+    def type_text(self, key, text, char_ms, start_index=0, first_char_now=False):
+        """Typing sound for a whole reveal (as RevealEngine.animate will show it).
+        key is 'setup' or 'punchline' and picks the channel; a new reveal replaces the old one."""
+        self._send(('type_text', (key, text, char_ms, start_index, first_char_now, time.monotonic())))
+
+    def stop_typing(self):
+        self._send(('stop_typing', None))
+
+    def beep(self, frequency=800, duration_ms=200):
+        self._send(('beep', (frequency, duration_ms)))
+
+    def shutdown(self):
+        """Ask the audio thread to stop (it is a daemon, so a dropped request
+        only means it stops with the process)"""
+        return self._send(('quit', None))
+
+    # --- audio thread ---
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self.typing_until:
+                timeout = max(0.0, min(self.typing_until.values()) - time.monotonic())
+            try:
+                command, arg = self.commands.get(timeout=timeout)
+            except queue.Empty:
+                self._stop_finished_typing()
+                continue
+            if command == 'quit':
+                self._stop_typing()
+                return
+            if command == 'warmup':
+                self._warm_up(arg)
+                continue
+            if not self.ready:
+                continue        # not warmed up yet: skip the sound rather than wait
+            try:
+                if command == 'play':
+                    name, requested = arg
+                    if time.monotonic() - requested <= STALE_SECONDS:
+                        self._play(name)
+                elif command == 'type_text':
+                    self._type_text(*arg)
+                elif command == 'stop_typing':
+                    self._stop_typing()
+                elif command == 'beep' and self.winsound is not None:
+                    self.winsound.Beep(*arg)
+            except Exception as e:
+                print(f"Audio error: {e}")
+
+    def _warm_up(self, on_ready):
+        start = time.monotonic()
+        try:
+            import pygame
+            pygame.mixer.pre_init(**MIXER_SETTINGS)
+            pygame.mixer.init()
+            pygame.mixer.set_reserved(len(TYPING_CHANNELS))
+            self.pygame = pygame
+            frequency, size, channels = pygame.mixer.get_init()
+            if HAS_NUMPY and size == -16:
+                from typing_synth import TypingSynth
+                self.synth = TypingSynth(frequency, channels)
+            for name, path in self.paths.items():
+                if os.path.exists(path):
+                    self.sounds[name] = load_sound(pygame, path)
+        except ImportError:
+            self.pygame = None
+        except Exception as e:
+            print(f"Error loading sounds: {e}")
+            self.pygame = None
+        self.warmup_seconds = time.monotonic() - start
+        self.ready = True
+        if on_ready:
+            on_ready(self.warmup_seconds)
+
+    def _play(self, name):
+        """Play a sound, returning its pygame channel if there is one"""
+        sound = self.sounds.get(name)
+        if sound is not None:
+            return sound.play()
+        path = self.paths.get(name)
+        if not path or not os.path.exists(path):
+            return None
+        if self.pygame is not None:
+            sound = self.pygame.mixer.Sound(path)
+            self.sounds[name] = sound
+            return sound.play()
+        # Fallback: Use subprocess to play MP3 (Windows)
+        if sys.platform == 'win32':
+            try:
+                subprocess.Popen(['start', '/min', path], shell=True,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except Exception:
+                try:
+                    os.startfile(path)
+                except Exception:
+                    pass
+        return None
+
+    def _type_text(self, key, text, char_ms, start_index, first_char_now, requested):
+        if self.pygame is None:
+            # No pygame: on Windows start the typing MP3 in the default player,
+            # as the app always did (it plays to its end - it can't be stopped)
+            self._play('typing')
+            return
+        channel = self.pygame.mixer.Channel(TYPING_CHANNELS[key])
+        channel.stop()
+        self.typing_until.pop(key, None)
+        late = time.monotonic() - requested
+        if self.synth is not None:
+            samples = self.synth.render(text, char_ms, start_index, first_char_now, skip_seconds=late)
+            if samples is not None:
+                channel.play(self.pygame.mixer.Sound(buffer=samples.tobytes()))
+            return
+        # No NumPy: loop the typing MP3 until the reveal is over (plus the hold)
+        sound = self.sounds.get('typing')
+        if sound is None:
+            return
+        steps = len(text) - start_index - (1 if first_char_now else 0)
+        channel.play(sound, loops=-1)
+        self.typing_until[key] = time.monotonic() - late + steps * char_ms / 1000 + TYPING_HOLD_SECONDS
+
+    def _stop_finished_typing(self):
+        now = time.monotonic()
+        for key, until in list(self.typing_until.items()):
+            if until <= now:
+                self._stop_typing_channel(key)
+
+    def _stop_typing(self):
+        # Only the reserved typing channels - button clicks keep playing
+        for key in TYPING_CHANNELS:
+            self._stop_typing_channel(key)
+
+    def _stop_typing_channel(self, key):
+        self.typing_until.pop(key, None)
+        if self.pygame is not None:
+            try:
+                self.pygame.mixer.Channel(TYPING_CHANNELS[key]).stop()
+            except Exception:
+                pass
@@ -0,0 +1,458 @@
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+
+from joke_sources import read_joke_sources
+from joke_corpus import load_corpus
+from joke_index import open_lazy_corpus
+from joke_selection import JokeSelector
+from reveal_engine import RevealEngine
+from audio_worker import AudioWorker, TYPING_SOUND
+
+# Benchmarks for the joke app's hot paths.
+#
+#   parse    - read_joke_sources on synthetic corpora (jokes/s, MB/s), the
+#              full load_corpus (parse + dedup + keyword index + cache write)
+#              and the cached reload, and lazy indexing of the text file
+#   select   - JokeSelector.next_index in each mode
+#   reveal   - RevealEngine frames, each reveal's typing audio asked of a
+#              real, warmed-up AudioWorker: CPU time per frame, frame-interval
+#              jitter and the number of threads, plus the time the audio
+#              thread spends on each reveal's typing sound (the NumPy synth
+#              render, or starting the looped MP3 without NumPy; nothing at
+#              all without pygame, which is reported). Uses a real Tk window
+#              when a display is available (--tk), otherwise a simulated clock
+#              whose frames run up to --late-ms late, to check the engine
+#              keeps up.
+#
+# Results are written as JSON; with --baseline the run is compared against an
+# earlier one and any metric more than --tolerance worse is reported (and the
+# exit code is 1).
+#
+#   python joke_benchmark.py --sizes 1000 100000 --out bench.json
+#   python joke_benchmark.py --sizes 1000 100000 --baseline bench.json
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+FULL_LOAD_MAX = 20000         # load_corpus is timed only up to this size (near-dup detection dominates)
+SELECT_DRAWS = 200000
+REVEAL_JOKES = 200
+AUDIO_WARMUP_TIMEOUT = 30     # seconds to wait for pygame and the sounds
+
+SETUPS = ["Why did the {} {} {}?", "What do you call a {} with a {}?", "How does a {} {} a {}?",
+          "What did the {} say to the {}?", "Why don't {} ever {} {}?"]
+VOCABULARY_SIZE = 5000        # made-up words, so jokes only share what real jokes share: the templates
+
+
+def make_vocabulary(size=VOCABULARY_SIZE, seed=0):
+    rng = random.Random(seed)
+    syllables = [c + v for c in "bcdfghklmnprstvwz" for v in "aeiou"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(1, 3))))
+    return sorted(words)
+
+
+WORDS = make_vocabulary()
+
+
+# --- synthetic corpus ---
+
+def synthetic_line(rng, number, fmt):
+    words = rng.choices(WORDS, k=8)
+    setup = rng.choice(SETUPS).format(*words[:3])
+    punchline = f"Because the {words[3]} {words[4]} was a {words[5]} {words[6]} number {number}."
+    if fmt == 'jsonl':
+        return json.dumps({'setup': setup, 'punchline': punchline})
+    if fmt == 'tsv':
+        return f"{setup}\t{punchline}"
+    return f"{setup}{punchline}"
+
+
+def generate_corpus(folder, count, fmt='text', seed=1):
+    """Write a corpus of count jokes into folder (reused if it is already there)"""
+    extension = {'text': '.txt', 'jsonl': '.jsonl', 'tsv': '.tsv'}[fmt]
+    path = os.path.join(folder, f"synthetic_{count}_{seed}{extension}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        batch = []
+        for number in range(count):
+            batch.append(synthetic_line(rng, number, fmt))
+            if len(batch) == 10000:
+                f.write("\n".join(batch) + "\n")
+                batch = []
+        if batch:
+            f.write("\n".join(batch) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+# --- results ---
+
+class Results:
+    def __init__(self):
+        self.metrics = {}
+
+    def add(self, name, value, unit, better):
+        """better is 'higher' or 'lower'"""
+        self.metrics[name] = {'value': value, 'unit': unit, 'better': better}
+        print(f"  {name:<46} {value:>14,.2f} {unit}")
+
+    def to_json(self, config):
+        return {
+            'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'config': config,
+            'metrics': self.metrics,
+        }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def os_thread_count():
+    """Threads in this process as the OS sees them (Linux), else Python's count"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+
+# --- parse ---
+
+def bench_parse(results, workdir, sizes, formats):
+    print("Parsing")
+    for fmt in formats:
+        for count in sizes:
+            path = generate_corpus(os.path.join(workdir, 'single'), count, fmt)
+            megabytes = os.path.getsize(path) / (1024 * 1024)
+            start = time.perf_counter()
+            jokes, errors = read_joke_sources([path])
+            seconds = time.perf_counter() - start
+            if len(jokes) != count or errors:
+                raise RuntimeError(f"parse of {path} gave {len(jokes)} jokes and {len(errors)} errors")
+            results.add(f"parse.{fmt}.{count}.jokes_per_s", count / seconds, "jokes/s", 'higher')
+            results.add(f"parse.{fmt}.{count}.mb_per_s", megabytes / seconds, "MB/s", 'higher')
+            del jokes
+
+    for count in sizes:
+        path = generate_corpus(os.path.join(workdir, 'single'), count, 'text')
+        start = time.perf_counter()
+        lazy = open_lazy_corpus(path)
+        results.add(f"lazy_index.{count}.ms", (time.perf_counter() - start) * 1000, "ms", 'lower')
+        lazy.close()
+
+        if count > FULL_LOAD_MAX:
+            continue
+        folder = os.path.join(workdir, f"corpus_{count}")
+        generate_corpus(folder, count, 'text')
+        for name in os.listdir(folder):
+            if name.startswith("corpus."):
+                os.remove(os.path.join(folder, name))     # force a cold load
+        for label in ("cold", "cached"):
+            start = time.perf_counter()
+            load_corpus(folder, verbose=False)
+            results.add(f"load_corpus.{count}.{label}_ms", (time.perf_counter() - start) * 1000, "ms", 'lower')
+
+
+# --- selection ---
+
+def bench_select(results, sizes, draws=SELECT_DRAWS):
+    print("Selection")
+    for count in sizes:
+        jokes = [{'setup': '', 'punchline': '', 'weight': 1.0 + (i % 5)} for i in range(count)]
+        for mode in ('shuffle', 'weighted', 'random'):
+            selector = JokeSelector(jokes, mode, seed=1)
+            next_index = selector.next_index
+            start = time.perf_counter()
+            for _ in range(draws):
+                next_index()
+            seconds = time.perf_counter() - start
+            results.add(f"select.{mode}.{count}.ns_per_draw", seconds / draws * 1e9, "ns", 'lower')
+
+
+# --- reveal ---
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SimulatedRoot:
+    """Just enough of Tk's after() for RevealEngine, on a simulated clock.
+    Each timer fires up to late_ms after it was due, like a busy event loop."""
+
+    def __init__(self, clock, late_ms, seed=1):
+        self.clock = clock
+        self.late_ms = late_ms
+        self.rng = random.Random(seed)
+        self.timers = []
+        self.cancelled = set()
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        late = self.rng.uniform(0, self.late_ms) if self.late_ms else 0
+        heapq.heappush(self.timers, (self.clock.now + (ms + late) / 1000, self.next_id, callback))
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        self.cancelled.add(timer_id)
+
+    def run_one(self):
+        """Fire the next timer. False when none are left."""
+        while self.timers:
+            due, timer_id, callback = heapq.heappop(self.timers)
+            if timer_id in self.cancelled:
+                self.cancelled.discard(timer_id)
+                continue
+            self.clock.now = max(self.clock.now, due)
+            callback()
+            return True
+        return False
+
+
+class FakeLabel:
+    def __init__(self):
+        self.text = ""
+
+    def config(self, text=None, **options):
+        if text is not None:
+            self.text = text
+
+
+def reveal_texts(count, seed=2):
+    rng = random.Random(seed)
+    return [synthetic_line(rng, n, 'text') for n in range(count)]
+
+
+def instrument(engine, frame_times, frame_costs):
+    """Wrap the engine's frame callback to record when each frame ran and its CPU cost"""
+    tick = engine._tick
+
+    def timed_tick():
+        frame_times.append(time.perf_counter())
+        start = time.perf_counter()
+        tick()
+        frame_costs.append(time.perf_counter() - start)
+    engine._tick = timed_tick
+
+
+def start_audio():
+    """A warmed-up AudioWorker, so type_text takes the same path as in the app"""
+    audio = AudioWorker()
+    audio.set_sound('typing', TYPING_SOUND)
+    ready = threading.Event()
+    audio.warm_up(lambda seconds: ready.set())
+    if not ready.wait(AUDIO_WARMUP_TIMEOUT):
+        print(f"  audio warm-up took over {AUDIO_WARMUP_TIMEOUT}s")
+    if audio.synth is not None:
+        print("  typing audio: NumPy synth")
+    elif audio.pygame is not None:
+        print("  typing audio: looped MP3 (no NumPy)")
+    else:
+        print("  typing audio: off (no pygame) - no real typing cost to measure")
+    return audio
+
+
+def instrument_audio(audio, typing_costs):
+    """Wrap the audio thread's typing handler to record what each reveal's sound costs"""
+    type_text = audio._type_text
+
+    def timed_type_text(*args):
+        start = time.perf_counter()
+        type_text(*args)
+        typing_costs.append(time.perf_counter() - start)
+    audio._type_text = timed_type_text
+
+
+def stop_audio(audio):
+    """Let the audio thread finish what was queued, then stop it"""
+    audio.commands.put(('quit', None))
+    audio.thread.join()
+
+
+def report_reveal(results, prefix, frame_costs, intervals, frame_ms, threads, extra_threads):
+    costs = sorted(c * 1e6 for c in frame_costs)
+    results.add(f"{prefix}.frames", len(costs), "frames", 'higher')
+    results.add(f"{prefix}.frame_cost_mean_us", statistics.fmean(costs) if costs else 0, "us", 'lower')
+    results.add(f"{prefix}.frame_cost_p99_us", percentile(costs, 99), "us", 'lower')
+    if intervals:
+        jitter = sorted(abs(i * 1000 - frame_ms) for i in intervals)
+        results.add(f"{prefix}.frame_interval_mean_ms", statistics.fmean(intervals) * 1000, "ms", 'lower')
+        results.add(f"{prefix}.jitter_mean_ms", statistics.fmean(jitter), "ms", 'lower')
+        results.add(f"{prefix}.jitter_p99_ms", percentile(jitter, 99), "ms", 'lower')
+    results.add(f"{prefix}.threads", threads, "threads", 'lower')
+    results.add(f"{prefix}.threads_added_by_audio", extra_threads, "threads", 'lower')
+
+
+def report_typing(results, prefix, audio, typing_costs):
+    costs = sorted(c * 1000 for c in typing_costs)
+    results.add(f"{prefix}.audio_warmup_ms", (audio.warmup_seconds or 0) * 1000, "ms", 'lower')
+    results.add(f"{prefix}.typing_sounds", len(costs), "sounds", 'higher')
+    results.add(f"{prefix}.typing_cost_mean_ms", statistics.fmean(costs) if costs else 0, "ms", 'lower')
+    results.add(f"{prefix}.typing_cost_p99_ms", percentile(costs, 99), "ms", 'lower')
+
+
+def bench_reveal_simulated(results, texts, late_ms, char_ms=30, frame_ms=16):
+    print(f"Reveal (simulated clock, frames up to {late_ms} ms late)")
+    threads_before = os_thread_count()
+    audio = start_audio()
+    threads = os_thread_count()
+    typing_costs = []
+    instrument_audio(audio, typing_costs)
+    clock = SimulatedClock()
+    root = SimulatedRoot(clock, late_ms)
+    engine = RevealEngine(root, char_ms=char_ms, frame_ms=frame_ms, clock=clock)
+    frame_times, frame_costs = [], []
+    instrument(engine, frame_times, frame_costs)
+    label = FakeLabel()
+    behind = 0
+    sim_frames = []
+
+    for text in texts:
+        audio.type_text('setup', text, char_ms, first_char_now=True)
+        reveal = engine.animate(label, text, first_char_now=True)
+        while root.run_one():
+            sim_frames.append(clock.now)
+            # Visible text must always be what the clock says, however late the frame
+            due = min(len(text), reveal.base + int((clock.now - reveal.start) * 1000 / char_ms))
+            behind = max(behind, due - len(label.text))
+    stop_audio(audio)
+    intervals = [b - a for a, b in zip(sim_frames, sim_frames[1:]) if b - a < 0.2]
+    report_reveal(results, "reveal.simulated", frame_costs, intervals, frame_ms, threads,
+                  threads - threads_before)
+    report_typing(results, "reveal.simulated", audio, typing_costs)
+    results.add("reveal.simulated.max_chars_behind", behind, "chars", 'lower')
+
+
+def bench_reveal_tk(results, texts, char_ms=30, frame_ms=16):
+    import tkinter as tk
+    print("Reveal (Tk)")
+    root = tk.Tk()
+    root.geometry("600x200")
+    label = tk.Label(root, text="", wraplength=500, font=('Arial', 12))
+    label.pack()
+    threads_before = os_thread_count()
+    audio = start_audio()
+    threads = os_thread_count()
+    typing_costs = []
+    instrument_audio(audio, typing_costs)
+    engine = RevealEngine(root, char_ms=char_ms, frame_ms=frame_ms)
+    frame_times, frame_costs = [], []
+    instrument(engine, frame_times, frame_costs)
+    remaining = list(texts)
+
+    def next_text():
+        if remaining:
+            text = remaining.pop()
+            audio.type_text('setup', text, char_ms, first_char_now=True)
+            engine.animate(label, text, on_done=next_text, first_char_now=True)
+        else:
+            root.after(50, root.quit)
+
+    root.after(100, next_text)
+    root.mainloop()
+    stop_audio(audio)
+    root.destroy()
+    intervals = [b - a for a, b in zip(frame_times, frame_times[1:]) if b - a < 0.2]
+    report_reveal(results, "reveal.tk", frame_costs, intervals, frame_ms, threads, threads - threads_before)
+    report_typing(results, "reveal.tk", audio, typing_costs)
+
+
+def has_display():
+    if sys.platform in ('win32', 'darwin'):
+        return True
+    return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+# --- baseline comparison ---
+
+def compare(current, baseline, tolerance):
+    """Print the change of every shared metric; returns the names of regressed ones"""
+    regressed = []
+    print(f"\nCompared with baseline from {baseline.get('created', '?')} (tolerance {tolerance:.0%})")
+    for name, metric in current['metrics'].items():
+        old = baseline['metrics'].get(name)
+        if old is None or not old['value']:
+            continue
+        change = (metric['value'] - old['value']) / abs(old['value'])
+        worse = change < -tolerance if metric['better'] == 'higher' else change > tolerance
+        flag = "  REGRESSION" if worse else ""
+        print(f"  {name:<46} {old['value']:>12,.2f} -> {metric['value']:>12,.2f} ({change:+.1%}){flag}")
+        if worse:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the joke app's hot paths.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="synthetic corpus sizes (up to 10000000)")
+    parser.add_argument('--formats', nargs='+', default=['text', 'jsonl', 'tsv'])
+    parser.add_argument('--only', nargs='+', choices=['parse', 'select', 'reveal'],
+                        default=['parse', 'select', 'reveal'])
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'joke_benchmark'),
+                        help="where synthetic corpora are written (and reused)")
+    parser.add_argument('--reveal-jokes', type=int, default=REVEAL_JOKES)
+    parser.add_argument('--late-ms', type=float, default=8.0, help="simulated frame lateness (max)")
+    parser.add_argument('--tk', action='store_true', help="also time reveals in a real Tk window")
+    parser.add_argument('--out', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="compare with an earlier results file")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = Results()
+    if 'parse' in args.only:
+        bench_parse(results, args.workdir, args.sizes, args.formats)
+    if 'select' in args.only:
+        bench_select(results, args.sizes)
+    if 'reveal' in args.only:
+        texts = reveal_texts(args.reveal_jokes)
+        bench_reveal_simulated(results, texts, args.late_ms)
+        if args.tk:
+            if has_display():
+                bench_reveal_tk(results, texts)
+            else:
+                print("Reveal (Tk) skipped: no display (try xvfb-run)")
+
+    output = results.to_json(vars(args))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"\nResults written to {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressed = compare(output, baseline, args.tolerance)
+        if regressed:
+            print(f"{len(regressed)} metric(s) regressed")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import json
+import struct
+import hashlib
+from array import array
+from collections.abc import Sequence
+
+# Binary cache of the parsed joke corpus, saved next to the source file.
+#
+# Layout:  8s magic, I meta length, I offsets length, I weights length
+#          meta     JSON: source signatures (path, size, mtime_ns, sha1), count, extra
+#          offsets  array('I') of 2*count+1 character offsets (setup, punchline, ...)
+#          weights  array('d') of count joke weights - empty if no joke has a weight
+#          text     every setup and punchline joined, UTF-8
+#
+# The whole file is read with one read() and the text decoded once; jokes are
+# then sliced out lazily by CachedJokeList. The cache is used while every
+# source still has the same size and mtime; if only the mtime moved, the
+# SHA-1 decides.
+
+MAGIC = b'JOKEC003'
+HEADER_FORMAT = '<8sIII'
+CACHE_EXTENSION = ".jokecache"
+
+
+class CachedJokeList(Sequence):
+    """Read-only list of joke dicts backed by the cache text and offsets.
+    Dicts are only built for the jokes that are actually looked at."""
+
+    def __init__(self, text, offsets, count, weights=None):
+        self.text = text
+        self.offsets = offsets
+        self.count = count
+        self.weights = weights
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("joke index out of range")
+        i = 2 * index
+        offsets = self.offsets
+        joke = {'setup': self.text[offsets[i]:offsets[i + 1]],
+                'punchline': self.text[offsets[i + 1]:offsets[i + 2]]}
+        if self.weights:
+            joke['weight'] = self.weights[index]
+        return joke
+
+
+def cache_path_for(source_path):
+    return os.path.splitext(source_path)[0] + CACHE_EXTENSION
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_signature(path, sha1=None):
+    st = os.stat(path)
+    return {
+        'path': os.path.basename(path),
+        'size': st.st_size,
+        'mtime_ns': st.st_mtime_ns,
+        'sha1': sha1 or file_sha1(path),
+    }
+
+
+def _sources_unchanged(saved, source_paths):
+    """True if the sources still match. Returns (matches, refreshed signatures)."""
+    if len(saved) != len(source_paths):
+        return False, None
+    refreshed = []
+    touched = False
+    for sig, path in zip(saved, source_paths):
+        if sig['path'] != os.path.basename(path):
+            return False, None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False, None
+        if st.st_size != sig['size']:
+            return False, None
+        if st.st_mtime_ns != sig['mtime_ns']:
+            # Touched (copied, checked out...) but maybe not edited
+            if file_sha1(path) != sig['sha1']:
+                return False, None
+            sig = dict(sig, mtime_ns=st.st_mtime_ns)
+            touched = True
+        refreshed.append(sig)
+    return True, (refreshed if touched else None)
+
+
+def load_cached_jokes(cache_path, source_paths):
+    """Returns (jokes, extra) from the cache, or None if it is missing or stale."""
+    try:
+        with open(cache_path, "rb") as f:
+            data = f.read()
+        magic, meta_len, offsets_len, weights_len = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != MAGIC:
+            return None
+        pos = struct.calcsize(HEADER_FORMAT)
+        meta = json.loads(data[pos:pos + meta_len].decode('utf-8'))
+        pos += meta_len
+        matches, refreshed = _sources_unchanged(meta['sources'], source_paths)
+        if not matches:
+            return None
+        offsets = array('I')
+        offsets.frombytes(data[pos:pos + offsets_len])
+        pos += offsets_len
+        weights = array('d')
+        weights.frombytes(data[pos:pos + weights_len])
+        text = data[pos + weights_len:].decode('utf-8')
+    except (OSError, ValueError, KeyError, struct.error):
+        return None
+
+    if len(offsets) != 2 * meta['count'] + 1 or len(weights) not in (0, meta['count']):
+        return None
+    jokes = CachedJokeList(text, offsets, meta['count'], weights)
+    if refreshed:
+        # Same content, new mtime: store the new mtime so we skip hashing next time
+        save_cached_jokes(cache_path, source_paths, jokes, meta.get('extra'), signatures=refreshed)
+    return jokes, meta.get('extra')
+
+
+def save_cached_jokes(cache_path, source_paths, jokes, extra=None, signatures=None):
+    """Write the cache. Failure (read-only folder etc.) is not fatal - we just parse next time."""
+    try:
+        if signatures is None:
+            signatures = [source_signature(p) for p in source_paths]
+        offsets = array('I', [0])
+        weights = array('d')
+        weighted = False
+        parts = []
+        length = 0
+        for joke in jokes:
+            for text in (joke['setup'], joke['punchline']):
+                parts.append(text)
+                length += len(text)
+                offsets.append(length)
+            weights.append(joke.get('weight', 1.0))
+            weighted = weighted or 'weight' in joke
+        if not weighted:
+            weights = array('d')      # no joke has a weight - store none
+        meta = json.dumps({'sources': signatures, 'count': len(jokes), 'extra': extra}).encode('utf-8')
+        offsets_bytes = offsets.tobytes()
+        weights_bytes = weights.tobytes()
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(struct.pack(HEADER_FORMAT, MAGIC, len(meta), len(offsets_bytes), len(weights_bytes)))
+            f.write(meta)
+            f.write(offsets_bytes)
+            f.write(weights_bytes)
+            f.write("".join(parts).encode('utf-8'))
+        os.replace(tmp_path, cache_path)
+        return True
+    except OSError as e:
+        print(f"Warning: could not write joke cache: {e}")
+        return False
@@ -0,0 +1,91 @@
+import os
+
+from joke_cache import CACHE_EXTENSION, load_cached_jokes, save_cached_jokes
+from joke_index import LAZY_THRESHOLD_BYTES, open_lazy_corpus
+from joke_dedup import deduplicate, dedup_settings, describe
+from joke_keywords import load_or_build_index
+from joke_sources import LoadError, find_joke_sources, detect_format, read_joke_sources, describe_errors
+
+# The joke corpus without any GUI: every source file in a folder, parsed,
+# deduplicated and keyword-indexed, or taken straight from the corpus cache
+# (<folder>/corpus.jokecache) while the sources are unchanged.
+
+DEFAULT_JOKES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+CORPUS_NAME = "corpus"
+MAX_SAVED_ERRORS = 100          # load errors kept in the cache so they are reported every run
+
+
+class JokeCorpus:
+    def __init__(self, jokes, sources, keyword_index=None, dedup_report=None, load_errors=(),
+                 error_count=None, from_cache=False):
+        self.jokes = jokes
+        self.sources = sources
+        self.keyword_index = keyword_index      # None for a lazy corpus
+        self.dedup_report = dedup_report
+        self.load_errors = list(load_errors)
+        self.error_count = len(self.load_errors) if error_count is None else error_count
+        self.from_cache = from_cache
+
+
+def jokes_dir():
+    """Folder of joke files: ALEXA_JOKES_DIR if set, else resources/ next to the app"""
+    return os.environ.get("ALEXA_JOKES_DIR") or DEFAULT_JOKES_DIR
+
+
+def corpus_base_path(folder):
+    """Path (without extension) that the corpus cache and keyword index are named after"""
+    return os.path.join(folder, CORPUS_NAME)
+
+
+def load_corpus(folder, workers=None, verbose=True):
+    """Load every joke source in folder. With verbose, duplicates and broken lines are printed."""
+    sources = find_joke_sources(folder)
+    if not sources:
+        if verbose:
+            print(f"Error: no joke files (.txt, .jsonl, .tsv) found in {folder}")
+        return JokeCorpus([], [])
+
+    if len(sources) == 1:
+        try:
+            if os.path.getsize(sources[0]) >= LAZY_THRESHOLD_BYTES and detect_format(sources[0]) == 'text':
+                # Huge single text file: index line offsets once and parse jokes on demand
+                # (no dedup or keyword index here - both would mean keeping every joke)
+                jokes = open_lazy_corpus(sources[0])
+                errors = getattr(jokes, 'load_errors', [])
+                corpus = JokeCorpus(jokes, sources, load_errors=errors,
+                                    error_count=getattr(jokes, 'error_count', 0))
+                if verbose and errors:
+                    print(describe_errors(errors, total=corpus.error_count))
+                return corpus
+        except OSError:
+            pass
+
+    base = corpus_base_path(folder)
+    cache_file = base + CACHE_EXTENSION
+    cached = load_cached_jokes(cache_file, sources)
+    # The cache holds the deduplicated corpus; reuse it if it was deduplicated the same way
+    if cached is not None and (cached[1] or {}).get('dedup', {}).get('settings') == dedup_settings():
+        jokes, extra = cached
+        errors = [LoadError(*e) for e in extra.get('load_errors', [])]
+        corpus = JokeCorpus(jokes, sources, load_or_build_index(jokes, base, cache_file),
+                            extra['dedup'], errors, extra.get('error_count'), from_cache=True)
+        if verbose and errors:
+            print(describe_errors(errors, total=corpus.error_count))
+        return corpus
+
+    jokes, errors = read_joke_sources(sources, workers)
+    if verbose and errors:
+        print(describe_errors(errors))
+    # Drop repeated and near-identical jokes (done once per corpus version)
+    kept, dedup_report = deduplicate(jokes)
+    if verbose and dedup_report['clusters']:
+        print(describe(dedup_report, jokes))
+    jokes = [jokes[n] for n in kept]
+    extra = {
+        'dedup': dedup_report,
+        'load_errors': [list(e) for e in errors[:MAX_SAVED_ERRORS]],
+        'error_count': len(errors),
+    }
+    save_cached_jokes(cache_file, sources, jokes, extra=extra)
+    return JokeCorpus(jokes, sources, load_or_build_index(jokes, base, cache_file),
+                      dedup_report, errors)
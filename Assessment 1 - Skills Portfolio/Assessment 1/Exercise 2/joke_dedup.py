@@ -0,0 +1,221 @@
+import re
+import sys
+import zlib
+from operator import eq
+
+# Duplicate and near-duplicate joke removal.
+#
+# 1. Exact: each joke is normalised (lowercase, punctuation dropped, spaces
+#    collapsed) and jokes with the same normalised text are merged.
+# 2. Near: every remaining joke gets a MinHash signature of its shingles
+#    (overlapping 4-byte pieces of the normalised text). Signatures are cut
+#    into bands and jokes sharing a band land in the same LSH bucket, so
+#    only jokes in a common bucket are compared.
+#    Jokes built from the same template fill big buckets that grow with the
+#    corpus, so comparing every pair in a bucket is quadratic. Instead a
+#    bucket's jokes are sorted by the rest of their signature (near
+#    duplicates agree on most of it, so they end up next to each other) and
+#    each joke is compared with the next CANDIDATE_WINDOW ones: at most
+#    BANDS * CANDIDATE_WINDOW comparisons per joke, however big the corpus.
+#    A candidate pair whose signatures agree on too few values is skipped;
+#    the rest are confirmed with the real Jaccard similarity of their
+#    shingle sets.
+#
+# The signature uses one hash per shingle (one-permutation MinHash): the hash
+# picks one of NUM_HASHES bins and each bin keeps its smallest value. Empty
+# bins borrow from the next filled bin so short jokes still get a full
+# signature.
+#
+# The first joke of each cluster is kept. The report is a plain dict so it can
+# be stored in the corpus cache and never recomputed for the same corpus.
+
+SHINGLE_SIZE = 4               # bytes of normalised UTF-8 text per shingle
+NUM_HASHES = 32                # signature length (a power of two)
+BANDS = 8                      # 8 bands of 4 rows: pairs above ~0.6 similarity usually collide
+ROWS = NUM_HASHES // BANDS
+THRESHOLD = 0.7                # Jaccard similarity needed to count as a near-duplicate
+CANDIDATE_WINDOW = 4           # jokes after each one in a sorted bucket it is compared with
+SIGNATURE_SLACK = 0.25         # skip pairs whose signatures agree on less than THRESHOLD - this
+
+MIX = 0x9E3779B97F4A7C15       # 64-bit odd constant (Fibonacci hashing)
+MASK = (1 << 64) - 1
+BIN_SHIFT = 64 - (NUM_HASHES.bit_length() - 1)    # top bits of a hash pick its bin
+VALUE_MASK = (1 << BIN_SHIFT) - 1
+EMPTY = VALUE_MASK + 1
+
+PUNCTUATION_RE = re.compile(r"[^\w ]+")
+SPACE_RE = re.compile(r"\s+")
+
+
+def dedup_settings():
+    """Settings stored with the results - a change means the corpus is deduplicated again"""
+    return {'shingle': SHINGLE_SIZE, 'hashes': NUM_HASHES, 'bands': BANDS, 'threshold': THRESHOLD,
+            'window': CANDIDATE_WINDOW, 'slack': SIGNATURE_SLACK}
+
+
+def normalise_text(joke):
+    text = (joke['setup'] + " " + joke['punchline']).lower()
+    text = PUNCTUATION_RE.sub(" ", text.replace("'", "").replace("_", " "))
+    return SPACE_RE.sub(" ", text).strip()
+
+
+def shingle_hashes(text):
+    """Set of 64-bit hashes of the text's overlapping SHINGLE_SIZE-byte pieces"""
+    data = text.encode('utf-8')
+    if len(data) <= SHINGLE_SIZE:
+        return {(zlib.crc32(data) * MIX) & MASK}
+    crc32 = zlib.crc32
+    return {(crc32(data[i:i + SHINGLE_SIZE]) * MIX) & MASK
+            for i in range(len(data) - SHINGLE_SIZE + 1)}
+
+
+def minhash(hashes):
+    """One-permutation MinHash signature (list of NUM_HASHES ints)"""
+    bins = [EMPTY] * NUM_HASHES
+    for h in hashes:
+        b = h >> BIN_SHIFT
+        v = h & VALUE_MASK
+        if v < bins[b]:
+            bins[b] = v
+    # Fill empty bins from the next filled one (wrapping round)
+    if EMPTY in bins:
+        filled = [i for i, v in enumerate(bins) if v != EMPTY]
+        for i in range(NUM_HASHES):
+            if bins[i] == EMPTY:
+                j = next((f for f in filled if f > i), filled[0])
+                bins[i] = bins[j] + ((j - i) % NUM_HASHES) * EMPTY
+    return bins
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class _Clusters:
+    """Union-find over joke numbers; the smallest number is the cluster root"""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        root = x
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while x != root:
+            self.parent[x], x = root, self.parent.get(x, x)
+        return root
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            if rb < ra:
+                ra, rb = rb, ra
+            self.parent.setdefault(ra, ra)
+            self.parent[rb] = ra
+
+    def groups(self):
+        groups = {}
+        for x in list(self.parent):
+            groups.setdefault(self.find(x), []).append(x)
+        return groups
+
+
+def deduplicate(jokes, threshold=THRESHOLD):
+    """Returns (kept, report). kept is the list of joke numbers to keep, in order;
+    report has the removed counts and the clusters (lists of joke numbers, the
+    first one being the joke that was kept)."""
+    clusters = _Clusters()
+
+    # 1. exact duplicates of the normalised text
+    first_with_text = {}
+    texts = []
+    exact_removed = 0
+    for number, joke in enumerate(jokes):
+        text = normalise_text(joke)
+        first = first_with_text.setdefault(text, number)
+        if first != number:
+            clusters.union(first, number)
+            exact_removed += 1
+        else:
+            texts.append((number, text))
+
+    # 2. MinHash + LSH over the distinct texts
+    shingle_sets = {}
+    signatures = {}
+    buckets = {}
+    for number, text in texts:
+        shingle_set = shingle_hashes(text)
+        shingle_sets[number] = shingle_set
+        signature = minhash(shingle_set)
+        signatures[number] = signature
+        for band in range(BANDS):
+            key = (band,) + tuple(signature[band * ROWS:(band + 1) * ROWS])
+            buckets.setdefault(key, []).append(number)
+
+    min_agree = (threshold - SIGNATURE_SLACK) * NUM_HASHES
+    compared = set()
+    for key, members in buckets.items():
+        if len(members) < 2:
+            continue
+        if len(members) > CANDIDATE_WINDOW + 1:
+            start = (key[0] + 1) * ROWS     # the bands after this one, then the ones before
+            members.sort(key=lambda n: signatures[n][start:] + signatures[n][:start])
+        for i, a in enumerate(members):
+            for b in members[i + 1:i + 1 + CANDIDATE_WINDOW]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                if clusters.find(a) == clusters.find(b):
+                    continue
+                agree = sum(map(eq, signatures[a], signatures[b]))
+                if agree >= min_agree and jaccard(shingle_sets[a], shingle_sets[b]) >= threshold:
+                    clusters.union(a, b)
+
+    groups = sorted(sorted(g) for g in clusters.groups().values() if len(g) > 1)
+    removed = {n for group in groups for n in group[1:]}
+    kept = [n for n in range(len(jokes)) if n not in removed]
+    report = {
+        'settings': dedup_settings(),
+        'total': len(jokes),
+        'kept': len(kept),
+        'exact_removed': exact_removed,
+        'near_removed': len(removed) - exact_removed,
+        'candidate_pairs': len(compared),
+        'clusters': groups,
+    }
+    return kept, report
+
+
+def describe(report, jokes=None, limit=10):
+    """Short text summary of a dedup report (jokes: the original list, for examples)"""
+    lines = [f"{report['total']} jokes, {report['kept']} kept: "
+             f"{report['exact_removed']} exact and {report['near_removed']} near duplicates "
+             f"in {len(report['clusters'])} clusters"]
+    for group in report['clusters'][:limit]:
+        if jokes is None:
+            lines.append(f"  {group}")
+        else:
+            lines.append(f"  keep  {jokes[group[0]]['setup']} {jokes[group[0]]['punchline']}")
+            for n in group[1:]:
+                lines.append(f"  drop  {jokes[n]['setup']} {jokes[n]['punchline']}")
+    if len(report['clusters']) > limit:
+        lines.append(f"  ... {len(report['clusters']) - limit} more clusters")
+    return "\n".join(lines)
+
+
+def main():
+    from joke_format import parse_joke_line
+    if len(sys.argv) != 2:
+        print("usage: python joke_dedup.py <jokes file>")
+        return
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        jokes = [j for j in map(parse_joke_line, f) if j]
+    kept, report = deduplicate(jokes)
+    print(describe(report, jokes))
+
+
+if __name__ == "__main__":
+    main()
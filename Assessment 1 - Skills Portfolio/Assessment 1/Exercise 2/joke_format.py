@@ -0,0 +1,113 @@
+import json
+import math
+
+# Parsing of joke lines. parse_joke_line is the lenient "setup?punchline"
+# parser used by the lazy index; the strict per-format parsers are used by
+# the joke source loader (joke_sources.py), which reports broken lines.
+
+
+def parse_joke_line(line):
+    """Split one line on the first question mark into a joke dict (None for blank lines)."""
+    line = line.strip()
+    if not line:
+        return None
+    # Find the first question mark
+    q_index = line.find('?')
+    if q_index != -1:
+        setup = line[:q_index + 1].strip()
+        punchline = line[q_index + 1:].strip()
+        return {'setup': setup, 'punchline': punchline}
+    # If no question mark, treat entire line as setup
+    return {'setup': line, 'punchline': ''}
+
+
+# --- strict parsers for the joke source formats ---
+#
+# Each takes one line and returns a joke dict, None for a line that holds no
+# joke (blank line, TSV header), or raises ValueError saying what is wrong.
+# JSON lines and TSV can give a joke a 'weight' (how often 'weighted' mode
+# picks it, default 1); it is only in the dict when the line has one.
+
+def parse_weight(value):
+    """A joke weight: a finite number >= 0 (a JSON number or TSV text)"""
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValueError(f"weight {value.strip()!r} is not a number") from None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) \
+            or not math.isfinite(value) or value < 0:
+        raise ValueError("weight must be a number >= 0")
+    return float(value)
+
+
+def parse_text_joke(line):
+    """'setup? punchline' - the line must have a '?' with text on both sides."""
+    line = line.strip()
+    if not line:
+        return None
+    q_index = line.find('?')
+    if q_index == -1:
+        raise ValueError("no '?' between setup and punchline")
+    setup = line[:q_index + 1].strip()
+    punchline = line[q_index + 1:].strip()
+    if setup == '?':
+        raise ValueError("empty setup")
+    if not punchline:
+        raise ValueError("empty punchline")
+    return {'setup': setup, 'punchline': punchline}
+
+
+def parse_jsonl_joke(line):
+    """{"setup": "...", "punchline": "...", "weight": 2} - weight is optional,
+    other keys are ignored."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid JSON ({e.msg})") from None
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    joke = {}
+    for key in ('setup', 'punchline'):
+        value = record.get(key)
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError(f"missing or empty '{key}'")
+        joke[key] = value.strip()
+    if 'weight' in record:
+        joke['weight'] = parse_weight(record['weight'])
+    return joke
+
+
+TSV_HEADER = ['setup', 'punchline', 'weight']
+
+
+def parse_tsv_joke(line):
+    """setup<TAB>punchline, optionally <TAB>weight. A header line is skipped."""
+    line = line.rstrip('\r\n')
+    if not line.strip():
+        return None
+    fields = line.split('\t')
+    if len(fields) not in (2, 3):
+        raise ValueError(f"expected 2 or 3 tab-separated fields, found {len(fields)}")
+    fields = [field.strip() for field in fields]
+    if [field.lower() for field in fields] == TSV_HEADER[:len(fields)]:
+        return None
+    setup, punchline = fields[0], fields[1]
+    if not setup:
+        raise ValueError("empty setup")
+    if not punchline:
+        raise ValueError("empty punchline")
+    joke = {'setup': setup, 'punchline': punchline}
+    if len(fields) == 3:
+        joke['weight'] = parse_weight(fields[2])
+    return joke
+
+
+LINE_PARSERS = {
+    'text': parse_text_joke,
+    'jsonl': parse_jsonl_joke,
+    'tsv': parse_tsv_joke,
+}
@@ -0,0 +1,163 @@
+import os
+import json
+import mmap
+import struct
+from array import array
+from collections.abc import Sequence
+
+from joke_format import parse_text_joke
+from joke_sources import LoadError
+
+# Lazy joke corpus for very large joke files.
+#
+# Instead of keeping every parsed joke in memory, the byte offset of each
+# joke line is stored once in a side file (<name>.jokeidx) as a raw
+# array('Q'). Both the index and the joke file are memory-mapped, so drawing
+# a joke is: pick an offset, find the end of that line, parse just that line.
+# Startup cost and memory use don't grow with the corpus.
+#
+# Lines are checked with the same strict parser as the eager loader while the
+# index is built: a broken line gets no offset and becomes a load error, so a
+# big file gives the same jokes and errors whichever way it is loaded.
+#
+# Layout:  8s magic, Q source size, Q source mtime_ns, Q joke count (32 bytes)
+#          offsets  array('Q') of count line offsets
+#          errors   JSON: {"count": n, "errors": [[line, message], ...]} (first MAX_INDEX_ERRORS)
+
+MAGIC = b'JOKEIDX2'
+HEADER_FORMAT = '<8sQQQ'
+INDEX_EXTENSION = ".jokeidx"
+LAZY_THRESHOLD_BYTES = 8 * 1024 * 1024
+FLUSH_EVERY = 65536               # offsets buffered before writing while indexing
+MAX_INDEX_ERRORS = 100            # broken lines listed in the index (all are counted)
+
+
+def index_path_for(source_path):
+    return os.path.splitext(source_path)[0] + INDEX_EXTENSION
+
+
+def _index_is_current(index_path, st):
+    try:
+        with open(index_path, "rb") as f:
+            header = f.read(struct.calcsize(HEADER_FORMAT))
+        magic, size, mtime_ns, _ = struct.unpack(HEADER_FORMAT, header)
+    except (OSError, struct.error):
+        return False
+    return magic == MAGIC and size == st.st_size and mtime_ns == st.st_mtime_ns
+
+
+class LineErrors:
+    """Broken lines found while indexing: the first few listed, all counted"""
+
+    def __init__(self, count=0, errors=()):
+        self.count = count
+        self.errors = [tuple(e) for e in errors]
+
+    def add(self, line, message):
+        self.count += 1
+        if len(self.errors) < MAX_INDEX_ERRORS:
+            self.errors.append((line, message))
+
+
+def iter_line_offsets(source_path, errors):
+    """Byte offset of every line holding a joke; broken lines go to errors"""
+    pos = 0
+    with open(source_path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            start = pos
+            pos += len(line)
+            if number == 1 and line.startswith(b'\xef\xbb\xbf'):
+                line = line[3:]               # UTF-8 byte order mark
+                start += 3
+            try:
+                joke = parse_text_joke(line.decode('utf-8'))
+            except UnicodeDecodeError:
+                errors.add(number, "not valid UTF-8")
+                continue
+            except ValueError as e:
+                errors.add(number, str(e))
+                continue
+            if joke:
+                yield start
+
+
+def build_line_index(source_path, index_path):
+    """Write the offset index for source_path, a batch at a time."""
+    st = os.stat(source_path)
+    tmp_path = index_path + ".tmp"
+    errors = LineErrors()
+    count = 0
+    with open(tmp_path, "wb") as out:
+        out.write(struct.pack(HEADER_FORMAT, MAGIC, st.st_size, st.st_mtime_ns, 0))
+        batch = array('Q')
+        for offset in iter_line_offsets(source_path, errors):
+            batch.append(offset)
+            if len(batch) >= FLUSH_EVERY:
+                batch.tofile(out)
+                count += len(batch)
+                batch = array('Q')
+        batch.tofile(out)
+        count += len(batch)
+        out.write(json.dumps({'count': errors.count, 'errors': errors.errors}).encode('utf-8'))
+        out.seek(0)
+        out.write(struct.pack(HEADER_FORMAT, MAGIC, st.st_size, st.st_mtime_ns, count))
+    os.replace(tmp_path, index_path)
+
+
+class LazyJokeCorpus(Sequence):
+    """Sequence of joke dicts parsed on demand from a memory-mapped file.
+    load_errors lists the first broken lines, error_count counts them all."""
+
+    def __init__(self, source_path, index_path=None):
+        self.source_path = source_path
+        self._source_file = open(source_path, "rb")
+        self.data = mmap.mmap(self._source_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index_file = None
+        self._index_map = None
+        if index_path:
+            self._index_file = open(index_path, "rb")
+            self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            count = struct.unpack_from(HEADER_FORMAT, self._index_map)[3]
+            start = struct.calcsize(HEADER_FORMAT)
+            end = start + 8 * count
+            self.offsets = memoryview(self._index_map)[start:end].cast('Q')
+            errors = LineErrors(**json.loads(self._index_map[end:].decode('utf-8')))
+        else:
+            # Couldn't store an index next to the file: keep it in memory instead
+            errors = LineErrors()
+            self.offsets = array('Q', iter_line_offsets(source_path, errors))
+        self.load_errors = [LoadError(source_path, line, message) for line, message in errors.errors]
+        self.error_count = errors.count
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start = self.offsets[index]
+        end = self.data.find(b'\n', start)
+        if end == -1:
+            end = len(self.data)
+        return parse_text_joke(self.data[start:end].decode('utf-8'))
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        for handle in (self._index_map, self._index_file, self.data, self._source_file):
+            if handle is not None:
+                handle.close()
+
+
+def open_lazy_corpus(source_path):
+    """Open source_path in lazy mode, (re)building its offset index if needed."""
+    if os.path.getsize(source_path) == 0:
+        return []      # mmap can't map an empty file
+    index_path = index_path_for(source_path)
+    if not _index_is_current(index_path, os.stat(source_path)):
+        try:
+            build_line_index(source_path, index_path)
+        except OSError as e:
+            print(f"Warning: could not write joke index: {e}")
+            return LazyJokeCorpus(source_path)
+    return LazyJokeCorpus(source_path, index_path)
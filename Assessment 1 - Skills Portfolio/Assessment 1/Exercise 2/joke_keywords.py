@@ -0,0 +1,173 @@
+import os
+import re
+import json
+import struct
+import bisect
+import random
+from array import array
+
+# Inverted keyword index for "tell me a joke about X".
+#
+# Each word in a joke's setup and punchline maps to a sorted array('I') of the
+# joke numbers that contain it (its posting list). A query is tokenised the
+# same way; one word is a direct lookup, several words are intersected by
+# walking the shortest posting list and binary-searching the others.
+#
+# The index can be saved next to the corpus cache (<name>.jokekw) and is
+# reused while that cache file is unchanged.
+
+MAGIC = b'JOKEKW01'
+HEADER_FORMAT = '<8sI'
+INDEX_EXTENSION = ".jokekw"
+
+STOP_WORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'to', 'in', 'on', 'at', 'for', 'is', 'it', 'its',
+    'i', 'you', 'he', 'she', 'we', 'they', 'me', 'my', 'your', 'his', 'her', 'our', 'their',
+    'do', 'does', 'did', 'be', 'was', 'were', 'are', 'with', 'that', 'this', 'what', 'why',
+    'who', 'how', 'when', 'where', 'if', 'so', 'as', 'by', 'from', 'up', 'get', 'got', 'can',
+}
+# Extra words that only show up in requests ("tell me a joke about cows")
+QUERY_WORDS = {'tell', 'joke', 'jokes', 'about', 'some', 'one', 'please', 'alexa', 'another'}
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def normalise_word(word):
+    """Lowercase word with possessives and simple plurals removed (cows -> cow)"""
+    if word.endswith("'s"):
+        word = word[:-2]
+    word = word.replace("'", "")
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text, extra_stop_words=()):
+    words = []
+    for word in WORD_RE.findall(text.lower()):
+        if word in STOP_WORDS or word in extra_stop_words:
+            continue
+        word = normalise_word(word)
+        if word and word not in STOP_WORDS:
+            words.append(word)
+    return words
+
+
+def index_path_for(source_path):
+    return os.path.splitext(source_path)[0] + INDEX_EXTENSION
+
+
+class KeywordIndex:
+    def __init__(self, postings=None):
+        self.postings = postings or {}    # word -> array('I') of joke numbers, ascending
+
+    @classmethod
+    def build(cls, jokes):
+        postings = {}
+        for number, joke in enumerate(jokes):
+            for word in set(tokenize(joke['setup'] + " " + joke['punchline'])):
+                if word not in postings:
+                    postings[word] = array('I')
+                postings[word].append(number)
+        return cls(postings)
+
+    def add(self, number, joke):
+        """Index one more joke (numbers must keep increasing)"""
+        for word in set(tokenize(joke['setup'] + " " + joke['punchline'])):
+            if word not in self.postings:
+                self.postings[word] = array('I')
+            self.postings[word].append(number)
+
+    def search(self, query):
+        """Joke numbers matching every word in the query (sorted)"""
+        words = set(tokenize(query, QUERY_WORDS))
+        if not words:
+            return array('I')
+        lists = []
+        for word in words:
+            posting = self.postings.get(word)
+            if not posting:
+                return array('I')
+            lists.append(posting)
+        lists.sort(key=len)
+        if len(lists) == 1:
+            return lists[0]
+        result = array('I')
+        for number in lists[0]:
+            for other in lists[1:]:
+                i = bisect.bisect_left(other, number)
+                if i == len(other) or other[i] != number:
+                    break
+            else:
+                result.append(number)
+        return result
+
+    def random_match(self, query, rng=random):
+        """A random matching joke number, or None"""
+        matches = self.search(query)
+        return matches[rng.randrange(len(matches))] if matches else None
+
+    # --- saving / loading ---
+
+    def save(self, path, signature):
+        """Write the index; signature ties it to the corpus it was built from."""
+        words = sorted(self.postings)
+        meta = json.dumps({'signature': signature, 'words': words,
+                           'lengths': [len(self.postings[w]) for w in words]}).encode('utf-8')
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(struct.pack(HEADER_FORMAT, MAGIC, len(meta)))
+                f.write(meta)
+                for word in words:
+                    self.postings[word].tofile(f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: could not write keyword index: {e}")
+
+    @classmethod
+    def load(cls, path, signature):
+        """Saved index if it was built from the same corpus, else None"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            magic, meta_len = struct.unpack_from(HEADER_FORMAT, data)
+            if magic != MAGIC:
+                return None
+            pos = struct.calcsize(HEADER_FORMAT)
+            meta = json.loads(data[pos:pos + meta_len].decode('utf-8'))
+            if meta['signature'] != signature:
+                return None
+            numbers = array('I')
+            numbers.frombytes(data[pos + meta_len:])
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+        postings = {}
+        start = 0
+        for word, length in zip(meta['words'], meta['lengths']):
+            postings[word] = numbers[start:start + length]
+            start += length
+        return cls(postings)
+
+
+def corpus_signature(cache_path):
+    """Identifies one version of the corpus cache file"""
+    try:
+        st = os.stat(cache_path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_or_build_index(jokes, source_path, cache_path):
+    """Keyword index for jokes, from disk if it matches the current corpus cache."""
+    path = index_path_for(source_path)
+    signature = corpus_signature(cache_path)
+    if signature is not None:
+        index = KeywordIndex.load(path, signature)
+        if index is not None:
+            return index
+    index = KeywordIndex.build(jokes)
+    if signature is not None:
+        index.save(path, signature)
+    return index
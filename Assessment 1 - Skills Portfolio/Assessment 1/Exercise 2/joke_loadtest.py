@@ -0,0 +1,127 @@
+import time
+import asyncio
+import argparse
+
+from joke_server import DEFAULT_HOST, DEFAULT_PORT
+
+# Load generator for joke_server.py.
+# Opens many keep-alive connections; each one keeps PIPELINE requests in
+# flight, sending a new request every time a response comes back. Prints
+# requests/sec and latency percentiles (time from sending a request to its
+# complete response).
+#
+# The client side uses a bare asyncio.Protocol too - run it with the server
+# on the same core and a stream-based client would be what you measure.
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoadClient(asyncio.Protocol):
+    def __init__(self, request, total, pipeline, latencies, done):
+        self.request = request
+        self.remaining = total        # requests still to send
+        self.pipeline = pipeline
+        self.latencies = latencies
+        self.done = done
+        self.sent_at = []             # send times of requests in flight, oldest first
+        self.first = 0
+        self.buffer = b''
+        self.errors = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.send(min(self.pipeline, self.remaining))
+
+    def send(self, count):
+        if count <= 0:
+            return
+        now = time.perf_counter()
+        self.sent_at.extend([now] * count)
+        self.remaining -= count
+        self.transport.write(self.request * count)
+
+    def data_received(self, data):
+        buf = self.buffer + data if self.buffer else data
+        pos = 0
+        received = 0
+        now = time.perf_counter()
+        while True:
+            end = buf.find(b'\r\n\r\n', pos)
+            if end == -1:
+                break
+            head = buf[pos:end + 2]      # keep the last header's line ending
+            i = head.find(b'Content-Length: ')
+            length = int(head[i + 16:head.find(b'\r\n', i)]) if i != -1 else 0
+            if len(buf) < end + 4 + length:
+                break
+            if not head.startswith(b'HTTP/1.1 200'):
+                self.errors += 1
+            self.latencies.append(now - self.sent_at[self.first])
+            self.first += 1
+            received += 1
+            pos = end + 4 + length
+        self.buffer = buf[pos:]
+        if self.first > 4096:
+            del self.sent_at[:self.first]
+            self.first = 0
+        if received:
+            self.send(min(received, self.remaining))
+            if self.first == len(self.sent_at) and self.remaining == 0:
+                self.transport.close()
+
+    def connection_lost(self, exc):
+        if not self.done.done():
+            self.done.set_result(None)
+
+
+async def run_load_test(host, port, unix_path, clients, requests, pipeline, path):
+    loop = asyncio.get_running_loop()
+    request = b'GET %s HTTP/1.1\r\nHost: %s\r\n\r\n' % (path.encode('ascii'), host.encode('ascii'))
+    latencies = []
+    protocols = []
+    waits = []
+    start = time.perf_counter()
+    for _ in range(clients):
+        done = loop.create_future()
+        factory = lambda d=done: LoadClient(request, requests, pipeline, latencies, d)
+        if unix_path:
+            _, protocol = await loop.create_unix_connection(factory, unix_path)
+        else:
+            _, protocol = await loop.create_connection(factory, host, port)
+        protocols.append(protocol)
+        waits.append(done)
+    await asyncio.gather(*waits)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    errors = sum(p.errors for p in protocols)
+    print(f"Clients: {clients}  Pipeline: {pipeline}  Requests: {total}  Errors: {errors}")
+    print(f"Elapsed: {elapsed:.2f}s  Throughput: {total / elapsed:.0f} req/s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.2f} ms  "
+          f"p99: {percentile(latencies, 99) * 1000:.2f} ms  "
+          f"max: {latencies[-1] * 1000 if latencies else 0:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the joke server.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Unix socket path instead of TCP")
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000, help="requests per client")
+    parser.add_argument('--pipeline', type=int, default=1, help="requests in flight per connection")
+    parser.add_argument('--path', default='/joke')
+    args = parser.parse_args()
+    asyncio.run(run_load_test(args.host, args.port, args.unix, args.clients, args.requests,
+                              args.pipeline, args.path))
+
+
+if __name__ == "__main__":
+    main()
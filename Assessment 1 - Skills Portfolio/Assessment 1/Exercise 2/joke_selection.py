@@ -0,0 +1,132 @@
+import random
+from array import array
+
+# Joke selection engine.
+#
+#   ShuffleBag   - every joke once before any joke repeats. It is a Fisher-Yates
+#                  shuffle done one step per draw, with the swaps kept in a small
+#                  dict instead of a shuffled copy of the corpus: O(1) per draw.
+#   AliasTable   - weighted draws in O(1) using Vose's alias method.
+#
+# Both take a seed so a run can be repeated exactly.
+
+SELECTION_MODES = ('shuffle', 'weighted', 'random')
+
+
+class ShuffleBag:
+    def __init__(self, size, rng=None):
+        self.size = size
+        self.rng = rng or random.Random()
+        self.last = None
+        self.refill()
+
+    def refill(self):
+        self.remaining = self.size
+        self.swaps = {}     # position -> index, only for positions that were swapped
+
+    def draw(self):
+        """Next index in [0, size). No index repeats until all have been drawn."""
+        if self.size == 0:
+            raise IndexError("draw from an empty shuffle bag")
+        if self.remaining == 0:
+            self.refill()
+        j = self.rng.randrange(self.remaining)
+        last = self.remaining - 1
+        value = self.swaps.get(j, j)
+        if value == self.last and self.remaining == self.size and self.size > 1:
+            # Fresh bag would start with the joke we just showed - take another
+            j = (j + 1 + self.rng.randrange(last)) % self.remaining
+            value = self.swaps.get(j, j)
+        # Move the unused element at the end into the drawn slot
+        self.swaps[j] = self.swaps.pop(last, last)
+        if j == last:
+            self.swaps.pop(j, None)
+        self.remaining = last
+        self.last = value
+        return value
+
+    def grow(self, new_size):
+        """Add indices size..new_size-1 to the bag; they are drawn before it refills"""
+        for value in range(self.size, new_size):
+            if self.remaining != value:
+                self.swaps[self.remaining] = value
+            self.remaining += 1
+        self.size = max(self.size, new_size)
+
+
+class AliasTable:
+    def __init__(self, weights, rng=None):
+        self.rng = rng or random.Random()
+        n = len(weights)
+        if n == 0:
+            raise ValueError("need at least one weight")
+        total = float(sum(weights))
+        if total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("weights must be non-negative and not all zero")
+        self.size = n
+        self.prob = array('d', [0.0]) * n
+        self.alias = array('I', [0]) * n
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left is 1.0 give or take rounding
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def draw(self):
+        i = self.rng.randrange(self.size)
+        return i if self.rng.random() < self.prob[i] else self.alias[i]
+
+
+def joke_weights(jokes):
+    """Each joke's 'weight' (default 1). If every weight is 0 they all count the same."""
+    weights = [float(j.get('weight', 1.0)) for j in jokes]
+    if weights and not any(weights):
+        print("Warning: every joke has weight 0 - picking them all equally")
+        return [1.0] * len(weights)
+    return weights
+
+
+class JokeSelector:
+    """Picks jokes from a corpus. mode is 'shuffle', 'weighted' or 'random'."""
+
+    def __init__(self, jokes, mode='shuffle', weights=None, seed=None):
+        self.jokes = jokes
+        self.mode = mode
+        self.rng = random.Random(seed)
+        if mode == 'weighted':
+            if weights is None:
+                weights = joke_weights(jokes)
+            self.picker = AliasTable(weights, self.rng)
+        elif mode == 'shuffle':
+            self.picker = ShuffleBag(len(jokes), self.rng)
+        elif mode == 'random':
+            self.picker = None
+        else:
+            raise ValueError(f"Unknown selection mode {mode!r}")
+
+    def jokes_added(self, jokes):
+        """jokes is the same corpus with more jokes on the end"""
+        self.jokes = jokes
+        if self.mode == 'shuffle':
+            self.picker.grow(len(jokes))
+        elif self.mode == 'weighted':
+            self.picker = AliasTable(joke_weights(jokes), self.rng)
+
+    def next_index(self):
+        if self.picker is None:
+            return self.rng.randrange(len(self.jokes))
+        return self.picker.draw()
+
+    def next_joke(self):
+        if not self.jokes:
+            return None
+        return self.jokes[self.next_index()]
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import stat
+import asyncio
+import argparse
+from urllib.parse import unquote_to_bytes
+
+from joke_corpus import load_corpus, jokes_dir
+from joke_selection import JokeSelector, SELECTION_MODES
+
+# uvloop is optional - it roughly doubles throughput where it is installed
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+# Headless joke service for voice devices and other clients.
+#
+# The same corpus loading (joke_corpus.load_corpus) and selection
+# (JokeSelector) as the Tk app, served as JSON over HTTP/1.1 on localhost or
+# a Unix socket:
+#
+#   GET /joke              next joke               {"id": 12, "setup": ..., "punchline": ...}
+#   GET /joke?about=cows   random joke about cows  (404 if there is none)
+#   GET /joke/12           joke number 12
+#   GET /health            {"status": "ok", "jokes": 37}
+#
+# Connections are kept alive and pipelined requests are all answered from one
+# read, with the responses written back in one go. The protocol is a plain
+# asyncio.Protocol (no streams) and each joke's encoded response is cached,
+# so the per-request work is a parse of the request line and a dict lookup.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 50660
+MAX_HEADER_BYTES = 16 * 1024
+RESPONSE_CACHE_MAX = 100000      # encoded responses kept (lazy corpora can be huge)
+
+STATUS_TEXT = {200: b'OK', 400: b'Bad Request', 404: b'Not Found',
+               405: b'Method Not Allowed', 413: b'Request Header Fields Too Large'}
+
+
+def http_response(status, body, keep_alive=True, head_only=False):
+    headers = (b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n%s\r\n'
+               % (status, STATUS_TEXT[status], len(body),
+                  b'' if keep_alive else b'Connection: close\r\n'))
+    return headers if head_only else headers + body
+
+
+def json_body(obj):
+    return json.dumps(obj).encode('utf-8')
+
+
+class JokeService:
+    """Routes a request to a JSON response (bytes). Knows nothing about sockets."""
+
+    def __init__(self, corpus, mode='shuffle', seed=None):
+        self.corpus = corpus
+        self.jokes = corpus.jokes
+        self.selector = JokeSelector(self.jokes, mode, seed=seed)
+        self.responses = {}           # joke number -> full keep-alive 200 response
+        self.requests = 0
+
+    def joke_response(self, number, keep_alive, head_only):
+        if keep_alive and not head_only:
+            response = self.responses.get(number)
+            if response is not None:
+                return response
+        joke = self.jokes[number]
+        body = json_body({'id': number, 'setup': joke['setup'], 'punchline': joke['punchline']})
+        response = http_response(200, body, keep_alive, head_only)
+        if keep_alive and not head_only and len(self.responses) < RESPONSE_CACHE_MAX:
+            self.responses[number] = response
+        return response
+
+    def error_response(self, status, message, keep_alive=True, head_only=False):
+        return http_response(status, json_body({'error': message}), keep_alive, head_only)
+
+    def respond(self, method, target, keep_alive=True):
+        self.requests += 1
+        head_only = method == b'HEAD'
+        if method != b'GET' and not head_only:
+            return self.error_response(405, "only GET and HEAD are supported", keep_alive)
+        path, _, query = target.partition(b'?')
+        if path == b'/joke':
+            if not self.jokes:
+                return self.error_response(404, "no jokes loaded", keep_alive, head_only)
+            about = self.query_value(query, b'about')
+            if about:
+                if self.corpus.keyword_index is None:
+                    return self.error_response(404, "keyword search is not available for this corpus",
+                                               keep_alive, head_only)
+                number = self.corpus.keyword_index.random_match(about, self.selector.rng)
+                if number is None:
+                    return self.error_response(404, f"no joke about {about}", keep_alive, head_only)
+            else:
+                number = self.selector.next_index()
+            return self.joke_response(number, keep_alive, head_only)
+        if path.startswith(b'/joke/'):
+            number = path[6:]
+            if not number.isdigit() or int(number) >= len(self.jokes):
+                return self.error_response(404, "no such joke", keep_alive, head_only)
+            return self.joke_response(int(number), keep_alive, head_only)
+        if path == b'/health':
+            body = json_body({'status': 'ok', 'jokes': len(self.jokes),
+                              'keyword_search': self.corpus.keyword_index is not None})
+            return http_response(200, body, keep_alive, head_only)
+        return self.error_response(404, "unknown path", keep_alive, head_only)
+
+    @staticmethod
+    def query_value(query, name):
+        for pair in query.split(b'&'):
+            key, _, value = pair.partition(b'=')
+            if key == name:
+                return unquote_to_bytes(value.replace(b'+', b' ')).decode('utf-8', 'replace')
+        return None
+
+
+class JokeHTTPProtocol(asyncio.Protocol):
+    """One client connection. Handles keep-alive and pipelined requests."""
+
+    def __init__(self, service):
+        self.service = service
+        self.transport = None
+        self.buffer = b''
+        self.skip_body = 0            # body bytes of the last request still to be ignored
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+
+    def pause_writing(self):
+        # The client isn't reading its responses - stop reading its requests
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+    @staticmethod
+    def parse_headers(block):
+        """{lowercased name: stripped value} of the header lines, None if a line has no ':'"""
+        headers = {}
+        for line in block.split(b'\r\n'):
+            if not line:
+                continue
+            name, colon, value = line.partition(b':')
+            if not colon:
+                return None
+            headers[name.strip().lower()] = value.strip()
+        return headers
+
+    def data_received(self, data):
+        buf = self.buffer + data if self.buffer else data
+        pos = 0
+        if self.skip_body:
+            skipped = min(self.skip_body, len(buf))
+            self.skip_body -= skipped
+            pos = skipped
+        responses = []
+        close = False
+        while True:
+            end = buf.find(b'\r\n\r\n', pos)
+            if end == -1:
+                if len(buf) - pos > MAX_HEADER_BYTES:
+                    responses.append(self.service.error_response(413, "request headers too large", False))
+                    close = True
+                break
+            head = buf[pos:end]
+            pos = end + 4
+            line_end = head.find(b'\r\n')
+            request_line = head if line_end == -1 else head[:line_end]
+            parts = request_line.split(b' ')
+            if len(parts) != 3 or not parts[2].startswith(b'HTTP/1.'):
+                responses.append(self.service.error_response(400, "bad request line", False))
+                close = True
+                break
+            method, target, version = parts
+            keep_alive = version == b'HTTP/1.1'
+            headers = self.parse_headers(head[line_end + 2:] if line_end != -1 else b'')
+            if headers is None:
+                responses.append(self.service.error_response(400, "bad header line", False))
+                close = True
+                break
+            tokens = [t.strip() for t in headers.get(b'connection', b'').lower().split(b',')]
+            if b'close' in tokens:
+                keep_alive = False
+            elif b'keep-alive' in tokens:
+                keep_alive = True
+            if b'content-length' in headers:
+                # Bodies aren't used by any route, but they must not be read as requests.
+                # Digits only: int() would also take "-42" (and moving pos backwards
+                # would parse the same request again forever), "+5" or "1_0"
+                value = headers[b'content-length']
+                if not value.isdigit():
+                    responses.append(self.service.error_response(400, "bad Content-Length", False))
+                    close = True
+                    break
+                length = int(value)
+                skipped = min(length, len(buf) - pos)
+                pos += skipped
+                self.skip_body = length - skipped
+            responses.append(self.service.respond(method, target, keep_alive))
+            if not keep_alive:
+                close = True
+                break
+            if self.skip_body:
+                break
+        self.buffer = buf[pos:] if not close else b''
+        if responses:
+            self.transport.write(b''.join(responses))
+        if close:
+            self.transport.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+    loop = asyncio.get_running_loop()
+    if unix_path:
+        server = await loop.create_unix_server(lambda: JokeHTTPProtocol(service), path=unix_path)
+        where = unix_path
+    else:
+        server = await loop.create_server(lambda: JokeHTTPProtocol(service), host, port, backlog=1024)
+        where = f"http://{host}:{port}"
+    search = "with" if service.corpus.keyword_index is not None else "without"
+    print(f"Joke server on {where} ({len(service.jokes)} jokes, {search} keyword search)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve jokes as JSON over HTTP.")
+    parser.add_argument('--dir', default=jokes_dir(), help="folder of joke files")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Unix socket path instead of TCP")
+    parser.add_argument('--mode', default='shuffle', choices=SELECTION_MODES)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.dir)
+    if not corpus.jokes:
+        print("Error: no jokes to serve.")
+        sys.exit(1)
+    service = JokeService(corpus, args.mode, args.seed)
+    if args.unix and os.path.exists(args.unix) and stat.S_ISSOCK(os.stat(args.unix).st_mode):
+        os.remove(args.unix)      # left over from a previous run
+    try:
+        if HAS_UVLOOP:
+            uvloop.install()
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+
+if __name__ == "__main__":
+    main()
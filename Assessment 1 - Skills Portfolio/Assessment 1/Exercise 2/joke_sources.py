@@ -0,0 +1,168 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from joke_format import LINE_PARSERS
+
+# Reading jokes from a folder of source files.
+#
+# Every *.txt, *.jsonl and *.tsv file in the folder is a joke source. The
+# format is taken from the extension (.jsonl, .tsv); a .txt file is sniffed
+# from its first non-blank line, so a JSON-lines or tab-separated file saved
+# as .txt still works.
+#
+# Files are cut into line-aligned chunks of about CHUNK_BYTES and the chunks
+# are parsed in parallel: on threads for small corpora (no start-up cost), on
+# worker processes once there is enough text to be worth it. Results come
+# back in file order and are streamed into one list. A line that can't be
+# parsed is not guessed at - it becomes a LoadError (file, line, reason).
+
+SOURCE_FORMATS = {'.txt': 'text', '.jsonl': 'jsonl', '.tsv': 'tsv'}
+CHUNK_BYTES = 4 * 1024 * 1024
+PROCESS_POOL_MIN_BYTES = 16 * 1024 * 1024    # below this a thread pool is faster overall
+SNIFF_BYTES = 64 * 1024
+
+LoadError = namedtuple('LoadError', 'path line message')
+
+
+def find_joke_sources(folder):
+    """Joke source files in folder, sorted by name"""
+    try:
+        names = sorted(os.listdir(folder))
+    except OSError:
+        return []
+    return [os.path.join(folder, name) for name in names
+            if not name.startswith('.')
+            and os.path.splitext(name)[1].lower() in SOURCE_FORMATS
+            and os.path.isfile(os.path.join(folder, name))]
+
+
+def detect_format(path):
+    """'text', 'jsonl' or 'tsv'"""
+    fmt = SOURCE_FORMATS.get(os.path.splitext(path)[1].lower(), 'text')
+    if fmt != 'text':
+        return fmt
+    with open(path, "rb") as f:
+        sample = f.read(SNIFF_BYTES)
+    for line in sample.splitlines():
+        line = line.strip()
+        if line:
+            if line.startswith(b'{'):
+                return 'jsonl'
+            if b'\t' in line:
+                return 'tsv'
+            return 'text'
+    return 'text'
+
+
+def chunk_ranges(path, chunk_bytes=CHUNK_BYTES):
+    """(start, end) byte ranges covering the file, each ending at a line break"""
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + chunk_bytes
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()          # move on to the start of the next line
+                end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parse_chunk(path, fmt, start, end):
+    """Parse one chunk. Returns (jokes, errors, line_count); error line numbers
+    are counted from the start of the chunk. Runs in a worker thread or process."""
+    parse = LINE_PARSERS[fmt]
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    if start == 0 and data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]               # UTF-8 byte order mark
+    lines = data.split(b'\n')
+    if lines and lines[-1] == b'':
+        lines.pop()                   # chunk ends with a line break
+    jokes = []
+    errors = []
+    for number, raw in enumerate(lines, 1):
+        try:
+            joke = parse(raw.decode('utf-8'))
+        except UnicodeDecodeError:
+            errors.append((number, "not valid UTF-8"))
+            continue
+        except ValueError as e:
+            errors.append((number, str(e)))
+            continue
+        if joke:
+            jokes.append(joke)
+    return jokes, errors, len(lines)
+
+
+def _parse_task(task):
+    return parse_chunk(*task)
+
+
+def _make_pool(total_bytes, workers):
+    # Sending parsed jokes back from a process costs about as much as parsing
+    # them, so processes only pay off for big corpora on several cores.
+    if total_bytes >= PROCESS_POOL_MIN_BYTES and (os.cpu_count() or 1) > 2:
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) + 2))
+
+
+def iter_joke_batches(paths, workers=None):
+    """Yields (jokes, errors) per chunk, in file and line order. Errors are LoadErrors."""
+    tasks = []
+    total_bytes = 0
+    for path in paths:
+        try:
+            fmt = detect_format(path)
+            ranges = chunk_ranges(path)
+        except OSError as e:
+            yield [], [LoadError(path, 0, f"could not read file ({e.strerror or e})")]
+            continue
+        for start, end in ranges:
+            tasks.append((path, fmt, start, end))
+            total_bytes += end - start
+
+    if len(tasks) <= 1:
+        results = map(_parse_task, tasks)       # one chunk: no pool needed
+        pool = None
+    else:
+        pool = _make_pool(total_bytes, workers)
+        results = pool.map(_parse_task, tasks)
+    try:
+        line_base = {}
+        for (path, fmt, start, end), (jokes, errors, line_count) in zip(tasks, results):
+            base = line_base.get(path, 0)
+            line_base[path] = base + line_count
+            yield jokes, [LoadError(path, base + n, message) for n, message in errors]
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def read_joke_sources(paths, workers=None):
+    """All jokes from the source files in order, plus the list of LoadErrors"""
+    jokes = []
+    errors = []
+    for batch, batch_errors in iter_joke_batches(paths, workers):
+        jokes.extend(batch)
+        errors.extend(batch_errors)
+    return jokes, errors
+
+
+def describe_errors(errors, limit=10, total=None):
+    """Short text report of load errors (total: the full count if errors is only the first few)"""
+    total = len(errors) if total is None else total
+    files = len({e.path for e in errors})
+    lines = [f"{total} joke line(s) could not be loaded from {files} file(s):"]
+    for e in errors[:limit]:
+        lines.append(f"  {os.path.basename(e.path)}:{e.line}: {e.message}")
+    if total > limit:
+        lines.append(f"  ... {total - limit} more")
+    return "\n".join(lines)
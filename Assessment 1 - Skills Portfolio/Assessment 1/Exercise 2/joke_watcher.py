@@ -0,0 +1,215 @@
+import os
+import queue
+import threading
+from collections.abc import Sequence
+
+from joke_corpus import load_corpus
+from joke_sources import LoadError, find_joke_sources, detect_format, parse_chunk, describe_errors
+
+# Hot reload of the joke folder while the app is running.
+#
+# Every POLL_MS the watcher stats the joke files (on root.after, so it never
+# touches Tk from another thread). There are two kinds of change:
+#
+#   appended  - the only change is that files got longer and the bytes they
+#               had before are untouched (checked against a saved tail).
+#               Only the new bytes are parsed, on the Tk thread, and the jokes
+#               are added to the end of the corpus, the keyword index and the
+#               selector's shuffle bag.
+#   anything else (a file edited, added, removed or truncated)
+#             - the whole corpus is rebuilt by load_corpus on a background
+#               thread and handed back through a queue; the Tk side swaps it
+#               in with one call. The joke on screen keeps its own copy of its
+#               text, so a reveal in progress carries on.
+#
+# The app's first load goes the same way (start(load_first=True)), so a cold
+# load - parsing and deduplicating a big folder - never holds up the window.
+#
+# Appended jokes are not checked for near-duplicates until the next full load.
+# (Polling is used on every platform: the standard library has no inotify.)
+
+POLL_MS = 2000
+RESULT_POLL_MS = 100          # how often a running rebuild is checked for its result
+TAIL_BYTES = 256              # bytes before the old end that must be unchanged for an append
+MAX_APPEND_BYTES = 4 * 1024 * 1024   # bigger appends are rebuilt in the background instead
+
+
+class GrowingJokeList(Sequence):
+    """A read-only corpus (cache or lazy list) with jokes added on the end"""
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = []
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < len(self.base):
+            return self.base[index]
+        return self.extra[index - len(self.base)]
+
+    def extend(self, jokes):
+        self.extra.extend(jokes)
+
+
+def file_state(path):
+    """(size, mtime_ns, tail bytes, ends with a newline) of a joke file"""
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        f.seek(max(0, st.st_size - TAIL_BYTES))
+        tail = f.read(TAIL_BYTES)
+    return st.st_size, st.st_mtime_ns, tail, tail.endswith(b'\n')
+
+
+def folder_state(folder):
+    state = {}
+    for path in find_joke_sources(folder):
+        try:
+            state[path] = file_state(path)
+        except OSError:
+            pass        # vanished between listing and stat - the next poll sees it
+    return state
+
+
+class CorpusWatcher:
+    def __init__(self, root, folder, corpus, on_append, on_reload, poll_ms=POLL_MS):
+        """on_append(jokes, errors) after new jokes were added to corpus in place;
+        on_reload(corpus) with a freshly built corpus. Both run on the Tk thread."""
+        self.root = root
+        self.folder = folder
+        self.corpus = corpus
+        self.on_append = on_append
+        self.on_reload = on_reload
+        self.poll_ms = poll_ms
+        self.state = folder_state(folder)
+        self.results = queue.Queue()
+        self.rebuilding = None        # folder state the running rebuild started from
+        self.timer_id = None
+
+    def start(self, load_first=False):
+        """load_first: build the corpus on a background thread straight away; it
+        arrives through on_reload like any rebuild (even if polling is off)"""
+        if load_first and self.rebuilding is None:
+            self._start_rebuild(self.state)
+        if self.timer_id is None:
+            if self.rebuilding is not None:
+                self.timer_id = self.root.after(RESULT_POLL_MS, self._poll)
+            elif self.poll_ms > 0:
+                self.timer_id = self.root.after(self.poll_ms, self._poll)
+
+    def stop(self):
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+
+    def _poll(self):
+        self.timer_id = None
+        if self.rebuilding is not None:
+            self._check_rebuild()
+        else:
+            new_state = folder_state(self.folder)
+            if new_state != self.state:
+                appended = self._appended_ranges(new_state)
+                if appended is None:
+                    self._start_rebuild(new_state)
+                else:
+                    self._apply_append(appended)
+                    self.state = new_state
+        if self.rebuilding is not None:
+            self.timer_id = self.root.after(RESULT_POLL_MS, self._poll)
+        elif self.poll_ms > 0:
+            self.timer_id = self.root.after(self.poll_ms, self._poll)
+
+    # --- appended lines ---
+
+    def _appended_ranges(self, new_state):
+        """[(path, start, end)] if every change is an append, else None"""
+        if self.corpus.keyword_index is None or new_state.keys() != self.state.keys():
+            return None         # lazy corpus, or files added / removed
+        ranges = []
+        total = 0
+        for path, (size, mtime_ns, tail, ends_with_newline) in new_state.items():
+            old_size, old_mtime_ns, old_tail, old_newline = self.state[path]
+            if (size, mtime_ns) == (old_size, old_mtime_ns):
+                continue
+            if size <= old_size:
+                return None
+            with open(path, "rb") as f:
+                f.seek(old_size - len(old_tail))
+                before = f.read(len(old_tail) + 1)
+            if before[:len(old_tail)] != old_tail:
+                return None     # earlier text was edited
+            start = old_size
+            if not old_newline and old_size > 0:
+                # The last line had no line break; it must be ended, not continued
+                if before[len(old_tail):] != b'\n':
+                    return None
+                start += 1
+            ranges.append((path, start, size))
+            total += size - start
+        if total > MAX_APPEND_BYTES:
+            return None
+        return ranges
+
+    def _apply_append(self, ranges):
+        new_jokes = []
+        errors = []
+        for path, start, end in ranges:
+            try:
+                jokes, chunk_errors, _ = parse_chunk(path, detect_format(path), start, end)
+            except OSError as e:
+                errors.append(LoadError(path, 0, f"could not read file ({e.strerror or e})"))
+                continue
+            if chunk_errors:
+                with open(path, "rb") as f:
+                    lines_before = f.read(start).count(b'\n')
+                errors.extend(LoadError(path, lines_before + n, message) for n, message in chunk_errors)
+            new_jokes.extend(jokes)
+        if errors:
+            print(describe_errors(errors))
+        if not new_jokes:
+            return
+        jokes = self.corpus.jokes
+        if not isinstance(jokes, (list, GrowingJokeList)):
+            jokes = self.corpus.jokes = GrowingJokeList(jokes)
+        first = len(jokes)
+        jokes.extend(new_jokes)
+        for number, joke in enumerate(new_jokes, first):
+            self.corpus.keyword_index.add(number, joke)
+        self.on_append(new_jokes, errors)
+
+    # --- full rebuild ---
+
+    def _start_rebuild(self, new_state):
+        self.rebuilding = new_state
+        thread = threading.Thread(target=self._rebuild, name="corpus-rebuild", daemon=True)
+        thread.start()
+
+    def _rebuild(self):
+        try:
+            self.results.put(load_corpus(self.folder))
+        except Exception as e:
+            self.results.put(e)
+
+    def _check_rebuild(self):
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            return
+        started_from = self.rebuilding
+        self.rebuilding = None
+        if isinstance(result, Exception):
+            print(f"Error reloading jokes: {result}")
+            self.state = started_from     # don't retry until the files change again
+            return
+        old = self.corpus
+        self.corpus = result
+        self.state = started_from         # later changes are picked up by the next poll
+        self.on_reload(result)
+        if hasattr(old.jokes, 'close'):
+            old.jokes.close()             # lazy corpus: release its memory maps
@@ -0,0 +1,120 @@
+import time
+
+# Frame-clocked "typewriter" text reveal.
+#
+# One root.after timer drives every running animation. Each frame works out
+# from a monotonic clock how many characters should be visible by now and
+# shows them all at once, so a slow frame just reveals more characters next
+# time instead of falling behind. The label is only updated when the visible
+# count actually changed.
+
+DEFAULT_CHAR_MS = 30        # same pace as the old one-after()-per-character reveal
+FRAME_MS = 16               # ~60 fps
+
+
+class Reveal:
+    """One running animation (returned by RevealEngine.animate)"""
+
+    def __init__(self, label, text, char_ms, start, shown, on_chars, on_done):
+        self.label = label
+        self.text = text
+        self.char_ms = char_ms
+        self.start = start
+        self.base = shown         # characters already visible when the animation started
+        self.shown = shown
+        self.on_chars = on_chars
+        self.on_done = on_done
+        self.cancelled = False
+
+    @property
+    def finished(self):
+        return self.shown >= len(self.text)
+
+
+class RevealEngine:
+    def __init__(self, root, char_ms=DEFAULT_CHAR_MS, frame_ms=FRAME_MS, clock=time.monotonic):
+        self.root = root
+        self.char_ms = char_ms
+        self.frame_ms = frame_ms
+        self.clock = clock
+        self.active = {}          # label -> Reveal, at most one animation per label
+        self.timer_id = None
+        self.frames = 0           # frame count and last frame time, handy for profiling
+        self.last_frame_time = None
+
+    def animate(self, label, text, on_chars=None, on_done=None, char_ms=None, start_index=0,
+                first_char_now=False):
+        """Reveal text in label. on_chars(new_text) is called each frame that shows
+        new characters, on_done() once the whole text is visible. With first_char_now
+        the first character appears on the next frame instead of one char_ms later."""
+        self.cancel_label(label)
+        char_ms = char_ms or self.char_ms
+        start = self.clock()
+        if first_char_now:
+            start -= char_ms / 1000
+        reveal = Reveal(label, text, char_ms, start, start_index, on_chars, on_done)
+        label.config(text=text[:start_index])
+        self.active[label] = reveal
+        if reveal.finished:
+            self._finish(reveal)
+        elif self.timer_id is None:
+            self.timer_id = self.root.after(self.frame_ms, self._tick)
+        return reveal
+
+    def cancel(self, reveal):
+        if reveal is None:
+            return
+        reveal.cancelled = True
+        if self.active.get(reveal.label) is reveal:
+            del self.active[reveal.label]
+        self._stop_timer_if_idle()
+
+    def cancel_label(self, label):
+        reveal = self.active.get(label)
+        if reveal is not None:
+            self.cancel(reveal)
+
+    def cancel_all(self):
+        for reveal in list(self.active.values()):
+            reveal.cancelled = True
+        self.active.clear()
+        self._stop_timer_if_idle()
+
+    def finish_now(self, reveal):
+        """Jump straight to the full text"""
+        if reveal is not None and not reveal.cancelled and not reveal.finished:
+            self._show(reveal, len(reveal.text))
+
+    def _stop_timer_if_idle(self):
+        if not self.active and self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+
+    def _show(self, reveal, due):
+        new_text = reveal.text[reveal.shown:due]
+        reveal.shown = due
+        reveal.label.config(text=reveal.text[:due])
+        if reveal.on_chars and new_text:
+            reveal.on_chars(new_text)
+        if reveal.finished:
+            self._finish(reveal)
+
+    def _finish(self, reveal):
+        if self.active.get(reveal.label) is reveal:
+            del self.active[reveal.label]
+        if reveal.on_done and not reveal.cancelled:
+            reveal.on_done()
+
+    def _tick(self):
+        self.timer_id = None
+        now = self.clock()
+        self.frames += 1
+        self.last_frame_time = now
+        for reveal in list(self.active.values()):
+            if reveal.cancelled:
+                continue
+            due = min(len(reveal.text), reveal.base + int((now - reveal.start) * 1000 / reveal.char_ms))
+            if due > reveal.shown:
+                self._show(reveal, due)
+        if self.active and self.timer_id is None:
+            self.timer_id = self.root.after(self.frame_ms, self._tick)
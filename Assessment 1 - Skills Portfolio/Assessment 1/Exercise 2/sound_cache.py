@@ -0,0 +1,63 @@
+import os
+import sys
+import mmap
+import hashlib
+
+# Decoded-PCM cache for the joke app's MP3 sounds.
+#
+# Decoding an MP3 through pygame.mixer.Sound costs time on every launch. The
+# first time a sound is decoded its raw samples (Sound.get_raw()) are written
+# to a .pcm file in the user's cache folder. The file name holds the MP3's
+# SHA-1 and the mixer format (frequency, sample size, channels), so a changed
+# asset or a different mixer setup simply misses the cache. Later launches
+# memory-map that file and hand it to pygame.mixer.Sound(buffer=...) - no decode.
+
+
+def default_cache_dir():
+    """Per-user cache folder (the app folder may be read-only)"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'alexa_joke_app', 'sounds')
+
+
+def file_sha1(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def cache_file_for(path, mixer_format, cache_dir):
+    frequency, size, channels = mixer_format
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{file_sha1(path)[:20]}-{frequency}-{size}-{channels}.pcm")
+
+
+def load_sound(pygame, path, cache_dir=None):
+    """pygame Sound for path, from the PCM cache when possible."""
+    mixer_format = pygame.mixer.get_init()
+    if not mixer_format:
+        raise RuntimeError("pygame mixer is not initialised")
+    cache_dir = cache_dir or default_cache_dir()
+    cached = cache_file_for(path, mixer_format, cache_dir)
+
+    if os.path.exists(cached) and os.path.getsize(cached) > 0:
+        try:
+            with open(cached, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as samples:
+                    return pygame.mixer.Sound(buffer=samples)
+        except (OSError, ValueError, pygame.error):
+            pass    # damaged cache file - decode again below
+
+    sound = pygame.mixer.Sound(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cached + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(sound.get_raw())
+        os.replace(tmp_path, cached)
+    except OSError as e:
+        print(f"Warning: could not cache decoded sound: {e}")
+    return sound
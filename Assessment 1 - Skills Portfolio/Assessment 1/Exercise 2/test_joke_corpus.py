@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+
+from joke_corpus import load_corpus
+from joke_format import parse_jsonl_joke, parse_tsv_joke
+from joke_index import open_lazy_corpus, index_path_for
+from joke_sources import read_joke_sources
+from joke_selection import JokeSelector
+
+
+class JokeWeightTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        with open(os.path.join(self.folder, "a.jsonl"), "w", encoding="utf-8") as f:
+            f.write('{"setup": "Why did the chicken cross the road?", "punchline": "To get away.", "weight": 8}\n')
+            f.write('{"setup": "What do you call a fish with no eyes?", "punchline": "A fsh."}\n')
+        with open(os.path.join(self.folder, "b.tsv"), "w", encoding="utf-8") as f:
+            f.write("setup\tpunchline\tweight\n")
+            f.write("Why was the maths book sad?\tIt had too many problems.\t0\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def weights(self, corpus):
+        return {j['setup'][:8]: j.get('weight', 1.0) for j in corpus.jokes}
+
+    def test_weights_survive_parsing_and_the_cache(self):
+        expected = {"Why did ": 8.0, "What do ": 1.0, "Why was ": 0.0}
+        parsed = load_corpus(self.folder, workers=1, verbose=False)
+        self.assertFalse(parsed.from_cache)
+        self.assertEqual(self.weights(parsed), expected)
+        cached = load_corpus(self.folder, workers=1, verbose=False)
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(self.weights(cached), expected)
+
+        selector = JokeSelector(cached.jokes, 'weighted', seed=1)
+        counts = Counter(selector.next_joke()['setup'][:8] for _ in range(9000))
+        self.assertEqual(counts["Why was "], 0)
+        self.assertGreater(counts["Why did "], 6 * counts["What do "])
+
+    def test_all_zero_weights_are_picked_equally(self):
+        jokes = [{'setup': str(n), 'punchline': "x", 'weight': 0.0} for n in range(3)]
+        selector = JokeSelector(jokes, 'weighted', seed=1)
+        self.assertEqual({selector.next_joke()['setup'] for _ in range(200)}, {"0", "1", "2"})
+
+    def test_bad_weights_are_load_errors(self):
+        for line in ('{"setup": "a?", "punchline": "b", "weight": -1}',
+                     '{"setup": "a?", "punchline": "b", "weight": "heavy"}',
+                     '{"setup": "a?", "punchline": "b", "weight": true}'):
+            with self.assertRaises(ValueError, msg=line):
+                parse_jsonl_joke(line)
+        with self.assertRaises(ValueError):
+            parse_tsv_joke("a?\tb\tlots")
+
+
+class LazyCorpusTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, "big.txt")
+        with open(self.path, "wb") as f:
+            f.write(b"Why did the cow cross the road? To get to the udder side.\n"
+                    b"no question mark here\n"
+                    b"\n"
+                    b"What is orange and sounds like a parrot?   \n"
+                    b"Why \xff? Broken bytes.\n"
+                    b"What do you call a sleeping bull? A bulldozer.")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_lazy_and_eager_loading_agree(self):
+        jokes, errors = read_joke_sources([self.path])
+        for build_index in (True, False):
+            if not build_index:
+                os.remove(index_path_for(self.path))
+                os.mkdir(index_path_for(self.path))     # index can't be written: kept in memory
+            lazy = open_lazy_corpus(self.path)
+            try:
+                self.assertEqual(list(lazy), jokes)
+                self.assertEqual(lazy.load_errors, errors)
+                self.assertEqual(lazy.error_count, 3)
+            finally:
+                lazy.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
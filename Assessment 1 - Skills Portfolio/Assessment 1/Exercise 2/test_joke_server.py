@@ -0,0 +1,73 @@
+import unittest
+
+from joke_corpus import JokeCorpus
+from joke_server import JokeService, JokeHTTPProtocol
+
+
+class FakeTransport:
+    def __init__(self):
+        self.written = []
+        self.closed = False
+
+    def write(self, data):
+        self.written.append(data)
+
+    def close(self):
+        self.closed = True
+
+
+def make_protocol():
+    corpus = JokeCorpus([{'setup': "Why?", 'punchline': "Because."}], [])
+    service = JokeService(corpus, seed=1)
+    protocol = JokeHTTPProtocol(service)
+    transport = FakeTransport()
+    protocol.connection_made(transport)
+    return service, protocol, transport
+
+
+class ContentLengthTest(unittest.TestCase):
+    def test_negative_length_is_rejected(self):
+        service, protocol, transport = make_protocol()
+        protocol.data_received(b"GET /joke HTTP/1.1\r\nContent-Length: -42\r\n\r\n")
+        self.assertEqual(service.requests, 0)
+        self.assertTrue(transport.closed)
+        self.assertTrue(b"".join(transport.written).startswith(b"HTTP/1.1 400"))
+
+    def test_non_digit_lengths_are_rejected(self):
+        for value in (b"+5", b"1_0", b"abc", b""):
+            service, protocol, transport = make_protocol()
+            protocol.data_received(b"GET /joke HTTP/1.1\r\nContent-Length: " + value + b"\r\n\r\n")
+            self.assertTrue(transport.closed, value)
+            self.assertTrue(b"".join(transport.written).startswith(b"HTTP/1.1 400"), value)
+
+    def test_body_is_skipped(self):
+        service, protocol, transport = make_protocol()
+        protocol.data_received(b"GET /health HTTP/1.1\r\nContent-Length: 5\r\n\r\nhello"
+                               b"GET /health HTTP/1.1\r\n\r\n")
+        self.assertEqual(b"".join(transport.written).count(b"HTTP/1.1 200"), 2)
+        self.assertFalse(transport.closed)
+
+
+class HeaderTest(unittest.TestCase):
+    def test_headers_are_matched_by_name(self):
+        for header in (b"X-Content-Length: 5", b"X-Note: connection: closely"):
+            service, protocol, transport = make_protocol()
+            protocol.data_received(b"GET /health HTTP/1.1\r\n" + header + b"\r\n\r\n"
+                                   b"GET /health HTTP/1.1\r\n\r\n")
+            self.assertEqual(b"".join(transport.written).count(b"HTTP/1.1 200"), 2, header)
+            self.assertFalse(transport.closed, header)
+
+    def test_connection_close_is_honoured(self):
+        service, protocol, transport = make_protocol()
+        protocol.data_received(b"GET /health HTTP/1.1\r\nConnection:  Close\r\n\r\n"
+                               b"GET /health HTTP/1.1\r\n\r\n")
+        self.assertEqual(b"".join(transport.written).count(b"HTTP/1.1 200"), 1)
+        self.assertTrue(transport.closed)
+
+    def test_query_values_are_utf8(self):
+        self.assertEqual(JokeService.query_value("about=caf\u00e9+cr%C3%A8me".encode('utf-8'), b'about'),
+                         "caf\u00e9 cr\u00e8me")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# Pre-wrapping of joke text for the reveal labels.
+#
+# A label with wraplength re-wraps its text every time the text changes, so
+# while a joke is typed out a half-typed word at the end of a line jumps to
+# the next line once it gets too long, and the label grows a line at a time.
+# Breaking the lines up front (measured with the label's tkinter.font.Font)
+# means each character is revealed where it will finally sit, and the label
+# height can be set to the final line count before the reveal starts.
+#
+# Breaks replace a space with a newline, so the wrapped text normally has the
+# same length as the original (only a word wider than a line gets an extra one).
+
+MAX_CACHED_WORDS = 20000
+
+
+class LineWrapper:
+    def __init__(self, font, width):
+        self.font = font              # tkinter.font.Font used by the label
+        self.width = width            # the label's wraplength, in pixels
+        self.space = font.measure(' ')
+        self.word_widths = {}
+
+    def measure(self, word):
+        width = self.word_widths.get(word)
+        if width is None:
+            width = self.font.measure(word)
+            if len(self.word_widths) < MAX_CACHED_WORDS:
+                self.word_widths[word] = width
+        return width
+
+    def wrap(self, text):
+        """Lines of text that each fit in width (like Tk's own word wrap)"""
+        lines = []
+        for paragraph in text.split('\n'):
+            line = []
+            line_width = 0
+            for word in paragraph.split(' '):
+                word_width = self.measure(word)
+                if line and line_width + self.space + word_width > self.width:
+                    lines.append(' '.join(line))
+                    line = []
+                    line_width = 0
+                if not line and word_width > self.width:
+                    # A word wider than the label is broken between characters
+                    pieces = self._split_long_word(word)
+                    lines.extend(pieces[:-1])
+                    word = pieces[-1]
+                    word_width = self.measure(word)
+                line_width += (self.space if line else 0) + word_width
+                line.append(word)
+            lines.append(' '.join(line))
+        return lines
+
+    def layout(self, text):
+        """(text with line breaks in place of the wrapping spaces, number of lines)"""
+        lines = self.wrap(text)
+        return '\n'.join(lines), len(lines)
+
+    def _split_long_word(self, word):
+        pieces = []
+        start = 0
+        for end in range(1, len(word) + 1):
+            if end - start > 1 and self.font.measure(word[start:end]) > self.width:
+                pieces.append(word[start:end - 1])
+                start = end - 1
+        pieces.append(word[start:])
+        return pieces
@@ -0,0 +1,204 @@
+import os
+import sys
+import glob
+import lzma
+import zlib
+import struct
+import codecs
+import argparse
+
+# Compressed, checksummed archives of old studentMarks.txt files.
+#
+# Layout:  header  8s magic, B method, 3x padding
+#          body    one zlib or xz stream of the original text
+#          trailer I crc32 of the text, Q length of the text
+#
+# Everything is streamed in CHUNK_SIZE pieces in both directions, so archiving
+# or reading a term never needs the whole file (or a temp copy) in memory.
+
+MAGIC = b'COHORTZ1'
+HEADER_FORMAT = '<8sB3x'
+TRAILER_FORMAT = '<IQ'
+METHODS = {'zlib': 1, 'lzma': 2}
+CHUNK_SIZE = 64 * 1024
+ARCHIVE_EXTENSION = ".cohort"
+
+
+class ArchiveError(Exception):
+    """Archive is damaged, truncated or not an archive at all"""
+
+
+def is_archive(filename):
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _compressor(method):
+    if method == METHODS['zlib']:
+        return zlib.compressobj(9)
+    if method == METHODS['lzma']:
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=6)
+    raise ArchiveError(f"Unknown compression method {method}.")
+
+
+def _decompressor(method):
+    if method == METHODS['zlib']:
+        return zlib.decompressobj()
+    if method == METHODS['lzma']:
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+    raise ArchiveError(f"Unknown compression method {method}.")
+
+
+def archive_file(source, destination, method='lzma'):
+    """Compress a studentMarks.txt file into an archive. Returns (original, compressed) sizes."""
+    method_id = METHODS[method]
+    compressor = _compressor(method_id)
+    crc = 0
+    length = 0
+    tmp_path = destination + ".tmp"
+    with open(source, "rb") as src, open(tmp_path, "wb") as dst:
+        dst.write(struct.pack(HEADER_FORMAT, MAGIC, method_id))
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            length += len(chunk)
+            dst.write(compressor.compress(chunk))
+        dst.write(compressor.flush())
+        dst.write(struct.pack(TRAILER_FORMAT, crc, length))
+    os.replace(tmp_path, destination)
+    return length, os.path.getsize(destination)
+
+
+def iter_archive_chunks(filename):
+    """Yields the original bytes of an archive piece by piece, then checks the trailer."""
+    header_size = struct.calcsize(HEADER_FORMAT)
+    trailer_size = struct.calcsize(TRAILER_FORMAT)
+    with open(filename, "rb") as f:
+        header = f.read(header_size)
+        if len(header) != header_size:
+            raise ArchiveError(f"{filename} is too short to be an archive.")
+        magic, method_id = struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC:
+            raise ArchiveError(f"{filename} is not a cohort archive.")
+        decompressor = _decompressor(method_id)
+        crc = 0
+        length = 0
+        pending = b''
+        while not decompressor.eof:
+            if not pending:
+                pending = f.read(CHUNK_SIZE)
+                if not pending:
+                    raise ArchiveError(f"{filename} is truncated.")
+            # Cap each step's output so a highly compressible chunk can't balloon
+            if method_id == METHODS['zlib']:
+                data = decompressor.decompress(pending, CHUNK_SIZE)
+                pending = decompressor.unconsumed_tail
+            else:
+                data = decompressor.decompress(pending, max_length=CHUNK_SIZE)
+                pending = b''
+                while not decompressor.eof and not decompressor.needs_input:
+                    if data:
+                        crc = zlib.crc32(data, crc)
+                        length += len(data)
+                        yield data
+                    data = decompressor.decompress(b'', max_length=CHUNK_SIZE)
+            if data:
+                crc = zlib.crc32(data, crc)
+                length += len(data)
+                yield data
+        trailer = (decompressor.unused_data + pending + f.read(trailer_size))[:trailer_size]
+    if len(trailer) != trailer_size:
+        raise ArchiveError(f"{filename} is missing its checksum.")
+    expected_crc, expected_length = struct.unpack(TRAILER_FORMAT, trailer)
+    if crc != expected_crc or length != expected_length:
+        raise ArchiveError(f"{filename} failed its checksum - the archive is damaged.")
+
+
+def iter_archive_lines(filename, encoding="utf-8"):
+    """Text lines of an archive, decoded on the fly."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    partial = ''
+    for chunk in iter_archive_chunks(filename):
+        text = partial + decoder.decode(chunk)
+        lines = text.split("\n")
+        partial = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    partial += decoder.decode(b'', final=True)
+    if partial:
+        yield partial
+
+
+def restore_file(archive, destination):
+    """Decompress an archive back to a plain studentMarks.txt. Returns bytes written."""
+    written = 0
+    tmp_path = destination + ".tmp"
+    try:
+        with open(tmp_path, "wb") as dst:
+            for chunk in iter_archive_chunks(archive):
+                dst.write(chunk)
+                written += len(chunk)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, destination)
+    return written
+
+
+def term_summary(filename):
+    """Count and average percentage for one term, streaming one student at a time."""
+    from studentmarks import iter_students, calculate_overall_percentage
+    count = 0
+    total_pct = 0.0
+    for student in iter_students(filename):
+        count += 1
+        total_pct += calculate_overall_percentage(student)
+    return count, (total_pct / count) if count else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive, restore and summarise old cohorts.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cmd = commands.add_parser('archive', help="compress a student marks file")
+    cmd.add_argument('source')
+    cmd.add_argument('destination', nargs='?')
+    cmd.add_argument('--method', choices=sorted(METHODS), default='lzma')
+
+    cmd = commands.add_parser('restore', help="decompress an archive back to text")
+    cmd.add_argument('archive')
+    cmd.add_argument('destination')
+
+    cmd = commands.add_parser('trend', help="class averages across archived terms")
+    cmd.add_argument('archives', nargs='+')
+
+    args = parser.parse_args()
+    try:
+        if args.command == 'archive':
+            destination = args.destination or os.path.splitext(args.source)[0] + ARCHIVE_EXTENSION
+            original, compressed = archive_file(args.source, destination, args.method)
+            ratio = (compressed / original * 100) if original else 0.0
+            print(f"Archived {args.source} -> {destination} ({original} -> {compressed} bytes, {ratio:.1f}%)")
+        elif args.command == 'restore':
+            written = restore_file(args.archive, args.destination)
+            print(f"Restored {args.destination} ({written} bytes, checksum OK)")
+        else:
+            paths = []
+            for pattern in args.archives:
+                paths.extend(sorted(glob.glob(pattern)) or [pattern])
+            for path in paths:
+                count, avg = term_summary(path)
+                print(f"{os.path.basename(path):<40} students: {count:>6}  average: {avg:6.2f}%")
+    except (OSError, ArchiveError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import bisect
+from contextlib import contextmanager
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:  # pragma: no cover - Windows only
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Change history for studentMarks.txt, kept in studentMarks.history next to it.
+#
+# Every add/update/delete is appended as one tab-separated line:
+#     C <absolute ms timestamp> <student code> <field> <old json> <new json>
+# Field "+" is a new student (new = whole record), "-" a deleted one (old = whole record).
+# Every CHECKPOINT_EVERY changes a full copy of the cohort is appended:
+#     K <absolute ms timestamp> <json list of students>
+# so "marks as of T" starts from the nearest checkpoint before T and only
+# replays the changes after it, instead of the whole history.
+#
+# The GUI and the records server can both write to the same history. Writes
+# hold a lock on the file and first read any lines the other one appended, so
+# timestamps stay in order on disk; queries read those lines too.
+
+CHECKPOINT_EVERY = 100
+STUDENT_FIELDS = ('name', 'course1', 'course2', 'course3', 'exam')
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def history_filename(data_filename):
+    return os.path.splitext(data_filename)[0] + ".history"
+
+
+@contextmanager
+def locked(f):
+    """Hold an exclusive lock on an open file (where the platform has one)"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        yield
+
+
+class MarkHistory:
+    def __init__(self, data_filename):
+        self.filename = history_filename(data_filename)
+        self.changes = []             # (ts, code, field, old, new) in time order
+        self.change_times = []        # ts of each change, for bisect
+        self.checkpoints = []         # (ts, index into changes, {code: student})
+        self.checkpoint_times = []
+        self.last_ts = 0
+        self.read_to = 0              # bytes of the file read so far
+        self.load()
+
+    # --- reading the log ---
+
+    def load(self):
+        """Read the lines added to the file since the last load (all of it the first time)"""
+        try:
+            with open(self.filename, "rb") as f:
+                f.seek(self.read_to)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1      # a line still being written waits for next time
+        for line in data[:end].decode("utf-8").splitlines():
+            self._load_line(line.split("\t"))
+        self.read_to += end
+
+    def _load_line(self, parts):
+        if parts[0] == 'K' and len(parts) == 3:
+            self.last_ts = max(self.last_ts, int(parts[1]))
+            self._add_checkpoint(int(parts[1]), json.loads(parts[2]))
+        elif parts[0] == 'C' and len(parts) == 6:
+            self.last_ts = max(self.last_ts, int(parts[1]))
+            self._add_change(int(parts[1]), parts[2], parts[3], json.loads(parts[4]), json.loads(parts[5]))
+
+    def _add_checkpoint(self, ts, students):
+        state = {s['student_code']: dict(s) for s in students}
+        self.checkpoints.append((ts, len(self.changes), state))
+        self.checkpoint_times.append(ts)
+
+    def _add_change(self, ts, code, field, old, new):
+        self.changes.append((ts, code, field, old, new))
+        self.change_times.append(ts)
+
+    # --- writing the log ---
+
+    @contextmanager
+    def _writing(self):
+        """Lock the file and catch up on other writers' lines, then yield a
+        function that appends lines to it"""
+        with open(self.filename, "ab") as f, locked(f):
+            self.load()
+            f.seek(0, os.SEEK_END)
+            if f.tell() != self.read_to:
+                f.truncate(self.read_to)      # a line cut short by a crash
+
+            def append(lines):
+                data = "".join(line + "\n" for line in lines).encode("utf-8")
+                f.write(data)
+                f.flush()
+                self.read_to += len(data)
+            yield append
+
+    def _timestamp(self, ts):
+        # Never before the last line on disk, so as_of can bisect
+        ts = now_ms() if ts is None else ts
+        return max(ts, self.last_ts)
+
+    def _checkpoint(self, append, students, ts):
+        ts = self._timestamp(ts)
+        append(["K\t{}\t{}".format(ts, json.dumps(students))])
+        self._add_checkpoint(ts, students)
+        self.last_ts = ts
+
+    def checkpoint(self, students, ts=None):
+        with self._writing() as append:
+            self._checkpoint(append, students, ts)
+
+    def ensure_started(self, students):
+        """The first checkpoint is the cohort as it was when history began."""
+        if self.checkpoints:
+            return
+        with self._writing() as append:
+            if not self.checkpoints:          # nobody else started it meanwhile
+                self._checkpoint(append, students, None)
+
+    def _record(self, entries, students, ts):
+        if not entries:
+            return
+        with self._writing() as append:
+            ts = self._timestamp(ts)
+            lines = []
+            for code, field, old, new in entries:
+                lines.append("C\t{}\t{}\t{}\t{}\t{}".format(ts, code, field, json.dumps(old), json.dumps(new)))
+                self._add_change(ts, code, field, old, new)
+            append(lines)
+            self.last_ts = ts
+            since_checkpoint = len(self.changes) - self.checkpoints[-1][1] if self.checkpoints else len(self.changes)
+            if students is not None and since_checkpoint >= CHECKPOINT_EVERY:
+                self._checkpoint(append, students, ts)
+
+    def record_update(self, old_student, new_student, students=None, ts=None):
+        """Log every field that changed. Pass the full cohort so checkpoints can be taken."""
+        entries = [(old_student['student_code'], key, old_student[key], new_student[key])
+                   for key in STUDENT_FIELDS if old_student[key] != new_student[key]]
+        self._record(entries, students, ts)
+
+    def record_add(self, student, students=None, ts=None):
+        self._record([(student['student_code'], '+', None, dict(student))], students, ts)
+
+    def record_delete(self, student, students=None, ts=None):
+        self._record([(student['student_code'], '-', dict(student), None)], students, ts)
+
+    # --- queries ---
+
+    def starts_at(self):
+        self.load()
+        return self.checkpoint_times[0] if self.checkpoint_times else None
+
+    def as_of(self, ts):
+        """The cohort exactly as it stood at timestamp ts (ms). None if history starts later."""
+        self.load()
+        i = bisect.bisect_right(self.checkpoint_times, ts) - 1
+        if i < 0:
+            return None
+        _, start, state = self.checkpoints[i]
+        state = {code: dict(s) for code, s in state.items()}
+        end = bisect.bisect_right(self.change_times, ts)
+        for _, code, field, old, new in self.changes[start:end]:
+            if field == '+':
+                state[code] = dict(new)
+            elif field == '-':
+                state.pop(code, None)
+            elif code in state:
+                state[code][field] = new
+        return list(state.values())
+
+    def changes_for(self, code):
+        self.load()
+        return [c for c in self.changes if c[1] == code]
@@ -0,0 +1,98 @@
+import os
+import json
+import socket
+
+# Blocking client for records_server.py, small enough to use from Tkinter code.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 50650
+
+
+class RecordsServerError(Exception):
+    """The server refused a request (validation, missing student, ...)"""
+
+
+class RecordsConflictError(RecordsServerError):
+    """Somebody else changed the record first; reload and try again"""
+
+
+class RecordsClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, timeout=5.0):
+        if unix_path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(unix_path)
+        else:
+            self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.file = self.sock.makefile('rwb')
+        self.next_id = 0
+
+    def request(self, op, **params):
+        """Send one request and wait for its reply. Returns the result."""
+        self.next_id += 1
+        params['op'] = op
+        params['id'] = self.next_id
+        self.file.write(json.dumps(params).encode('utf-8') + b'\n')
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Records server closed the connection.")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            if reply.get('kind') == 'conflict':
+                raise RecordsConflictError(reply.get('error'))
+            raise RecordsServerError(reply.get('error'))
+        return reply['result']
+
+    # --- convenience wrappers ---
+
+    def list_students(self):
+        return self.request('list')
+
+    def search(self, query):
+        return self.request('search', query=query)
+
+    def sort(self, by='percentage', ascending=True):
+        return self.request('sort', by=by, ascending=ascending)
+
+    def stats(self):
+        return self.request('stats')
+
+    def as_of(self, timestamp_ms):
+        """Cohort as it stood at that time, or None if history starts later"""
+        return self.request('as_of', timestamp=timestamp_ms)
+
+    def add_student(self, record):
+        return self.request('add', record=record)
+
+    def update_student(self, code, fields, version=None):
+        return self.request('update', code=code, fields=fields, version=version)
+
+    def delete_student(self, code, version=None):
+        return self.request('delete', code=code, version=version)
+
+    def close(self):
+        try:
+            self.file.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def connect_if_running(timeout=0.3):
+    """Returns a client if a records server is up, otherwise None.
+
+    STUDENT_RECORDS_SERVER can be "host:port" or a Unix socket path.
+    """
+    address = os.environ.get("STUDENT_RECORDS_SERVER", f"{DEFAULT_HOST}:{DEFAULT_PORT}")
+    try:
+        if ":" in address:
+            host, port = address.rsplit(":", 1)
+            client = RecordsClient(host, int(port), timeout=timeout)
+        else:
+            client = RecordsClient(unix_path=address, timeout=timeout)
+        client.request('ping')
+        client.sock.settimeout(5.0)
+        return client
+    except (OSError, ValueError, RecordsServerError):
+        return None
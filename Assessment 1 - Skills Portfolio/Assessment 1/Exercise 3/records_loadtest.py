@@ -0,0 +1,88 @@
+import time
+import json
+import random
+import asyncio
+import argparse
+
+from records_client import DEFAULT_HOST, DEFAULT_PORT
+
+# Load test for records_server.py.
+# Opens many connections at once and fires a mix of read requests at the
+# server, then prints requests/sec and latency percentiles.
+
+READ_MIX = [
+    {'op': 'stats'},
+    {'op': 'sort', 'by': 'percentage', 'ascending': True},
+    {'op': 'sort', 'by': 'name', 'ascending': False},
+    {'op': 'search', 'query': 'a'},
+    {'op': 'list'},
+]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_client(host, port, unix_path, requests, latencies, codes):
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    mix = READ_MIX + [{'op': 'get', 'code': code} for code in codes[:20]]
+    errors = 0
+    for i in range(requests):
+        req = dict(random.choice(mix), id=i)
+        start = time.perf_counter()
+        writer.write(json.dumps(req).encode('utf-8') + b'\n')
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if not reply.get('ok'):
+            errors += 1
+    writer.close()
+    return errors
+
+
+async def run_load_test(host, port, unix_path, clients, requests):
+    # Grab some real student codes so 'get' requests hit the index
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"op": "list", "id": 0}\n')
+    await writer.drain()
+    codes = [s['student_code'] for s in json.loads(await reader.readline())['result']]
+    writer.close()
+
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*[
+        run_client(host, port, unix_path, requests, latencies, codes) for _ in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"Clients: {clients}  Requests: {total}  Errors: {sum(errors)}")
+    print(f"Elapsed: {elapsed:.2f}s  Throughput: {total / elapsed:.0f} req/s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.2f} ms  "
+          f"p99: {percentile(latencies, 99) * 1000:.2f} ms  "
+          f"max: {latencies[-1] * 1000 if latencies else 0:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the student records server.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Unix socket path instead of TCP")
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=200, help="requests per client")
+    args = parser.parse_args()
+    asyncio.run(run_load_test(args.host, args.port, args.unix, args.clients, args.requests))
+
+
+if __name__ == "__main__":
+    main()
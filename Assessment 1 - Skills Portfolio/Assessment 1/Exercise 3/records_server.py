@@ -0,0 +1,346 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+
+from studentmarks import (
+    calculate_total_coursework,
+    calculate_overall_percentage,
+    calculate_grade,
+    read_students_from_file,
+    write_students_to_file,
+)
+from records_client import DEFAULT_HOST, DEFAULT_PORT
+from shared_snapshot import SnapshotPublisher, DEFAULT_SNAPSHOT_NAME
+from mark_history import MarkHistory
+
+# Local records service.
+# One process owns studentMarks.txt and keeps it in memory with its indexes.
+# Every StudentRecordsApp talks to it over a localhost socket, one JSON object
+# per line, so the file is parsed once and edits can't overwrite each other.
+
+MARK_FIELDS = ('course1', 'course2', 'course3', 'exam')
+EDITABLE_FIELDS = ('name',) + MARK_FIELDS
+SORT_KEYS = {
+    'percentage': lambda s: calculate_overall_percentage(s),
+    'name': lambda s: s['name'].lower(),
+    'code': lambda s: s['student_code'],
+}
+
+
+class RecordsError(Exception):
+    """Request could not be served (bad input, missing student, ...)"""
+    code = 'error'
+
+
+class ConflictError(RecordsError):
+    """The record was changed by someone else since the client read it"""
+    code = 'conflict'
+
+
+# Characters that would break a line of studentMarks.txt
+FORBIDDEN_CHARS = (',', '\r', '\n')
+
+# Types of the request fields, checked before a request is dispatched
+REQUEST_FIELD_TYPES = {
+    'code': str,
+    'query': str,
+    'by': str,
+    'ascending': bool,
+    'record': dict,
+    'fields': dict,
+    'timestamp': (int, float),
+    'version': int,
+}
+
+
+def check_text(value, what):
+    if not isinstance(value, str) or not value.strip():
+        raise RecordsError("All fields are required.")
+    if any(ch in value for ch in FORBIDDEN_CHARS):
+        raise RecordsError(f"{what} can't contain commas or line breaks.")
+
+
+def validate_student(record):
+    """Checks mark ranges the same way the add/update popups do."""
+    check_text(record.get('student_code'), "Student number")
+    check_text(record.get('name'), "Name")
+    for key in MARK_FIELDS:
+        # type() rather than isinstance(): True/False are ints too
+        if type(record.get(key)) is not int:
+            raise RecordsError("All marks must be numbers.")
+    if not (0 <= record['course1'] <= 20 and 0 <= record['course2'] <= 20 and 0 <= record['course3'] <= 20):
+        raise RecordsError("Course marks must be between 0 and 20.")
+    if not (0 <= record['exam'] <= 100):
+        raise RecordsError("Exam mark must be between 0 and 100.")
+
+
+def check_request(req):
+    """Raises RecordsError unless req is an object whose fields have the right types"""
+    if not isinstance(req, dict):
+        raise RecordsError("Request must be a JSON object.")
+    for key, expected in REQUEST_FIELD_TYPES.items():
+        value = req.get(key)
+        if value is None:
+            continue        # missing fields are reported by the handler
+        # bool is a subclass of int, but never a valid number here
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            raise RecordsError(f"Field {key} has the wrong type.")
+
+
+class RecordStore:
+    """In-memory cohort with lookup indexes and per-record versions"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.students = read_students_from_file(filename)
+        self.version = 1          # bumps on every write, lets clients spot stale lists
+        self.record_versions = {s['student_code']: 1 for s in self.students}
+        self.on_change = []       # callbacks run after every successful write
+        self.history = MarkHistory(filename)
+        self.history.ensure_started(self.students)
+        self._rebuild_indexes()
+
+    # --- indexes ---
+
+    def _rebuild_indexes(self):
+        self.by_code = {s['student_code']: s for s in self.students}
+        self.by_name = {}
+        for s in self.students:
+            self.by_name.setdefault(s['name'].lower(), []).append(s)
+        # Sorted views and stats are built lazily and dropped on every write
+        self._sorted = {}
+        self._stats = None
+
+    def _public(self, student):
+        record = dict(student)
+        record['version'] = self.record_versions[student['student_code']]
+        return record
+
+    def _save(self, students):
+        """Write the cohort as it will be after a change - before memory is touched,
+        so a failed write leaves both the file and the store as they were"""
+        tmp_path = self.filename + ".tmp"
+        try:
+            write_students_to_file(tmp_path, students)
+            os.replace(tmp_path, self.filename)
+        except OSError as e:
+            raise RecordsError(f"Could not save the student file: {e.strerror or e}")
+
+    def _changed(self):
+        self.version += 1
+        self._rebuild_indexes()
+        for callback in self.on_change:
+            callback(self)
+
+    # --- reads ---
+
+    def list_students(self):
+        return [self._public(s) for s in self.students]
+
+    def get(self, code):
+        student = self.by_code.get(code)
+        if student is None:
+            raise RecordsError("Student not found.")
+        return self._public(student)
+
+    def search(self, query):
+        """Exact code, exact name, then name substring (case-insensitive)"""
+        query = query.strip()
+        if query in self.by_code:
+            return [self._public(self.by_code[query])]
+        lowered = query.lower()
+        if lowered in self.by_name:
+            return [self._public(s) for s in self.by_name[lowered]]
+        return [self._public(s) for s in self.students if lowered in s['name'].lower()]
+
+    def sort(self, by='percentage', ascending=True):
+        if by not in SORT_KEYS:
+            raise RecordsError(f"Can't sort by {by}.")
+        if by not in self._sorted:
+            self._sorted[by] = sorted(self.students, key=SORT_KEYS[by])
+        ordered = self._sorted[by] if ascending else reversed(self._sorted[by])
+        return [self._public(s) for s in ordered]
+
+    def stats(self):
+        if self._stats is None:
+            count = len(self.students)
+            percentages = [calculate_overall_percentage(s) for s in self.students]
+            grades = {}
+            for pct in percentages:
+                grade = calculate_grade(pct)
+                grades[grade] = grades.get(grade, 0) + 1
+            self._stats = {
+                'count': count,
+                'average_percentage': round(sum(percentages) / count, 2) if count else 0.0,
+                'average_coursework': round(sum(calculate_total_coursework(s) for s in self.students) / count, 2) if count else 0.0,
+                'grades': grades,
+            }
+            if count:
+                ordered = self.sort('percentage')
+                self._stats['lowest'] = ordered[0]
+                self._stats['highest'] = ordered[-1]
+        return self._stats
+
+    # --- writes (optimistic: caller passes the version it last saw) ---
+
+    def _check_version(self, code, expected_version):
+        current = self.record_versions.get(code)
+        if current is None:
+            raise RecordsError("Student not found.")
+        if expected_version is not None and expected_version != current:
+            raise ConflictError(
+                f"Student {code} was changed by someone else (version {current}, you had {expected_version})."
+            )
+
+    def add(self, record):
+        code = record.get('student_code')
+        name = record.get('name')
+        student = {'student_code': code.strip() if isinstance(code, str) else code,
+                   'name': name.strip() if isinstance(name, str) else name}
+        for key in MARK_FIELDS:
+            student[key] = record.get(key)
+        validate_student(student)
+        if student['student_code'] in self.by_code:
+            raise RecordsError("Student number already exists!")
+        self._save(self.students + [student])
+        self.students.append(student)
+        self.record_versions[student['student_code']] = 1
+        self._changed()
+        self.history.record_add(student, self.students)
+        return self._public(student)
+
+    def update(self, code, fields, expected_version=None):
+        self._check_version(code, expected_version)
+        student = self.by_code[code]
+        updated = dict(student)
+        for key, value in fields.items():
+            if key not in EDITABLE_FIELDS:
+                raise RecordsError(f"Field {key} can't be updated.")
+            updated[key] = value.strip() if key == 'name' and isinstance(value, str) else value
+        validate_student(updated)
+        self._save([updated if s is student else s for s in self.students])
+        before = dict(student)
+        student.update(updated)
+        self.record_versions[code] += 1
+        self._changed()
+        self.history.record_update(before, student, self.students)
+        return self._public(student)
+
+    def delete(self, code, expected_version=None):
+        self._check_version(code, expected_version)
+        student = self.by_code[code]
+        self._save([s for s in self.students if s is not student])
+        self.students.remove(student)
+        del self.record_versions[code]
+        self._changed()
+        self.history.record_delete(student, self.students)
+        return {'student_code': code}
+
+
+class RecordsServer:
+    """asyncio front end: newline-delimited JSON requests -> RecordStore"""
+
+    def __init__(self, store):
+        self.store = store
+        self.clients = 0
+        self.handlers = {
+            'ping': lambda req: 'pong',
+            'list': lambda req: self.store.list_students(),
+            'get': lambda req: self.store.get(req['code']),
+            'search': lambda req: self.store.search(req['query']),
+            'sort': lambda req: self.store.sort(req.get('by', 'percentage'), req.get('ascending', True)),
+            'stats': lambda req: self.store.stats(),
+            'as_of': lambda req: self.store.history.as_of(req['timestamp']),
+            'add': lambda req: self.store.add(req['record']),
+            'update': lambda req: self.store.update(req['code'], req['fields'], req.get('version')),
+            'delete': lambda req: self.store.delete(req['code'], req.get('version')),
+        }
+
+    def handle_request(self, line):
+        try:
+            req = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': 'bad request', 'kind': 'error'}
+        reply = {'id': req.get('id') if isinstance(req, dict) else None}
+        try:
+            check_request(req)
+            handler = self.handlers.get(req.get('op'))
+            if handler is None:
+                raise RecordsError(f"Unknown operation {req.get('op')!r}.")
+            reply['result'] = handler(req)
+            reply['ok'] = True
+        except RecordsError as e:
+            reply.update(ok=False, error=str(e), kind=e.code)
+        except KeyError as e:
+            reply.update(ok=False, error=f"Missing field {e}.", kind='error')
+        except Exception as e:
+            # Never let one bad request drop the connection without a reply
+            print(f"Error handling {req.get('op')!r}: {e!r}")
+            reply.update(ok=False, error="Server error.", kind='error')
+        reply['store_version'] = self.store.version
+        return reply
+
+    async def handle_client(self, reader, writer):
+        self.clients += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = self.handle_request(line)
+                writer.write(json.dumps(reply).encode('utf-8') + b'\n')
+                # drain() only waits when the client stops reading, so
+                # pipelined requests are answered without a round trip each
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            where = unix_path
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            where = f"{host}:{port}"
+        print(f"Student records server on {where} ({len(self.store.students)} students loaded)")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve studentMarks.txt to many Student Records apps.")
+    parser.add_argument('--file', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "studentMarks.txt"))
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="Unix socket path instead of TCP")
+    parser.add_argument('--snapshot', nargs='?', const=DEFAULT_SNAPSHOT_NAME,
+                        help="also publish a shared-memory snapshot for analysis workers")
+    args = parser.parse_args()
+
+    try:
+        store = RecordStore(args.file)
+    except Exception as e:
+        print(f"Error loading student file: {e}")
+        sys.exit(1)
+    publisher = None
+    if args.snapshot:
+        publisher = SnapshotPublisher(args.snapshot)
+        publisher.publish(store.students)
+        store.on_change.append(lambda s: publisher.publish(s.students))
+        print(f"Publishing shared snapshot '{args.snapshot}'")
+    try:
+        asyncio.run(RecordsServer(store).serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+    finally:
+        if publisher:
+            publisher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import os
+import re
+import sys
+import html
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from shared_snapshot import CohortSnapshot
+from studentmarks import (
+    calculate_total_coursework,
+    calculate_overall_percentage,
+    calculate_grade,
+    format_student_full,
+    read_students_from_file,
+)
+
+# Batch report cards.
+# Renders one transcript per student (text and/or HTML) plus a cohort summary,
+# using the same formatting as the "View Individual" screen. Students are split
+# into chunks and each worker process renders and writes its own chunk, so
+# nothing is held in memory longer than one chunk.
+
+CHUNK_SIZE = 250
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: 'Segoe UI', Arial, sans-serif; background: #f4f6fa; color: #222; }}
+.card {{ background: #fff; max-width: 520px; margin: 40px auto; padding: 24px 30px; border: 1px solid #e1e8ed; }}
+h1 {{ font-size: 20px; color: #2c3e50; }}
+td {{ padding: 4px 14px 4px 0; }}
+</style>
+</head>
+<body>
+<div class="card">
+<h1>{title}</h1>
+{body}
+</div>
+</body>
+</html>
+"""
+
+
+def report_basename(student):
+    """File name for a student's report, e.g. 8439_Jake_Hobbs"""
+    safe_name = re.sub(r'[^A-Za-z0-9]+', '_', student['name']).strip('_')
+    return f"{student['student_code']}_{safe_name}" if safe_name else student['student_code']
+
+
+def render_text(student):
+    return "STUDENT REPORT CARD\n" + "=" * 19 + "\n" + format_student_full(student) + "\n"
+
+
+def render_html(student):
+    # Reuse the text layout so both formats always agree
+    rows = []
+    for line in format_student_full(student).split("\n"):
+        label, _, value = line.partition(": ")
+        rows.append(f"<tr><td><b>{html.escape(label)}</b></td><td>{html.escape(value)}</td></tr>")
+    body = "<table>\n" + "\n".join(rows) + "\n</table>"
+    return HTML_TEMPLATE.format(title=html.escape(f"Report Card - {student['name']}"), body=body)
+
+
+def render_chunk(students, out_dir, formats):
+    """Worker: render and write every report in one chunk. Returns how many students were done."""
+    for student in students:
+        base = os.path.join(out_dir, report_basename(student))
+        if 'text' in formats:
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(render_text(student))
+        if 'html' in formats:
+            with open(base + ".html", "w", encoding="utf-8") as f:
+                f.write(render_html(student))
+    return len(students)
+
+
+def render_snapshot_range(snapshot_name, start, end, out_dir, formats):
+    """Worker: like render_chunk, but reads its slice from the shared snapshot
+    instead of having the students pickled over to it."""
+    snapshot = CohortSnapshot(snapshot_name)
+    try:
+        return render_chunk(snapshot.students(start, end), out_dir, formats)
+    finally:
+        snapshot.close()
+
+
+def cohort_summary(students):
+    """Class-level summary in the same wording as the 'View All Records' footer."""
+    count = len(students)
+    percentages = [calculate_overall_percentage(s) for s in students]
+    grades = {g: 0 for g in "ABCDF"}
+    for pct in percentages:
+        grades[calculate_grade(pct)] += 1
+    lines = [
+        "COHORT SUMMARY",
+        "=" * 14,
+        f"Total number of students: {count}",
+        f"Class average percentage: {(sum(percentages) / count) if count else 0.0:.2f}%",
+    ]
+    if count:
+        avg_coursework = sum(calculate_total_coursework(s) for s in students) / count
+        avg_exam = sum(s['exam'] for s in students) / count
+        best = max(students, key=calculate_overall_percentage)
+        worst = min(students, key=calculate_overall_percentage)
+        lines += [
+            f"Average coursework (out of 60): {avg_coursework:.2f}",
+            f"Average exam (out of 100): {avg_exam:.2f}",
+            f"Highest: {best['name']} ({best['student_code']}) {calculate_overall_percentage(best):.2f}%",
+            f"Lowest: {worst['name']} ({worst['student_code']}) {calculate_overall_percentage(worst):.2f}%",
+            "Grades: " + ", ".join(f"{g}={n}" for g, n in grades.items()),
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def print_progress(done, total):
+    width = 30
+    filled = int(width * done / total) if total else width
+    sys.stdout.write(f"\r[{'#' * filled}{'.' * (width - filled)}] {done}/{total}")
+    sys.stdout.flush()
+    if done == total:
+        sys.stdout.write("\n")
+
+
+def generate_reports(students, out_dir, formats=('text',), workers=None, chunk_size=CHUNK_SIZE,
+                     progress=print_progress, snapshot_name=None):
+    """Render every student's report in a process pool. Returns the number written.
+    With snapshot_name, workers read their students from that shared snapshot."""
+    os.makedirs(out_dir, exist_ok=True)
+    total = len(students)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if snapshot_name:
+            futures = [pool.submit(render_snapshot_range, snapshot_name, i, i + chunk_size, out_dir, tuple(formats))
+                       for i in range(0, total, chunk_size)]
+        else:
+            futures = [pool.submit(render_chunk, students[i:i + chunk_size], out_dir, tuple(formats))
+                       for i in range(0, total, chunk_size)]
+        for future in as_completed(futures):
+            done += future.result()
+            if progress:
+                progress(done, total)
+
+    summary = cohort_summary(students)
+    with open(os.path.join(out_dir, "cohort_summary.txt"), "w", encoding="utf-8") as f:
+        f.write(summary)
+    if 'html' in formats:
+        body = "<pre>" + html.escape(summary) + "</pre>"
+        with open(os.path.join(out_dir, "cohort_summary.html"), "w", encoding="utf-8") as f:
+            f.write(HTML_TEMPLATE.format(title="Cohort Summary", body=body))
+    return done
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Generate a report card for every student.")
+    parser.add_argument('--file', default=os.path.join(script_dir, "studentMarks.txt"))
+    parser.add_argument('--out', default=os.path.join(script_dir, "reports"))
+    parser.add_argument('--format', choices=['text', 'html', 'both'], default='text')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--snapshot', help="read students from this shared snapshot (see records_server.py --snapshot)")
+    args = parser.parse_args()
+
+    formats = ('text', 'html') if args.format == 'both' else (args.format,)
+    try:
+        if args.snapshot:
+            snapshot = CohortSnapshot(args.snapshot)
+            students = snapshot.students()
+            snapshot.close()
+        else:
+            students = read_students_from_file(args.file)
+    except Exception as e:
+        print(f"Error loading student file: {e}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    written = generate_reports(students, args.out, formats, args.workers, snapshot_name=args.snapshot)
+    print(f"Wrote {written} report(s) to {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
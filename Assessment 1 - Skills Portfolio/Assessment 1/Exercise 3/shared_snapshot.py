@@ -0,0 +1,267 @@
+import os
+import sys
+import time
+import struct
+import argparse
+from array import array
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+# Read-only cohort snapshot in shared memory.
+#
+# The records engine publishes the cohort once as columns (one int16 array per
+# mark plus a UTF-8 string table for codes and names). Analysis workers attach
+# to it by name and read the arrays in place, so N workers share one copy.
+#
+# Two blocks are used:
+#   control block "<name>"            generation number + name of current data block
+#   data block    "<name>_<gen>"      header, mark columns, string offsets, string bytes
+# Every publish writes a fresh data block and then bumps the generation, so
+# readers can tell their snapshot is stale and re-attach.
+
+DEFAULT_SNAPSHOT_NAME = "student_marks_snapshot"
+MAGIC = b'STUSNAP1'
+CONTROL_FORMAT = '<Q64s'                  # generation, data block name
+HEADER_FORMAT = '<8sQI4x'                 # magic, generation, student count
+MARK_COLUMNS = ('course1', 'course2', 'course3', 'exam')
+
+
+def _attach(name):
+    """Attach to an existing block without letting this process unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)   # Python 3.13+
+    except TypeError:
+        pass
+    if os.name != 'posix':
+        return shared_memory.SharedMemory(name=name)
+    # Older Pythons register attached blocks with the resource tracker, which
+    # would destroy the publisher's snapshot when a worker exits. Skip that.
+    from multiprocessing import resource_tracker
+    original_register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = original_register
+
+
+def _layout(count, blob_size):
+    """Byte offsets of each section in a data block"""
+    marks_at = struct.calcsize(HEADER_FORMAT)
+    offsets_at = marks_at + len(MARK_COLUMNS) * count * 2
+    offsets_at += (-offsets_at) % 4                       # align uint32 table
+    blob_at = offsets_at + (2 * count + 1) * 4
+    return marks_at, offsets_at, blob_at, blob_at + blob_size
+
+
+class SnapshotPublisher:
+    """Owner side: writes new generations of the snapshot. Used by the records server."""
+
+    def __init__(self, name=DEFAULT_SNAPSHOT_NAME):
+        self.name = name
+        self.generation = 0
+        self.data_block = None
+        try:
+            self.control = shared_memory.SharedMemory(name=name, create=True,
+                                                      size=struct.calcsize(CONTROL_FORMAT))
+        except FileExistsError:
+            # Left behind by a publisher that crashed - take it over
+            self.control = shared_memory.SharedMemory(name=name)
+            self.generation = struct.unpack_from(CONTROL_FORMAT, self.control.buf)[0]
+
+    def publish(self, students):
+        """Write the students into a new data block and make it current."""
+        count = len(students)
+        offsets = array('I', [0])
+        blob = bytearray()
+        for s in students:
+            for text in (s['student_code'], s['name']):
+                blob += text.encode('utf-8')
+                offsets.append(len(blob))
+        marks_at, offsets_at, blob_at, size = _layout(count, len(blob))
+
+        generation = self.generation + 1
+        block = shared_memory.SharedMemory(name=f"{self.name}_{generation}", create=True, size=max(size, 1))
+        buf = block.buf
+        struct.pack_into(HEADER_FORMAT, buf, 0, MAGIC, generation, count)
+        for col, key in enumerate(MARK_COLUMNS):
+            column = array('h', (s[key] for s in students))
+            start = marks_at + col * count * 2
+            buf[start:start + count * 2] = column.tobytes()
+        buf[offsets_at:blob_at] = offsets.tobytes()
+        buf[blob_at:blob_at + len(blob)] = bytes(blob)
+        del buf
+
+        # Switch readers over, then drop the old block. Readers that are still
+        # attached to it keep their mapping until they close it.
+        struct.pack_into(CONTROL_FORMAT, self.control.buf, 0, generation, block.name.encode('ascii'))
+        old = self.data_block
+        self.data_block = block
+        self.generation = generation
+        if old is not None:
+            old.close()
+            old.unlink()
+        return generation
+
+    def close(self):
+        for block in (self.data_block, self.control):
+            if block is not None:
+                block.close()
+                try:
+                    block.unlink()
+                except FileNotFoundError:
+                    pass
+        self.data_block = None
+        self.control = None
+
+
+class CohortSnapshot:
+    """Worker side: zero-copy, read-only view of the published cohort"""
+
+    def __init__(self, name=DEFAULT_SNAPSHOT_NAME):
+        self.name = name
+        self.control = _attach(name)
+        self.block = None
+        self.refresh()
+
+    def current_generation(self):
+        return struct.unpack_from(CONTROL_FORMAT, self.control.buf)[0]
+
+    def is_stale(self):
+        """True once the publisher has written a newer snapshot"""
+        return self.current_generation() != self.generation
+
+    def refresh(self):
+        """(Re)attach to the current data block. Retries if a publish races us."""
+        for _ in range(50):
+            generation, block_name = struct.unpack_from(CONTROL_FORMAT, self.control.buf)
+            if generation == 0:
+                raise FileNotFoundError("No snapshot has been published yet.")
+            try:
+                block = _attach(block_name.rstrip(b'\0').decode('ascii'))
+            except FileNotFoundError:
+                time.sleep(0.01)
+                continue
+            magic, block_generation, count = struct.unpack_from(HEADER_FORMAT, block.buf)
+            if magic != MAGIC or block_generation != generation:
+                block.close()
+                time.sleep(0.01)
+                continue
+            self._release_views()
+            if self.block is not None:
+                self.block.close()
+            self.block = block
+            self.generation = generation
+            self.count = count
+            self._map_views()
+            return
+        raise RuntimeError("Snapshot kept changing while attaching.")
+
+    def _map_views(self):
+        buf = self.block.buf
+        marks_at, offsets_at, blob_at, _ = _layout(self.count, 0)
+        self.columns = {}
+        for col, key in enumerate(MARK_COLUMNS):
+            start = marks_at + col * self.count * 2
+            self.columns[key] = buf[start:start + self.count * 2].cast('h')
+        self.offsets = buf[offsets_at:blob_at].cast('I')
+        self.blob = buf[blob_at:blob_at + self.offsets[-1]]
+
+    def _release_views(self):
+        # memoryviews must be released before the block can be closed
+        for view in getattr(self, 'columns', {}).values():
+            view.release()
+        for attr in ('offsets', 'blob'):
+            view = getattr(self, attr, None)
+            if view is not None:
+                view.release()
+        self.columns = {}
+        self.offsets = None
+        self.blob = None
+
+    def _text(self, slot):
+        return bytes(self.blob[self.offsets[slot]:self.offsets[slot + 1]]).decode('utf-8')
+
+    def __len__(self):
+        return self.count
+
+    def code(self, i):
+        return self._text(2 * i)
+
+    def name_of(self, i):
+        return self._text(2 * i + 1)
+
+    def student(self, i):
+        """Student i as the same dict shape read_students_from_file returns"""
+        record = {'student_code': self.code(i), 'name': self.name_of(i)}
+        for key in MARK_COLUMNS:
+            record[key] = self.columns[key][i]
+        return record
+
+    def students(self, start=0, end=None):
+        end = self.count if end is None else min(end, self.count)
+        return [self.student(i) for i in range(start, end)]
+
+    def close(self):
+        self._release_views()
+        for block in (self.block, self.control):
+            if block is not None:
+                block.close()
+        self.block = None
+        self.control = None
+
+
+# --- Example parallel analysis over the shared snapshot ---
+
+def _sum_range(name, start, end):
+    """Worker: totals for one slice, read straight from shared memory"""
+    snapshot = CohortSnapshot(name)
+    try:
+        end = min(end, len(snapshot))
+        cols = snapshot.columns
+        total_marks = 0
+        for i in range(start, end):
+            total_marks += cols['course1'][i] + cols['course2'][i] + cols['course3'][i] + cols['exam'][i]
+        return end - start, total_marks
+    finally:
+        snapshot.close()
+
+
+def parallel_average_percentage(name=DEFAULT_SNAPSHOT_NAME, workers=4):
+    snapshot = CohortSnapshot(name)
+    count = len(snapshot)
+    snapshot.close()
+    step = max(1, -(-count // workers))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(_sum_range, [name] * workers,
+                              range(0, count, step), range(step, count + step, step)))
+    students = sum(p[0] for p in parts)
+    marks = sum(p[1] for p in parts)
+    return round(marks / (students * 160) * 100, 2) if students else 0.0
+
+
+def main():
+    from studentmarks import read_students_from_file
+
+    parser = argparse.ArgumentParser(description="Publish studentMarks.txt to shared memory and run a parallel average over it.")
+    parser.add_argument('--file', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "studentMarks.txt"))
+    parser.add_argument('--name', default=DEFAULT_SNAPSHOT_NAME)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    try:
+        students = read_students_from_file(args.file)
+    except Exception as e:
+        print(f"Error loading student file: {e}")
+        sys.exit(1)
+    publisher = SnapshotPublisher(args.name)
+    try:
+        generation = publisher.publish(students)
+        print(f"Published {len(students)} students as generation {generation}")
+        print(f"Class average percentage: {parallel_average_percentage(args.name, args.workers):.2f}%")
+    finally:
+        publisher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,16 @@
 import os
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 import threading
-try:
-    from PIL import Image, ImageTk, ImageDraw
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
+from records_client import connect_if_running, RecordsServerError, RecordsConflictError
+from cohort_archive import is_archive, iter_archive_lines
+from mark_history import MarkHistory
+from datetime import datetime, timedelta
+
+# app_icons.py is shared by all the apps, one folder up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app_icons import set_app_icon
 
 # ----- Helper functions -----
 
@@ -32,29 +36,40 @@ def calculate_grade(percentage):
     else:
         return 'F'
 
+def iter_students(filename):
+    """Yields students one at a time from a marks file or a compressed cohort archive."""
+    if is_archive(filename):
+        lines = iter_archive_lines(filename)   # streamed, never fully decompressed
+    else:
+        lines = open(filename, "r", encoding="utf-8")
+    try:
+        header_seen = False
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if not header_seen:
+                n = int(line)   # first line is the number of students
+                header_seen = True
+                continue
+            parts = line.split(",")
+            if len(parts) < 6:
+                continue
+            yield {
+                "student_code": parts[0],
+                "name": parts[1],
+                "course1": int(parts[2]),
+                "course2": int(parts[3]),
+                "course3": int(parts[4]),
+                "exam": int(parts[5])
+            }
+    finally:
+        lines.close()
+
 def read_students_from_file(filename):
-    """Reads students from file into a list of dicts. Returns list or raises."""
-    students = []
+    """Reads students from file (or archive) into a list of dicts. Returns list or raises."""
     try:
-        with open(filename, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip()]
-            if not lines:
-                return []
-            n = int(lines[0])
-            for line in lines[1:]:
-                parts = line.split(",")
-                if len(parts) < 6:
-                    continue
-                student = {
-                    "student_code": parts[0],
-                    "name": parts[1],
-                    "course1": int(parts[2]),
-                    "course2": int(parts[3]),
-                    "course3": int(parts[4]),
-                    "exam": int(parts[5])
-                }
-                students.append(student)
-        return students
+        return list(iter_students(filename))
     except FileNotFoundError:
         raise FileNotFoundError("Student file not found.")
     except Exception as e:
@@ -75,6 +90,16 @@ def get_student_by_code(students, code):
             return s
     return None
 
+def format_student_full(student):
+    """Full text record for one student (used on screen and in reports)."""
+    coursework = calculate_total_coursework(student)
+    pct = calculate_overall_percentage(student)
+    grade = calculate_grade(pct)
+    s = "Name: {}\nStudent Number: {}\nCoursework (out of 60): {}\nExam (out of 100): {}\nOverall Percentage: {:.2f}%\nGrade: {}".format(
+        student['name'], student['student_code'], coursework, student['exam'], pct, grade
+    )
+    return s
+
 def get_student_by_name(students, name):
     """Returns student dict matching name or None (case-insensitive)."""
     for s in students:
@@ -94,8 +119,11 @@ class StudentRecordsApp:
         self.set_window_icon()
         self.filename = os.path.join(os.path.dirname(__file__), "studentMarks.txt")
         self.students = []
+        self.history = MarkHistory(self.filename)
         self.current_sort_asc = True
         self.current_sort_by_percentage = False
+        # Use the shared records server when one is running, else the file directly
+        self.client = connect_if_running()
         self.style = ttk.Style()
         self.setup_styles()
         self.initialize_ui()
@@ -103,61 +131,9 @@ class StudentRecordsApp:
         self.data_reload()
 
     def set_window_icon(self):
-        """Create and set a custom window icon"""
-        try:
-            if HAS_PIL:
-                icon_path = os.path.join(os.path.dirname(__file__), "app_icon.ico")
-                
-                # Create icon file if it doesn't exist
-                if not os.path.exists(icon_path):
-                    # Create icon images in multiple sizes
-                    icon_images = []
-                    for size in [(16, 16), (32, 32), (48, 48), (64, 64)]:
-                        # Create an image with a blue background
-                        img = Image.new('RGBA', size, color=(70, 143, 214, 255))  # #468fd6
-                        draw = ImageDraw.Draw(img)
-                        
-                        # Draw a white circle border
-                        margin = max(1, size[0] // 8)
-                        draw.ellipse([margin, margin, size[0]-margin, size[1]-margin], 
-                                   outline='white', width=max(1, size[0] // 16))
-                        
-                        # Draw "S" letter in white
-                        try:
-                            # Try to use a better font if available
-                            from PIL import ImageFont
-                            font_size = max(8, size[0] // 2)
-                            # Use default font
-                            draw.text((size[0]//2, size[1]//2), 'S', fill='white', 
-                                     anchor='mm', font=None)
-                        except:
-                            draw.text((size[0]//2, size[1]//2), 'S', fill='white', anchor='mm')
-                        
-                        icon_images.append(img)
-                    
-                    # Save as ICO file with multiple sizes
-                    icon_images[0].save(icon_path, format='ICO', sizes=[(img.width, img.height) for img in icon_images])
-                
-                # Set the icon using iconbitmap (best for Windows)
-                try:
-                    self.root.iconbitmap(icon_path)
-                except:
-                    # Fallback to iconphoto
-                    img = Image.open(icon_path)
-                    photo = ImageTk.PhotoImage(img)
-                    self.root.iconphoto(True, photo)
-                    self.icon_images = [photo]
-            else:
-                # Fallback: Try to use iconbitmap if icon file exists
-                icon_path = os.path.join(os.path.dirname(__file__), "app_icon.ico")
-                if os.path.exists(icon_path):
-                    try:
-                        self.root.iconbitmap(icon_path)
-                    except:
-                        pass
-        except Exception as e:
-            # If icon setting fails, continue without custom icon
-            pass
+        """Set the custom window icon (drawn once and cached per user - see app_icons.py)"""
+        fallback = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app_icon.ico")
+        self.icon_images = set_app_icon(self.root, 'student_records', (70, 143, 214, 255), 'S', fallback)  # #468fd6
 
     def setup_styles(self):
         # Modern color palette
@@ -216,11 +192,12 @@ class StudentRecordsApp:
             ("Add Student", self.add_student_popup),
             ("Update Student", self.update_student_popup),
             ("Delete Student", self.delete_student_popup),
+            ("Marks As Of...", self.marks_as_of_popup),
             ("Refresh", self.data_reload),
         ]
         padding = {'padx':20, 'pady':10}
         for idx, (txt, cmd) in enumerate(menu_items):
-            style = 'BlueAccent.TButton' if idx in (0,1,2,3,4,5,6,7) else 'TButton'
+            style = 'BlueAccent.TButton' if idx in (0,1,2,3,4,5,6,7,8) else 'TButton'
             btn = ttk.Button(self.sidebar, text=txt, style=style, command=cmd)
             btn.grid(row=idx, column=0, sticky='ew', **padding)
         # Filler
@@ -249,6 +226,16 @@ class StudentRecordsApp:
     # --- File/data loading and refreshing ---
 
     def data_reload(self):
+        if self.client:
+            try:
+                self.students = self.client.list_students()
+                self.set_status("Data loaded from records server.")
+                self.display_all_students()
+                return
+            except (OSError, ValueError):
+                # Server went away - carry on with the file
+                self.client.close()
+                self.client = None
         try:
             self.students = read_students_from_file(self.filename)
         except Exception as e:
@@ -256,17 +243,49 @@ class StudentRecordsApp:
             self.show_error(f"Error loading student file:\n{e}")
             self.set_status("Data load failed.")
             return
+        self.history.ensure_started(self.students)
         self.set_status("Data loaded.")
         self.display_all_students()
 
+    def save_change(self, server_call, local_change, parent=None, log_change=None):
+        """Apply an edit through the records server if connected, else to the file
+        (and log it to the mark history; the server keeps its own history).
+        Returns False if the server rejected it (e.g. someone else edited first)."""
+        if self.client:
+            try:
+                server_call()
+                return True
+            except RecordsConflictError as e:
+                self.show_error(f"{e}\nThe latest records have been reloaded.", parent=parent)
+                self.data_reload()
+                return False
+            except RecordsServerError as e:
+                self.show_error(str(e), parent=parent)
+                return False
+            except (OSError, ValueError) as e:
+                # Server went away (ConnectionError is an OSError). The change may not
+                # have been made, so nothing is written locally - reload from the file.
+                self.client.close()
+                self.client = None
+                self.show_error(f"Lost the connection to the records server ({e}).\n"
+                                "The change was not saved. The records have been reloaded "
+                                "from the file - please try again.", parent=parent)
+                self.data_reload()
+                return False
+        local_change()
+        write_students_to_file(self.filename, self.students)
+        if log_change:
+            log_change()
+        return True
+
     # --- Main display functions ---
 
-    def display_all_students(self, sort_asc=None):
-        """Displays all students in scrollable treeview table"""
+    def display_all_students(self, sort_asc=None, students=None, title="All Student Records"):
+        """Displays all students (or the given list) in scrollable treeview table"""
         self.clear_content_frame()
         panel = ttk.Frame(self.content_frame, style='Content.TFrame', padding=(15,10,10,10))
         panel.grid(row=0, column=0, sticky='nsew')
-        title = ttk.Label(panel, text="All Student Records", style="Header.TLabel")
+        title = ttk.Label(panel, text=title, style="Header.TLabel")
         title.grid(row=0, column=0, sticky='w', pady=(0,10), columnspan=2)
         
         # Treeview with scroll
@@ -296,7 +315,7 @@ class StudentRecordsApp:
         tree.pack(fill='both', expand=True, padx=(0,10), pady=(0,5))
 
         # Sorting
-        list_students = self.students.copy()
+        list_students = (self.students if students is None else students).copy()
         if self.current_sort_by_percentage:
             list_students.sort(key=lambda s: calculate_overall_percentage(s),
                                reverse=not self.current_sort_asc)
@@ -335,13 +354,7 @@ class StudentRecordsApp:
         self.set_status(f"Displayed all {total_count} students.")
 
     def format_student_full(self, student):
-        coursework = calculate_total_coursework(student)
-        pct = calculate_overall_percentage(student)
-        grade = calculate_grade(pct)
-        s = "Name: {}\nStudent Number: {}\nCoursework (out of 60): {}\nExam (out of 100): {}\nOverall Percentage: {:.2f}%\nGrade: {}".format(
-            student['name'], student['student_code'], coursework, student['exam'], pct, grade
-        )
-        return s
+        return format_student_full(student)
 
     def display_student_record(self, student, title=None):
         """Display ONE full student record as pretty panel"""
@@ -495,8 +508,10 @@ class StudentRecordsApp:
                     "course3": c3,
                     "exam": ex
                 }
-                self.students.append(new_student)
-                write_students_to_file(self.filename, self.students)
+                if not self.save_change(lambda: self.client.add_student(new_student),
+                                        lambda: self.students.append(new_student), parent=popup,
+                                        log_change=lambda: self.history.record_add(new_student, self.students)):
+                    return
                 popup.destroy()
                 self.set_status(f"Added {sname} ({scode}). File updated.")
                 self.data_reload()
@@ -547,8 +562,13 @@ class StudentRecordsApp:
             if not agreed:
                 return
             # Execute deletion
-            del self.students[idx]
-            write_students_to_file(self.filename, self.students)
+            def local_delete():
+                del self.students[idx]
+            if not self.save_change(lambda: self.client.delete_student(student['student_code'], student.get('version')),
+                                    local_delete, parent=popup,
+                                    log_change=lambda: self.history.record_delete(student, self.students)):
+                popup.destroy()
+                return
             popup.destroy()
             self.set_status(f"Deleted student {student['student_code']}.")
             self.data_reload()
@@ -653,12 +673,15 @@ class StudentRecordsApp:
                 if not agreed:
                     return
                 # Update student
-                self.students[idx]['name'] = entries['name'].get().strip()
-                self.students[idx]['course1'] = c1
-                self.students[idx]['course2'] = c2
-                self.students[idx]['course3'] = c3
-                self.students[idx]['exam'] = ex
-                write_students_to_file(self.filename, self.students)
+                changes = {'name': entries['name'].get().strip(),
+                           'course1': c1, 'course2': c2, 'course3': c3, 'exam': ex}
+                before = dict(self.students[idx])
+                if not self.save_change(
+                        lambda: self.client.update_student(student['student_code'], changes, student.get('version')),
+                        lambda: self.students[idx].update(changes), parent=popup,
+                        log_change=lambda: self.history.record_update(before, self.students[idx], self.students)):
+                    popup.destroy()
+                    return
                 popup.destroy()
                 self.set_status("Student record updated.")
                 self.data_reload()
@@ -669,6 +692,53 @@ class StudentRecordsApp:
         btn.grid(row=len(fields)+2, column=0, pady=(13,0), columnspan=2, sticky='ew')
         self.set_status("Update student: edit fields.")
 
+    # --- Mark history ---
+
+    def marks_as_of_popup(self):
+        """Show the records exactly as they stood at a past date/time (for moderation)"""
+        def on_show():
+            val = entry.get().strip()
+            try:
+                if len(val) == 10:
+                    # Date only: the marks at the end of that day
+                    when = datetime.strptime(val, "%Y-%m-%d") + timedelta(days=1) - timedelta(milliseconds=1)
+                else:
+                    when = datetime.strptime(val, "%Y-%m-%d %H:%M")
+            except ValueError:
+                self.show_error("Use YYYY-MM-DD or YYYY-MM-DD HH:MM.", parent=popup)
+                return
+            ts = int(when.timestamp() * 1000)
+            if self.client:
+                try:
+                    students = self.client.as_of(ts)
+                except (OSError, RecordsServerError) as e:
+                    self.show_error(str(e), parent=popup)
+                    return
+            else:
+                students = self.history.as_of(ts)
+            if students is None:
+                self.show_error("No history recorded that far back.", parent=popup)
+                return
+            popup.destroy()
+            self.display_all_students(students=students, title=f"Records As Of {val}")
+
+        popup = tk.Toplevel(self.root)
+        popup.title("Marks As Of")
+        popup.transient(self.root)
+        popup.grab_set()
+        popup.configure(bg='#eaf2fb')
+        popup.resizable(False, False)
+        frm = ttk.Frame(popup, padding=25)
+        frm.pack(fill='both', expand=True)
+        ttk.Label(frm, text="Show marks as of (YYYY-MM-DD [HH:MM]):", font=("Segoe UI", 11)).pack(anchor='w', pady=(0,9))
+        entry = ttk.Entry(frm, font=("Segoe UI", 11), width=28)
+        entry.insert(0, datetime.now().strftime("%Y-%m-%d %H:%M"))
+        entry.pack(fill='x', pady=(0,9))
+        entry.focus_set()
+        ttk.Button(frm, text="Show", style="BlueAccent.TButton", command=on_show).pack()
+        popup.bind('<Return>', lambda e: on_show())
+        self.set_status("Marks as of: pick a date.")
+
     # --- Utility UI ---
 
     def show_error(self, msg, parent=None):
@@ -0,0 +1,36 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mark_history import MarkHistory
+
+
+def student(code, exam):
+    return {'student_code': code, 'name': "Test", 'course1': 10, 'course2': 10, 'course3': 10, 'exam': exam}
+
+
+class TwoWritersTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.data = os.path.join(self.folder, "studentMarks.txt")
+        self.cohort = [student('1000', 50)]
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_changes_keep_their_time_with_two_writers(self):
+        gui = MarkHistory(self.data)
+        server = MarkHistory(self.data)
+        gui.checkpoint(self.cohort, ts=1000)
+        server.record_update(student('1000', 50), student('1000', 60), ts=2000)
+        gui.record_update(student('1000', 60), student('1000', 70), ts=6000)
+
+        for history in (MarkHistory(self.data), gui, server):
+            self.assertEqual([c[0] for c in history.changes_for('1000')], [2000, 6000])
+            self.assertEqual(history.as_of(3000)[0]['exam'], 60)
+            self.assertEqual(history.as_of(7000)[0]['exam'], 70)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import records_server
+from records_server import RecordStore, RecordsServer
+from studentmarks import read_students_from_file
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class RecordsServerTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, "studentMarks.txt")
+        shutil.copy(os.path.join(HERE, "studentMarks.txt"), self.filename)
+        self.store = RecordStore(self.filename)
+        self.server = RecordsServer(self.store)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def request(self, req):
+        return self.server.handle_request(req if isinstance(req, str) else json.dumps(req))
+
+    def test_bool_mark_is_rejected(self):
+        reply = self.request({'op': 'update', 'code': '1345', 'fields': {'exam': True}})
+        self.assertFalse(reply['ok'])
+        self.assertEqual(len(read_students_from_file(self.filename)), len(self.store.students))
+
+    def test_commas_and_line_breaks_are_rejected(self):
+        for name in ("Curry, John", "John\nCurry", "John\rCurry"):
+            reply = self.request({'op': 'update', 'code': '1345', 'fields': {'name': name}})
+            self.assertFalse(reply['ok'], name)
+        record = {'student_code': '99,1', 'name': "X", 'course1': 1, 'course2': 1, 'course3': 1, 'exam': 1}
+        self.assertFalse(self.request({'op': 'add', 'record': record})['ok'])
+
+    def test_malformed_requests_get_an_error_reply(self):
+        for req in ('[1, 2]', '"text"',
+                    {'op': 'update', 'code': '1345', 'fields': ['exam']},
+                    {'op': 'update', 'code': '1345', 'fields': {'name': None}},
+                    {'op': 'update', 'code': '1345', 'fields': {'name': 5}},
+                    {'op': 'search', 'query': 5}):
+            reply = self.request(req)
+            self.assertFalse(reply['ok'], req)
+            self.assertEqual(reply['kind'], 'error', req)
+
+    def test_failed_write_leaves_memory_unchanged(self):
+        def fail(*args):
+            raise PermissionError(13, "Permission denied")
+        with mock.patch.object(records_server, 'write_students_to_file', fail):
+            reply = self.request({'op': 'update', 'code': '1345', 'fields': {'exam': 60}})
+        self.assertFalse(reply['ok'])
+        self.assertEqual(self.store.get('1345')['exam'], 45)
+        self.assertEqual(self.store.version, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
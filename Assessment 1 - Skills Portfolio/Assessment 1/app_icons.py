@@ -0,0 +1,104 @@
+import os
+import sys
+import hashlib
+import tkinter as tk
+
+# Window icons shared by the apps in this folder (Alexa Joke App, Student
+# Records, ...).
+#
+# Each icon is a coloured square with a white ring and a letter. It is drawn
+# with PIL only the first time, then saved as a multi-size .ico (for Windows'
+# iconbitmap) and one PNG per size (for iconphoto everywhere else - Tk reads
+# PNG itself, so no PIL is needed to show it). The files go in a per-user
+# cache folder, because the app folder may be read-only, and their names hold
+# a hash of the icon's look, so a new colour or letter is simply a new file.
+#
+# PIL is imported inside draw_icon, so once the icons are cached (or if PIL
+# isn't installed) starting an app never pays for importing it.
+
+ICON_SIZES = (16, 32, 48, 64)
+ICON_VERSION = 1             # bump to redraw every cached icon
+
+
+def icon_cache_dir():
+    """Per-user cache folder for the generated icons"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'skills_portfolio', 'icons')
+
+
+def icon_files(name, color, letter, cache_dir=None):
+    """(ico path, {size: png path}) for this icon in the cache folder"""
+    cache_dir = cache_dir or icon_cache_dir()
+    look = hashlib.sha1(repr((ICON_VERSION, color, letter, ICON_SIZES)).encode('utf-8')).hexdigest()[:12]
+    stem = os.path.join(cache_dir, f"{name}-{look}")
+    return stem + ".ico", {size: f"{stem}-{size}.png" for size in ICON_SIZES}
+
+
+def draw_icon(color, letter, ico_path, png_paths):
+    """Draw the icon in every size and write the .ico and PNG files. Needs PIL."""
+    from PIL import Image, ImageDraw
+
+    images = []
+    for size in ICON_SIZES:
+        img = Image.new('RGBA', (size, size), color=color)
+        draw = ImageDraw.Draw(img)
+        # White ring
+        margin = max(1, size // 8)
+        draw.ellipse([margin, margin, size - margin, size - margin],
+                     outline='white', width=max(1, size // 16))
+        # Letter in the middle
+        draw.text((size // 2, size // 2), letter, fill='white', anchor='mm')
+        images.append(img)
+
+    os.makedirs(os.path.dirname(ico_path), exist_ok=True)
+    # Write to temporary names first so a half-written icon is never used
+    for img, size in zip(images, ICON_SIZES):
+        img.save(png_paths[size] + ".tmp", format='PNG')
+    images[-1].save(ico_path + ".tmp", format='ICO', sizes=[(s, s) for s in ICON_SIZES])
+    for path in list(png_paths.values()) + [ico_path]:
+        os.replace(path + ".tmp", path)
+
+
+def ensure_icon(name, color, letter):
+    """Paths of the cached icon files, drawing them first if needed.
+    Returns None if they aren't cached and can't be drawn (no PIL, read-only cache...)."""
+    ico_path, png_paths = icon_files(name, color, letter)
+    if os.path.exists(ico_path) and all(os.path.exists(p) for p in png_paths.values()):
+        return ico_path, png_paths
+    try:
+        draw_icon(color, letter, ico_path, png_paths)
+    except ImportError:
+        return None
+    except Exception as e:
+        print(f"Warning: could not create window icon: {e}")
+        return None
+    return ico_path, png_paths
+
+
+def set_app_icon(root, name, color, letter, fallback_ico=None):
+    """Give root the app's icon. Returns the PhotoImages in use - keep a reference to them,
+    or Tk drops the icon. fallback_ico is an existing .ico used if nothing can be cached."""
+    try:
+        files = ensure_icon(name, color, letter)
+        if files is None:
+            if fallback_ico and os.path.exists(fallback_ico) and sys.platform == 'win32':
+                root.iconbitmap(fallback_ico)
+            return []
+        ico_path, png_paths = files
+        if sys.platform == 'win32':
+            try:
+                root.iconbitmap(ico_path)
+                return []
+            except tk.TclError:
+                pass
+        # Linux and macOS: iconbitmap can't read .ico, but iconphoto takes PNGs directly
+        photos = [tk.PhotoImage(master=root, file=png_paths[size]) for size in sorted(png_paths, reverse=True)]
+        root.iconphoto(True, *photos)
+        return photos
+    except (tk.TclError, OSError):
+        return []    # no custom icon - not worth failing over